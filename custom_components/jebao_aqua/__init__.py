@@ -2,25 +2,48 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+from functools import partial
 import logging
-from pathlib import Path
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import device_registry as dr, entity_registry as er
-
-from .cloud import GizwitsCloudApi, JebaoCloudDevice, parse_channel_names
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .cloud import (
+    TOKEN_REFRESH_MARGIN,
+    CloudPushManager,
+    GizwitsCloudApi,
+    JebaoCloudDevice,
+    parse_channel_names,
+)
+from .cloud_push import push_url
 from .const import (
+    CONF_CLOUD_PUSH,
     CONF_MODE,
+    CONF_OFFLINE_COMMANDS,
+    CONF_POLL_MAX_INTERVAL,
+    CONF_POLL_MIN_INTERVAL,
+    DEFAULT_POLL_MAX_INTERVAL,
+    DEFAULT_POLL_MIN_INTERVAL,
     DEFAULT_REGION,
     DOMAIN,
     MODE_CLOUD,
     MODE_LOCAL,
     PLATFORMS,
+    SIGNAL_DEVICES_ADDED,
 )
-from .hub import JebaoDevice, _load_device_configs, async_discover_devices
+from .hub import (
+    JebaoDevice,
+    JebaoRuntimeData,
+    _load_device_configs,
+    async_discover_devices,
+    async_load_product_attrs,
+)
+from .storage import DeviceDataUpdates, async_get_status_store
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,19 +59,17 @@ def _did_to_uid(did: str) -> str:
     return did.encode("ascii", "ignore").hex()
 
 
-def _load_attr_name_map(product_key: str) -> dict[str, str]:
+async def _async_load_attr_name_map(
+    hass: HomeAssistant, product_key: str
+) -> dict[str, str]:
     """Map v1 unique_id attribute suffixes (lowercased) to raw attribute names."""
-    model_file = Path(__file__).parent / "models" / f"{product_key}.json"
-    if not model_file.is_file():
+    try:
+        attrs = await async_load_product_attrs(hass, product_key)
+    except FileNotFoundError:
         return {}
-    data = json.loads(model_file.read_text(encoding="utf-8-sig"))
-    name_map: dict[str, str] = {}
-    for entity in data.get("entities", []):
-        for attr in entity.get("attrs", []):
-            raw = attr.get("name")
-            if raw:
-                name_map[raw.replace(" ", "_").lower()] = raw
-    return name_map
+    return {
+        attr.name.replace(" ", "_").lower(): attr.name for attr in attrs if attr.name
+    }
 
 
 async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -92,8 +113,8 @@ async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             attr_maps: dict[str, dict[str, str]] = {}
             for dev in old_devices:
                 if "did" in dev and dev.get("product_key"):
-                    attr_maps[dev["did"]] = await hass.async_add_executor_job(
-                        _load_attr_name_map, dev["product_key"]
+                    attr_maps[dev["did"]] = await _async_load_attr_name_map(
+                        hass, dev["product_key"]
                     )
 
             @callback
@@ -188,77 +209,110 @@ async def _async_setup_cloud(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         token=entry.data.get("token"),
         email=entry.data.get("email"),
         password=entry.data.get("password"),
+        token_expire_at=entry.data.get("token_expire_at"),
     )
-
-    # Refresh the token when we have credentials; fall back to the stored
-    # token otherwise (migrated v1 entries have a token but no password).
-    if entry.data.get("password"):
+    api.token_listener = partial(_async_save_token, hass, entry)
+
+    # Reuse the stored token while it has a while to go; log in when we have
+    # credentials otherwise, and fall back to a stored token of unknown
+    # expiry (migrated v1 entries have a token but no password).
+    if api.token_valid_for(TOKEN_REFRESH_MARGIN):
+        _LOGGER.debug("Reusing the stored cloud token")
+    elif entry.data.get("password"):
         token, err = await api.async_login()
-        if token:
-            if token != entry.data.get("token"):
-                hass.config_entries.async_update_entry(
-                    entry, data={**entry.data, "token": token}
-                )
-        elif not entry.data.get("token"):
+        if not token and not entry.data.get("token"):
             raise ConfigEntryNotReady(f"Cloud login failed: {err}")
     elif not entry.data.get("token"):
         raise ConfigEntryNotReady("No cloud token or credentials configured")
+    entry.async_on_unload(api.async_start_token_refresh())
 
-    # Fetch bindings once for extras only the cloud knows, e.g. the
-    # user-assigned doser channel names stored in the binding's remark.
-    bindings: dict[str, dict] = {}
-    try:
-        response = await api.async_get_devices()
-        for dev in (response or {}).get("devices", []):
-            if dev.get("did"):
-                bindings[dev["did"]] = dev
-    except Exception as exc:
-        _LOGGER.debug("Could not fetch cloud bindings: %s", exc)
+    bindings = await _async_get_cloud_bindings(api)
 
     devices: list[JebaoCloudDevice] = []
     for device_data in entry.data.get("devices", []):
-        uid = device_data.get("uid")
-        if not uid:
+        if not device_data.get("uid"):
             _LOGGER.warning("Skipping device without UID in cloud mode")
             continue
-        device = JebaoCloudDevice(
-            hass,
-            api,
-            uid=uid,
-            product_key=device_data.get("product_key", ""),
-            name=device_data.get("name"),
-        )
-        binding = bindings.get(device.did)
-        if binding:
-            device.channel_names = parse_channel_names(binding.get("remark"))
-        try:
-            await device.async_connect()
-        except FileNotFoundError as exc:
-            _LOGGER.error(
-                "No device definition for product key %s (device %s): %s",
-                device_data.get("product_key"),
-                uid,
-                exc,
-            )
-            continue
-        devices.append(device)
+        device = await _async_start_cloud_device(hass, api, device_data, bindings)
+        if device is not None:
+            devices.append(device)
 
     if not devices:
         raise ConfigEntryNotReady("No Jebao devices could be prepared; will retry")
 
-    entry.runtime_data = devices
+    entry.runtime_data = JebaoRuntimeData(
+        devices, mode=MODE_CLOUD, api=api, known_uids=_configured_uids(entry)
+    )
+    await _async_apply_cloud_options(hass, entry)
+
+    await _async_forward_platforms(hass, entry)
+    await _async_request_initial_status(devices)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    entry.async_on_unload(
+        hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, partial(_async_handle_stop, entry)
+        )
+    )
+
+    return True
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    for device in devices:
-        try:
-            await device.request_status_update()
-        except Exception as exc:
-            _LOGGER.error(
-                "Failed to get initial cloud status for %s: %s", device.did, exc
-            )
+@callback
+def _async_save_token(
+    hass: HomeAssistant, entry: ConfigEntry, token: str, expire_at: float
+) -> None:
+    """Persist a new cloud token, so a restart can reuse it."""
+    data = {**entry.data, "token": token, "token_expire_at": expire_at}
+    if data != entry.data:
+        hass.config_entries.async_update_entry(entry, data=data)
 
-    return True
+
+async def _async_get_cloud_bindings(api: GizwitsCloudApi) -> dict[str, dict]:
+    """Fetch the cloud bindings by did.
+
+    They hold extras only the cloud knows, e.g. the user-assigned doser
+    channel names stored in the binding's remark.
+    """
+    bindings: dict[str, dict] = {}
+    try:
+        response = await api.async_get_devices()
+        for dev in (response or {}).get("devices", []):
+            if dev.get("did"):
+                bindings[dev["did"]] = dev
+    except Exception as exc:
+        _LOGGER.debug("Could not fetch cloud bindings: %s", exc)
+    return bindings
+
+
+async def _async_start_cloud_device(
+    hass: HomeAssistant,
+    api: GizwitsCloudApi,
+    device_data: dict,
+    bindings: dict[str, dict],
+) -> JebaoCloudDevice | None:
+    """Create a cloud device and start polling it; None if it has no model."""
+    device = JebaoCloudDevice(
+        hass,
+        api,
+        uid=device_data["uid"],
+        product_key=device_data.get("product_key", ""),
+        name=device_data.get("name"),
+    )
+    binding = bindings.get(device.did)
+    if binding:
+        device.channel_names = parse_channel_names(binding.get("remark"))
+        device.push_url = push_url(binding)
+    try:
+        await device.async_connect()
+    except FileNotFoundError as exc:
+        _LOGGER.error(
+            "No device definition for product key %s (device %s): %s",
+            device_data.get("product_key"),
+            device_data["uid"],
+            exc,
+        )
+        return None
+    return device
 
 
 async def _async_setup_local(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -277,6 +331,7 @@ async def _async_setup_local(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     except Exception as exc:
         _LOGGER.warning("Failed to perform discovery during setup: %s", exc)
 
+    device_updates = DeviceDataUpdates(hass, entry)
     devices: list[JebaoDevice] = []
     updated_devices: list[dict] = []
     devices_updated = False
@@ -335,39 +390,8 @@ async def _async_setup_local(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             )
             continue
 
-        device = JebaoDevice(
-            hass=hass,
-            ip=current_ip,
-            product_key=device_data.get("product_key", ""),
-            uid=device_uid,
-            mac=device_data.get("mac"),
-            firmware_version=device_data.get("firmware_version"),
-            name=device_data.get("name"),
-        )
-
-        try:
-            await device.async_connect()
-        except FileNotFoundError as exc:
-            # No model definition for this product key - retrying won't help.
-            _LOGGER.error(
-                "No device definition for product key %s (device %s): %s",
-                device_data.get("product_key"),
-                device_uid or current_ip,
-                exc,
-            )
-            continue
-        except Exception as exc:
-            # Keep the device: its connection manager retries in the
-            # background and rediscovery will pick up any new IP.
-            _LOGGER.warning(
-                "Initial connection to Jebao device at %s (UID: %s) failed: %s; "
-                "will keep retrying in the background",
-                current_ip,
-                device_uid or "unknown",
-                exc,
-            )
-
-        if device.giz_device is not None:
+        device = await _async_start_local_device(hass, device_updates, device_data)
+        if device is not None:
             devices.append(device)
 
     if devices_updated:
@@ -381,49 +405,304 @@ async def _async_setup_local(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             "No Jebao devices could be prepared; will retry"
         )
 
+    entry.runtime_data = JebaoRuntimeData(
+        devices,
+        mode=MODE_LOCAL,
+        known_uids=_configured_uids(entry),
+        device_updates=device_updates,
+    )
+    _apply_local_options(entry)
+
+    await _async_forward_platforms(hass, entry)
+    await _async_request_initial_status(devices)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    entry.async_on_unload(
+        hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, partial(_async_handle_stop, entry)
+        )
+    )
+
+    return True
+
+
+async def _async_start_local_device(
+    hass: HomeAssistant, device_updates: DeviceDataUpdates, device_data: dict
+) -> JebaoDevice | None:
+    """Create and connect a LAN device; None if it cannot be set up."""
+    device_uid = device_data.get("uid")
+    ip = device_data["ip"]
+    device = JebaoDevice(
+        hass=hass,
+        ip=ip,
+        product_key=device_data.get("product_key", ""),
+        uid=device_uid,
+        mac=device_data.get("mac"),
+        firmware_version=device_data.get("firmware_version"),
+        name=device_data.get("name"),
+    )
+
+    try:
+        await device.async_connect()
+    except FileNotFoundError as exc:
+        # No model definition for this product key - retrying won't help.
+        _LOGGER.error(
+            "No device definition for product key %s (device %s): %s",
+            device_data.get("product_key"),
+            device_uid or ip,
+            exc,
+        )
+        return None
+    except Exception as exc:
+        # Keep the device: its connection manager retries in the
+        # background and rediscovery will pick up any new IP.
+        _LOGGER.warning(
+            "Initial connection to Jebao device at %s (UID: %s) failed: %s; "
+            "will keep retrying in the background",
+            ip,
+            device_uid or "unknown",
+            exc,
+        )
+
+    if device.giz_device is None:
+        return None
     # Persist IP changes found by runtime rediscovery (DHCP lease changes).
-    def _persist_ip_change(uid: str, new_ip: str) -> None:
-        data = dict(entry.data)
-        changed = False
-        new_list = []
-        for dev in data.get("devices", []):
-            if dev.get("uid") == uid and dev.get("ip") != new_ip:
-                dev = {**dev, "ip": new_ip}
-                changed = True
-            new_list.append(dev)
-        if changed:
-            data["devices"] = new_list
-            hass.config_entries.async_update_entry(entry, data=data)
+    device.set_ip_changed_callback(
+        lambda uid, new_ip: device_updates.async_update(uid, {"ip": new_ip})
+    )
+    return device
 
-    for device in devices:
-        device.set_ip_changed_callback(_persist_ip_change)
 
-    entry.runtime_data = devices
+async def _async_request_initial_status(
+    devices: list[JebaoDevice] | list[JebaoCloudDevice],
+) -> None:
+    """Ask freshly started devices for their status, all at once.
+
+    Cloud devices are left out: their first poll, staggered by the poll
+    scheduler from when they were added, is their initial status.
+    """
+    await asyncio.gather(
+        *(
+            _async_request_lan_status(device)
+            for device in devices
+            if not isinstance(device, JebaoCloudDevice)
+            # LAN devices that connected; the others report once they do.
+            and device.available
+        )
+    )
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    # Request initial status from devices that connected.
+async def _async_request_lan_status(device: JebaoDevice) -> None:
+    try:
+        await device.giz_device.request_status_update()
+    except Exception as exc:
+        _LOGGER.error(
+            "Failed to get initial status from device at %s: %s", device.ip, exc
+        )
+
+
+def _configured_uids(entry: ConfigEntry) -> set[str]:
+    return {dev["uid"] for dev in entry.data.get("devices", []) if dev.get("uid")}
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply a changed config entry to the running devices.
+
+    Only the devices that were added/removed are started/stopped, so the
+    other devices keep their connections and entities; changed poll
+    intervals, the status push and the offline command options are applied
+    in place. A switch between local and cloud mode is left to the reload the
+    options flow does.
+    """
+    runtime_data: JebaoRuntimeData | None = entry.runtime_data
+    if runtime_data is None:
+        # Unloaded in the meantime (e.g. queued device data was flushed)
+        return
+    if entry.data.get(CONF_MODE, MODE_LOCAL) != runtime_data.mode:
+        return
+    async with runtime_data.lock:
+        await _async_sync_devices(hass, entry)
+    if runtime_data.mode == MODE_CLOUD:
+        await _async_apply_cloud_options(hass, entry)
+    else:
+        _apply_local_options(entry)
+
+
+def _apply_local_options(entry: ConfigEntry) -> None:
+    """Apply the offline command queue option to the LAN devices."""
+    runtime_data: JebaoRuntimeData = entry.runtime_data
+    enabled = entry.options.get(CONF_OFFLINE_COMMANDS, False)
+    for device in runtime_data.devices:
+        device.queue_offline_commands = enabled
+
+
+async def _async_apply_cloud_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply the poll interval bounds and status push option to the devices."""
+    runtime_data: JebaoRuntimeData = entry.runtime_data
+    minimum = entry.options.get(CONF_POLL_MIN_INTERVAL, DEFAULT_POLL_MIN_INTERVAL)
+    maximum = entry.options.get(CONF_POLL_MAX_INTERVAL, DEFAULT_POLL_MAX_INTERVAL)
+    for device in runtime_data.devices:
+        device.poll_interval.configure(minimum, maximum)
+
+    api: GizwitsCloudApi = runtime_data.api
+    if entry.options.get(CONF_CLOUD_PUSH, False):
+        if api.push is None:
+            api.push = CloudPushManager(hass, api)
+            for device in runtime_data.devices:
+                await api.push.async_add(device)
+    elif api.push is not None:
+        push, api.push = api.push, None
+        await push.async_stop()
+
+
+async def _async_sync_devices(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Diff the entry's device list against the running devices."""
+    runtime_data: JebaoRuntimeData = entry.runtime_data
+    configured = {
+        dev["uid"]: dev for dev in entry.data.get("devices", []) if dev.get("uid")
+    }
+
+    removed = [
+        device
+        for device in runtime_data.devices
+        if device.uid and device.uid not in configured
+    ]
+    if removed:
+        await _async_stop_devices(hass, entry, removed)
+
+    if runtime_data.mode == MODE_LOCAL:
+        # e.g. options rediscovery found a device at a new IP
+        for device in runtime_data.devices:
+            ip = configured.get(device.uid, {}).get("ip")
+            if ip and ip != device.ip:
+                device.handle_sighting(ip)
+
+    # UIDs known at the last sync, so that a device that could not be set up
+    # (e.g. unknown product key) is not retried on every entry update.
+    added = [
+        dev for uid, dev in configured.items() if uid not in runtime_data.known_uids
+    ]
+    runtime_data.known_uids = set(configured)
+    if not added:
+        return
+
+    new_devices: list = []
+    if runtime_data.mode == MODE_CLOUD:
+        bindings = await _async_get_cloud_bindings(runtime_data.api)
+        for device_data in added:
+            device = await _async_start_cloud_device(
+                hass, runtime_data.api, device_data, bindings
+            )
+            if device is not None:
+                new_devices.append(device)
+    else:
+        for device_data in added:
+            if not device_data.get("ip"):
+                continue
+            device = await _async_start_local_device(
+                hass, runtime_data.device_updates, device_data
+            )
+            if device is not None:
+                new_devices.append(device)
+    if not new_devices:
+        return
+
+    _LOGGER.info(
+        "Added %s to %s", ", ".join(d.name or d.uid for d in new_devices), entry.title
+    )
+    runtime_data.devices.extend(new_devices)
+    # Platforms already set up add the entities of the new devices; platforms
+    # that only the new devices need are forwarded (and find them) after.
+    async_dispatcher_send(
+        hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), new_devices
+    )
+    await _async_forward_platforms(hass, entry)
+    await _async_request_initial_status(new_devices)
+
+
+async def _async_stop_devices(
+    hass: HomeAssistant, entry: ConfigEntry, devices: list
+) -> None:
+    """Stop devices that left the entry and remove their entities."""
+    runtime_data: JebaoRuntimeData = entry.runtime_data
+    device_registry = dr.async_get(hass)
+    store = await async_get_status_store(hass)
     for device in devices:
-        if not device.available:
-            continue
-        try:
-            await device.giz_device.request_status_update()
-        except Exception as exc:
-            _LOGGER.error(
-                "Failed to get initial status from device at %s: %s", device.ip, exc
+        runtime_data.devices.remove(device)
+        # Dropping the entry from the registry device removes its entities;
+        # nothing to do if HA already did (removal from the UI).
+        if device_entry := device_registry.async_get_device(
+            identifiers={(DOMAIN, device.uid)}
+        ):
+            device_registry.async_update_device(
+                device_entry.id, remove_config_entry_id=entry.entry_id
             )
+    await _async_disconnect_devices(devices)
+    for device in devices:
+        store.async_remove(device.uid)
+        _LOGGER.info(
+            "Stopped %s (removed from %s)", device.name or device.uid, entry.title
+        )
+
+
+async def _async_disconnect_devices(
+    devices: list[JebaoDevice] | list[JebaoCloudDevice],
+) -> None:
+    """Disconnect devices concurrently.
+
+    Each disconnect is bounded (DISCONNECT_TIMEOUT), so teardown takes about
+    as long as the slowest device rather than the sum of all of them.
+    """
+    results = await asyncio.gather(
+        *(device.async_disconnect() for device in devices), return_exceptions=True
+    )
+    for device, result in zip(devices, results):
+        if isinstance(result, Exception):
+            _LOGGER.warning(
+                "Error disconnecting %s: %s", device.name or device.uid, result
+            )
+
+
+async def _async_handle_stop(entry: ConfigEntry, _event: Event) -> None:
+    """Save queued device data and close the connections when HA stops."""
+    runtime_data: JebaoRuntimeData = entry.runtime_data
+    if runtime_data.device_updates is not None:
+        runtime_data.device_updates.async_flush()
+    await _async_disconnect_devices(runtime_data.devices)
 
-    return True
+
+async def _async_forward_platforms(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forward the platforms the entry's devices have entities on.
+
+    Only platforms not forwarded yet are set up, so this can be called again
+    when devices are added; e.g. an entry of wavemakers never loads the light
+    and sensor platforms.
+    """
+    runtime_data: JebaoRuntimeData = entry.runtime_data
+    used: set[str] = set()
+    for device in runtime_data.devices:
+        used |= device.entities.used_platforms
+    new_platforms = [
+        platform
+        for platform in PLATFORMS
+        if platform in used and platform not in runtime_data.platforms
+    ]
+    if not new_platforms:
+        return
+    _LOGGER.debug("Setting up platforms for %s: %s", entry.title, new_platforms)
+    runtime_data.platforms.update(new_platforms)
+    await hass.config_entries.async_forward_entry_setups(entry, new_platforms)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    runtime_data: JebaoRuntimeData = entry.runtime_data
+    platforms = [p for p in PLATFORMS if p in runtime_data.platforms]
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, platforms)
 
     if unload_ok:
-        devices: list[JebaoDevice | JebaoCloudDevice] = entry.runtime_data
-        for device in devices:
-            await device.async_disconnect()
+        await _async_disconnect_devices(runtime_data.devices)
+        if runtime_data.device_updates is not None:
+            runtime_data.device_updates.async_flush()
         entry.runtime_data = None
 
     return unload_ok
@@ -436,7 +715,7 @@ async def async_remove_config_entry_device(
 
     Strips the device from the config entry so stale/ghost devices (e.g. a
     pump that was replaced or re-added under a new identity) stop being
-    retried forever. The entry is reloaded so the connection is torn down.
+    retried forever. The update listener then stops just that device.
     """
     uids = {
         ident for domain, ident in device_entry.identifiers if domain == DOMAIN
@@ -451,6 +730,9 @@ async def async_remove_config_entry_device(
     ]
     if len(remaining) == len(entry.data.get("devices", [])):
         # Not in the config entry (already stale); just let HA remove it.
+        store = await async_get_status_store(hass)
+        for uid in uids:
+            store.async_remove(uid)
         return True
 
     _LOGGER.info("Removed device %s from configuration", ", ".join(uids))
@@ -463,5 +745,12 @@ async def async_remove_config_entry_device(
     hass.config_entries.async_update_entry(
         entry, data={**entry.data, "devices": remaining}
     )
-    hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
     return True
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the saved status of the entry's devices."""
+    store = await async_get_status_store(hass)
+    for device_data in entry.data.get("devices", []):
+        if uid := device_data.get("uid"):
+            store.async_remove(uid)
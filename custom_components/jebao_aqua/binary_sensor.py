@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
@@ -12,10 +11,13 @@ from homeassistant.components.binary_sensor import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .const import SIGNAL_DEVICES_ADDED
 from .entity import JebaoEntity
 from .gizwits_lan.device_status import DeviceStatus
+from .gizwits_lan.models import Attribute
 from .hub import JebaoDevice
 
 _LOGGER = logging.getLogger(__name__)
@@ -25,50 +27,37 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up binary sensor entities for a given config entry."""
-    devices: list[JebaoDevice] = entry.runtime_data  # type: ignore
-    if not devices:
-        _LOGGER.warning("No Jebao devices found for entry %s", entry.title)
-        return
-
-    entities = []
-    for device in devices:
-        if not device.giz_device:
-            continue
-
-        # Get device config and allowed attributes
-        device_cfg = device.device_config
-        allowed_binary_sensor_attrs = set()
-        if device_cfg and "platforms" in device_cfg:
-            allowed_binary_sensor_attrs = set(
-                device_cfg["platforms"].get("binary_sensor", [])
-            )
-
-        # Create entities for each device's attributes
-        for attr_def in device.giz_device.all_attrs:
-            attr_name = attr_def["name"]
-            if attr_name not in allowed_binary_sensor_attrs:
-                continue
-            if attr_def.get("type") != "fault":
-                continue
-            if attr_def.get("data_type") != "bool":
-                continue
-
-            entities.append(JebaoFaultSensorEntity(entry, device, attr_def))
 
-    if entities:
-        async_add_entities(entities)
+    @callback
+    def _async_add_devices(devices: list[JebaoDevice]) -> None:
+        entities = []
+        for device in devices:
+            if not device.giz_device:
+                continue
+            for attr_def in device.entities.platforms.get("binary_sensor", ()):
+                entities.append(JebaoFaultSensorEntity(entry, device, attr_def))
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_devices(entry.runtime_data.devices)
+    # Devices added to the entry later (see the update listener)
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), _async_add_devices
+        )
+    )
 
 
 class JebaoFaultSensorEntity(JebaoEntity, BinarySensorEntity):
     """A binary sensor for fault bool attributes."""
 
     def __init__(
-        self, entry: ConfigEntry, device: JebaoDevice, attr_def: dict[str, Any]
+        self, entry: ConfigEntry, device: JebaoDevice, attr_def: Attribute
     ) -> None:
         """Initialize the fault binary sensor entity."""
         self.entity_description = BinarySensorEntityDescription(
-            key=attr_def["name"].lower(),
-            name=attr_def.get("name"),
+            key=attr_def.name.lower(),
+            name=attr_def.name,
         )
 
         super().__init__(entry, device, attr_def, "binary_sensor")
@@ -87,7 +76,9 @@ class JebaoFaultSensorEntity(JebaoEntity, BinarySensorEntity):
     async def async_added_to_hass(self) -> None:
         """Register callback when entity is added."""
         await super().async_added_to_hass()  # Call parent to handle connection state
-        self._device.register_status_callback(self._update_state_from_device)
+        self._device.register_status_callback(
+            self._update_state_from_device, (self._attribute_name,)
+        )
 
     async def async_will_remove_from_hass(self) -> None:
         """Unregister callbacks."""
@@ -4,6 +4,8 @@ This is the "fully cloud" connection mode: device state is polled from the
 Gizwits cloud and commands are sent through it, for installs where LAN access
 to the pumps is not possible. Based on the original cloud implementation with
 the fixes from PR #62 (no shared closed session, 30s poll interval).
+Optionally the cloud pushes status changes over a websocket (cloud_push.py)
+and polling only backs it up.
 """
 
 from __future__ import annotations
@@ -12,21 +14,41 @@ import asyncio
 import binascii
 import json
 import logging
+import math
 import time
-from collections.abc import Callable
+from collections.abc import Callable, Collection, Mapping
+from dataclasses import dataclass
+from functools import partial
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
 
 from .const import (
     CLOUD_TIMEOUT,
-    CLOUD_UPDATE_INTERVAL,
+    DEFAULT_POLL_MAX_INTERVAL,
+    DEFAULT_POLL_MIN_INTERVAL,
+    DISCONNECT_TIMEOUT,
     GIZWITS_API_URLS,
     GIZWITS_APP_ID,
+    PUSH_POLL_INTERVAL,
+    RESTORED_STATUS_TIMEOUT,
 )
+from .cloud_push import CloudPushConnection
 from .gizwits_lan.device_status import DeviceStatus
-from .hub import async_load_product_attrs, get_device_config_for_product_key
+from .gizwits_lan.models import Attribute
+from .hub import (
+    NO_ENTITIES,
+    WriteBatcher,
+    async_load_product_attrs,
+    changed_attributes,
+    get_device_config_for_product_key,
+    get_product_entities,
+    notify_status_callbacks,
+)
+from .storage import JebaoStatusStore, async_get_status_store
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,12 +57,35 @@ GIZWITS_ERROR_CODES = {
     "1000033": "invalid_password",
 }
 
-# How long to wait before re-trying a login after a failed poll.
+# Minimum time between two re-logins.
 REAUTH_COOLDOWN = 300.0
+# Tokens are refreshed this long before they expire (and not reused at
+# startup any later); TOKEN_LIFETIME is assumed when a login response has
+# no expire_at.
+TOKEN_REFRESH_MARGIN = 86400.0
+TOKEN_LIFETIME = 7 * 86400.0
+# Gizwits error codes for an invalid or expired user token
+TOKEN_ERROR_CODES = frozenset({"9004", "9006"})
 # Consecutive failed polls before entities are marked unavailable.
 MAX_FAILED_POLLS = 2
-# Delay between sending a control command and the confirmation poll.
+# After a control command the device is polled after this delay, then
+# after twice that and so on (also when polls fail), until it reports the
+# commanded values or CONTROL_CONFIRM_TIMEOUT has passed; then the values
+# the cloud last reported are shown again.
 CONTROL_CONFIRM_DELAY = 2.0
+CONTROL_CONFIRM_TIMEOUT = 30.0
+# Each poll that finds the data unchanged stretches the interval this much.
+IDLE_BACKOFF_FACTOR = 1.5
+# Failed polls double the interval up to this (or the maximum, if larger).
+FAILURE_MAX_INTERVAL = 300.0
+# Cloud polls in flight at once, per account.
+MAX_CONCURRENT_POLLS = 2
+# Spacing of the first polls of devices added together.
+POLL_STAGGER = 1.0
+# An extra poll (e.g. request_status_update) waits for the device's
+# scheduled poll if that is due within this many seconds; otherwise the
+# scheduled poll is brought forward.
+POLL_MERGE_WINDOW = 5.0
 
 
 def uid_to_did(uid: str) -> str:
@@ -67,11 +112,259 @@ def parse_channel_names(remark: str | None) -> dict[int, str]:
         return {}
 
 
+def _is_token_error(status: int, body: str) -> bool:
+    """Return True if a response refused the request for its user token."""
+    if status == 401:
+        return True
+    if status != 400:
+        return False
+    try:
+        error = json.loads(body)
+    except ValueError:
+        return False
+    return isinstance(error, dict) and str(error.get("error_code")) in TOKEN_ERROR_CODES
+
+
 def did_to_uid(did: str) -> str:
     """Convert a Gizwits cloud device id to the stored hex uid."""
     return did.encode("ascii", "ignore").hex()
 
 
+@dataclass(slots=True)
+class AdaptivePollInterval:
+    """Poll interval of one cloud device.
+
+    Stays at minimum while the device's data keeps changing, grows by
+    IDLE_BACKOFF_FACTOR with every unchanged poll up to maximum, and doubles
+    with every failed poll up to FAILURE_MAX_INTERVAL. A change, or the first
+    successful poll after failures, brings it back to minimum.
+    """
+
+    minimum: float = DEFAULT_POLL_MIN_INTERVAL
+    maximum: float = DEFAULT_POLL_MAX_INTERVAL
+    current: float = DEFAULT_POLL_MIN_INTERVAL
+
+    def configure(self, minimum: float, maximum: float) -> None:
+        """Set new bounds (e.g. from the entry options)."""
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.current = min(max(self.current, self.minimum), self.maximum)
+
+    def changed(self) -> None:
+        self.current = self.minimum
+
+    def unchanged(self) -> None:
+        self.current = min(self.current * IDLE_BACKOFF_FACTOR, self.maximum)
+
+    def failed(self) -> None:
+        self.current = min(
+            max(self.current, self.minimum) * 2,
+            max(FAILURE_MAX_INTERVAL, self.maximum),
+        )
+
+
+class CloudPollScheduler:
+    """Polls the cloud devices of one account.
+
+    Each device is polled again device.next_poll_delay() seconds after its
+    previous poll completed (see AdaptivePollInterval). Devices are started
+    POLL_STAGGER seconds apart so they do not fall into step, and at most
+    MAX_CONCURRENT_POLLS requests run at once.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler (idle until a device is added)."""
+        self._hass = hass
+        # Device -> time.monotonic() of its next scheduled poll (inf while a
+        # scheduled poll is in flight)
+        self._slots: dict[JebaoCloudDevice, float] = {}
+        # Callers waiting for a device's next scheduled poll
+        self._waiters: dict[JebaoCloudDevice, list[asyncio.Future]] = {}
+        # Device -> its poll task, while it runs
+        self._in_flight: dict[JebaoCloudDevice, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_POLLS)
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._last_start = 0.0
+
+    def async_add(self, device: JebaoCloudDevice) -> None:
+        """Start polling a device."""
+        self._last_start = max(time.monotonic(), self._last_start + POLL_STAGGER)
+        self._slots[device] = self._last_start
+        self._wake.set()
+        if self._task is None:
+            self._task = self._hass.async_create_background_task(
+                self._async_run(), name="jebao_aqua_cloud_poll"
+            )
+
+    async def async_remove(self, device: JebaoCloudDevice) -> None:
+        """Stop polling a device; waits (bounded) for a poll in flight."""
+        if self._slots.pop(device, None) is None:
+            return
+        for waiter in self._waiters.pop(device, []):
+            if not waiter.done():
+                waiter.set_result(None)
+        if not self._slots and self._task is not None:
+            self._task.cancel()
+            self._task = None
+        task = self._in_flight.pop(device, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.wait({task}, timeout=DISCONNECT_TIMEOUT)
+
+    def async_poll_soon(self, device: JebaoCloudDevice, delay: float) -> None:
+        """Bring a device's next poll forward to at most delay seconds away."""
+        slot = self._slots.get(device)
+        if slot is None or slot == math.inf:
+            # Not polled, or a poll is in flight and reschedules when done
+            return
+        self._slots[device] = min(slot, time.monotonic() + delay)
+        self._wake.set()
+
+    async def async_poll(self, device: JebaoCloudDevice) -> None:
+        """Poll a device soon and wait for the result.
+
+        Joins the device's poll in flight, if any; otherwise the scheduled
+        poll is brought forward unless it is due within POLL_MERGE_WINDOW.
+        """
+        task = self._in_flight.get(device)
+        if task is not None:
+            await asyncio.shield(task)
+            return
+        slot = self._slots.get(device)
+        if slot is None:
+            # Not scheduled (e.g. being removed): poll on its own
+            await self._async_poll(device)
+            return
+        now = time.monotonic()
+        if slot - now > POLL_MERGE_WINDOW:
+            self._slots[device] = now
+            self._wake.set()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(device, []).append(waiter)
+        await waiter
+
+    async def _async_run(self) -> None:
+        """Start each device's poll when its slot comes up."""
+        while True:
+            now = time.monotonic()
+            for device, slot in self._slots.items():
+                if slot > now:
+                    continue
+                self._slots[device] = math.inf
+                task = self._hass.async_create_background_task(
+                    self._async_poll(device, self._waiters.pop(device, [])),
+                    name=f"jebao_aqua_cloud_poll_{device.uid}",
+                )
+                self._in_flight[device] = task
+                task.add_done_callback(partial(self._async_poll_done, device))
+            self._wake.clear()
+            delay = min(self._slots.values(), default=math.inf) - now
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(), None if delay == math.inf else max(delay, 0)
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    @callback
+    def _async_poll_done(self, device: JebaoCloudDevice, task: asyncio.Task) -> None:
+        if self._in_flight.get(device) is task:
+            del self._in_flight[device]
+
+    async def _async_poll(
+        self, device: JebaoCloudDevice, waiters: list[asyncio.Future] | None = None
+    ) -> None:
+        try:
+            async with self._semaphore:
+                await device._async_poll_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            _LOGGER.exception("Unexpected error polling %s", device.did)
+        finally:
+            for waiter in waiters or ():
+                if not waiter.done():
+                    waiter.set_result(None)
+            if device in self._slots:
+                self._slots[device] = time.monotonic() + device.next_poll_delay()
+                self._wake.set()
+
+
+class CloudPushManager:
+    """Status push for the cloud devices of one account.
+
+    Devices are grouped by the m2m server in their binding, one
+    CloudPushConnection each. While a device's subscription is up it is only
+    polled every PUSH_POLL_INTERVAL; when the socket drops it is polled right
+    away and then adaptively again.
+    """
+
+    def __init__(self, hass: HomeAssistant, api: GizwitsCloudApi) -> None:
+        """Initialize the manager (connections open as devices are added)."""
+        self._hass = hass
+        self._api = api
+        self._connections: dict[str, CloudPushConnection] = {}
+        self._devices: dict[str, JebaoCloudDevice] = {}
+
+    async def async_add(self, device: JebaoCloudDevice) -> None:
+        """Subscribe to a device's status; ignored if its server is unknown."""
+        url = device.push_url
+        if url is None:
+            return
+        self._devices[device.did] = device
+        if (connection := self._connections.get(url)) is None:
+            connection = self._connections[url] = CloudPushConnection(
+                async_get_clientsession(self._hass),
+                url,
+                GIZWITS_APP_ID,
+                self._api.async_push_credentials,
+                self._async_handle_attrs,
+                partial(self._async_handle_connected, url),
+                self._hass.async_create_background_task,
+            )
+            connection.start()
+        await connection.subscribe([device.did])
+        device.push_active = connection.connected
+
+    async def async_remove(self, device: JebaoCloudDevice) -> None:
+        """Stop passing on a device's status; closes sockets left unused."""
+        if self._devices.pop(device.did, None) is None:
+            return
+        device.push_active = False
+        connection = self._connections.get(device.push_url)
+        if connection is None:
+            return
+        connection.unsubscribe([device.did])
+        if not connection.dids:
+            del self._connections[device.push_url]
+            await connection.stop()
+
+    async def async_stop(self) -> None:
+        """Close every socket (status push disabled)."""
+        connections, self._connections = self._connections, {}
+        # Each stop reports the socket down, which puts its devices back on
+        # adaptive polling.
+        await asyncio.gather(*(conn.stop() for conn in connections.values()))
+        self._devices.clear()
+
+    @callback
+    def _async_handle_attrs(self, did: str, attrs: dict[str, Any]) -> None:
+        if (device := self._devices.get(did)) is not None:
+            device.async_handle_push(attrs)
+
+    @callback
+    def _async_handle_connected(self, url: str, connected: bool) -> None:
+        _LOGGER.debug("Status push via %s %s", url, "up" if connected else "down")
+        for device in self._devices.values():
+            if device.push_url != url or device.push_active == connected:
+                continue
+            device.push_active = connected
+            # Pushes may have been missed until the socket was found dead
+            if not connected:
+                self._api.poll_scheduler.async_poll_soon(device, 0)
+
+
 class GizwitsCloudApi:
     """Minimal Gizwits cloud API client (login, bindings, poll, control).
 
@@ -87,23 +380,46 @@ class GizwitsCloudApi:
         token: str | None = None,
         email: str | None = None,
         password: str | None = None,
+        token_expire_at: float | None = None,
     ) -> None:
         """Initialize the API client for a region."""
+        self._hass = hass
         self._session = async_get_clientsession(hass)
         self._urls = GIZWITS_API_URLS[region]
+        # Shared by the account's devices
+        self.poll_scheduler = CloudPollScheduler(hass)
+        # Set while status push is enabled (see the cloud_push option)
+        self.push: CloudPushManager | None = None
         self._token = token
+        # Unix time the token expires at; None if unknown (e.g. migrated)
+        self._token_expire_at = token_expire_at
+        # Called with (token, expire_at) after every successful login, so
+        # the entry can persist them
+        self.token_listener: Callable[[str, float], None] | None = None
+        self._user_id: str | None = None
         self._email = email
         self._password = password
-        self._last_reauth = 0.0
+        self._last_relogin = -REAUTH_COOLDOWN
+        self._relogin: asyncio.Task | None = None
+        self._refresh_unsub: CALLBACK_TYPE | None = None
 
     @property
     def token(self) -> str | None:
         """Return the current user token."""
         return self._token
 
-    def set_token(self, token: str) -> None:
-        """Set the user token for subsequent requests."""
-        self._token = token
+    @property
+    def token_expire_at(self) -> float | None:
+        """Return when the current token expires (Unix time), if known."""
+        return self._token_expire_at
+
+    def token_valid_for(self, seconds: float) -> bool:
+        """Return True if the token is known to stay valid that long."""
+        return (
+            self._token is not None
+            and self._token_expire_at is not None
+            and self._token_expire_at - time.time() > seconds
+        )
 
     def _auth_headers(self) -> dict[str, str]:
         return {
@@ -156,46 +472,160 @@ class GizwitsCloudApi:
             code = str(data.get("code"))
             return None, GIZWITS_ERROR_CODES.get(code, "unknown_error")
 
-        token = data.get("data", {}).get("userToken") if isinstance(
-            data.get("data"), dict
-        ) else None
+        result = data.get("data") if isinstance(data.get("data"), dict) else {}
+        token = result.get("userToken")
         if not token:
             _LOGGER.error("No userToken in Gizwits login response: %s", body[:200])
             return None, "invalid_response"
 
+        try:
+            expire_at = float(result["expire_at"])
+        except (KeyError, TypeError, ValueError):
+            expire_at = time.time() + TOKEN_LIFETIME
         self._token = token
+        self._token_expire_at = expire_at
+        if result.get("uid"):
+            self._user_id = str(result["uid"])
+        if self.token_listener is not None:
+            self.token_listener(token, expire_at)
         return token, None
 
-    async def async_maybe_reauth(self) -> bool:
-        """Attempt a cooldown-limited re-login with stored credentials."""
+    async def async_relogin(self) -> bool:
+        """Log in again with the stored credentials; True if it worked.
+
+        Concurrent callers (e.g. every request that found the token
+        expired) wait for one shared login. A new login is started at most
+        every REAUTH_COOLDOWN seconds.
+        """
         if not self._email or not self._password:
             return False
-        now = time.monotonic()
-        if now - self._last_reauth < REAUTH_COOLDOWN:
-            return False
-        self._last_reauth = now
-        token, err = await self.async_login()
+        if self._relogin is None:
+            if time.monotonic() - self._last_relogin < REAUTH_COOLDOWN:
+                return False
+            self._last_relogin = time.monotonic()
+            self._relogin = self._hass.async_create_background_task(
+                self._async_relogin(), name="jebao_aqua_cloud_login"
+            )
+        return await asyncio.shield(self._relogin)
+
+    async def _async_relogin(self) -> bool:
+        try:
+            token, err = await self.async_login()
+        finally:
+            self._relogin = None
         if token:
             _LOGGER.info("Refreshed Gizwits cloud token")
+            self._async_schedule_refresh()
             return True
         _LOGGER.warning("Gizwits cloud re-login failed: %s", err)
         return False
 
+    @callback
+    def async_start_token_refresh(self) -> CALLBACK_TYPE:
+        """Refresh the token in the background before it expires.
+
+        Returns a callback that stops the refreshes.
+        """
+        self._async_schedule_refresh()
+        return self._async_stop_token_refresh
+
+    @callback
+    def _async_schedule_refresh(self) -> None:
+        if self._refresh_unsub is not None:
+            self._refresh_unsub()
+        if self._token_expire_at is None or not self._password:
+            self._refresh_unsub = None
+            return
+        delay = self._token_expire_at - TOKEN_REFRESH_MARGIN - time.time()
+        self._refresh_unsub = async_call_later(
+            self._hass, max(delay, 0), self._async_refresh_due
+        )
+
+    @callback
+    def _async_refresh_due(self, _now: Any) -> None:
+        self._refresh_unsub = None
+        self._hass.async_create_background_task(
+            self._async_refresh(), name="jebao_aqua_cloud_token_refresh"
+        )
+
+    async def _async_refresh(self) -> None:
+        if self._refresh_unsub is not None:
+            # Already rescheduled by a login in the meantime
+            return
+        if not await self.async_relogin() and self._refresh_unsub is None:
+            # Try again once the cooldown has passed
+            self._refresh_unsub = async_call_later(
+                self._hass, REAUTH_COOLDOWN, self._async_refresh_due
+            )
+
+    @callback
+    def _async_stop_token_refresh(self) -> None:
+        if self._refresh_unsub is not None:
+            self._refresh_unsub()
+            self._refresh_unsub = None
+
+    async def async_get_user_id(self) -> str | None:
+        """Return the account's user id (asked for by the push websocket)."""
+        if self._user_id is None:
+            user = await self._get_json(self._urls["USER_URL"])
+            if user and user.get("uid"):
+                self._user_id = str(user["uid"])
+        return self._user_id
+
+    async def async_push_credentials(
+        self, stale: bool
+    ) -> tuple[str | None, str | None]:
+        """Return (user id, token) for the push websocket login.
+
+        stale: the websocket refused the current token; try to log in again.
+        """
+        if stale:
+            await self.async_relogin()
+        return await self.async_get_user_id(), self._token
+
+    async def _async_request(
+        self, method: str, url: str, payload: dict | None = None
+    ) -> tuple[int, str]:
+        """Send an authenticated request and return (status, body).
+
+        A token known to have expired is refreshed first; a request refused
+        for its token is sent again after a (shared) re-login. Raises
+        aiohttp/timeout errors.
+        """
+        if (
+            self._token_expire_at is not None
+            and self._token_expire_at <= time.time()
+        ):
+            await self.async_relogin()
+        token = self._token
+        status, body = await self._async_send(method, url, payload)
+        if _is_token_error(status, body) and (
+            # Replaced while this request was on its way
+            self._token != token or await self.async_relogin()
+        ):
+            status, body = await self._async_send(method, url, payload)
+        return status, body
+
+    async def _async_send(
+        self, method: str, url: str, payload: dict | None
+    ) -> tuple[int, str]:
+        headers = self._auth_headers()
+        if payload is not None:
+            headers["Content-Type"] = "application/json"
+        async with self._session.request(
+            method, url, json=payload, headers=headers, timeout=CLOUD_TIMEOUT
+        ) as response:
+            return response.status, await response.text()
+
     async def _get_json(self, url: str) -> dict | None:
         try:
-            async with self._session.get(
-                url, headers=self._auth_headers(), timeout=CLOUD_TIMEOUT
-            ) as response:
-                body = await response.text()
-                if response.status != 200:
-                    _LOGGER.debug(
-                        "Gizwits API GET %s failed: %s %s",
-                        url,
-                        response.status,
-                        body[:200],
-                    )
-                    return None
-                return json.loads(body)
+            status, body = await self._async_request("GET", url)
+            if status != 200:
+                _LOGGER.debug(
+                    "Gizwits API GET %s failed: %s %s", url, status, body[:200]
+                )
+                return None
+            return json.loads(body)
         except Exception as exc:
             _LOGGER.debug("Gizwits API GET %s error: %s", url, exc)
             return None
@@ -213,24 +643,19 @@ class GizwitsCloudApi:
     async def async_control_device(self, did: str, attributes: dict) -> bool:
         """Send a control command to a device; return True on success."""
         url = self._urls["CONTROL_URL"].format(device_id=did)
-        headers = self._auth_headers() | {"Content-Type": "application/json"}
         try:
-            async with self._session.post(
-                url,
-                json={"attrs": attributes},
-                headers=headers,
-                timeout=CLOUD_TIMEOUT,
-            ) as response:
-                body = await response.text()
-                if response.status != 200:
-                    _LOGGER.error(
-                        "Gizwits control command for %s failed: %s %s",
-                        did,
-                        response.status,
-                        body[:200],
-                    )
-                    return False
-                return True
+            status, body = await self._async_request(
+                "POST", url, {"attrs": attributes}
+            )
+            if status != 200:
+                _LOGGER.error(
+                    "Gizwits control command for %s failed: %s %s",
+                    did,
+                    status,
+                    body[:200],
+                )
+                return False
+            return True
         except Exception as exc:
             _LOGGER.error("Error sending Gizwits control command for %s: %s", did, exc)
             return False
@@ -241,7 +666,7 @@ class JebaoCloudDevice:
 
     Entities and platforms are agnostic of the connection mode: this class
     mirrors JebaoDevice's surface (uid/mac/product_key/name, giz_device,
-    get_attribute, async_set_attribute, status/connection callbacks).
+    get_attribute, async_set_attribute(s), status/connection callbacks).
     """
 
     def __init__(
@@ -262,19 +687,43 @@ class JebaoCloudDevice:
         self.ip: str | None = None
         self.mac: str | None = None
         self.firmware_version: str | None = None
-        self.device_config: dict = {}
-        self.all_attrs: list[dict] = []
+        self.device_config: Mapping[str, Any] = {}
+        self.all_attrs: list[Attribute] = []
+        self.entities = NO_ENTITIES
         self.channel_names: dict[int, str] = {}
+        # Websocket of the device's m2m server (from the binding) and whether
+        # it currently pushes the device's status
+        self.push_url: str | None = None
+        self.push_active = False
+        # Replaced, never mutated in place, so snapshots can share it.
         self._data: dict[str, Any] = {}
+        self._status: DeviceStatus | None = None
         self._available = False
+        # True while the values are the ones saved before a restart.
+        self.restored = False
+        self._restored_unsub: CALLBACK_TYPE | None = None
+        self._status_store: JebaoStatusStore | None = None
         self._failed_polls = 0
-        self._poll_task: asyncio.Task | None = None
-        self._status_callbacks: set[Callable[[DeviceStatus], None]] = set()
+        self.poll_interval = AdaptivePollInterval()
+        # Last values as polled (self._data may overlay commanded values)
+        # and the cloud's updated_at for them, if it reports one
+        self._polled: dict[str, Any] = {}
+        self._polled_at: Any = None
+        # Commanded values the cloud has not reported back yet
+        self._confirm: dict[str, Any] = {}
+        self._confirm_deadline = 0.0
+        self._confirm_delay = CONTROL_CONFIRM_DELAY
+        # Writes within WRITE_BATCH_WINDOW share one control request
+        self._writes = WriteBatcher(hass, self._async_send_attributes, self.did)
+        # Status callback -> the attributes it is interested in (None: all)
+        self._status_callbacks: dict[
+            Callable[[DeviceStatus], None], frozenset[str] | None
+        ] = {}
         self._connection_callbacks: set[Callable[[bool], None]] = set()
 
     @property
     def giz_device(self) -> JebaoCloudDevice:
-        """Platforms enumerate device.giz_device.all_attrs; serve them here."""
+        """Platforms skip devices without a giz_device; the cloud device is its own."""
         return self
 
     @property
@@ -290,60 +739,126 @@ class JebaoCloudDevice:
         """
         self.device_config = await get_device_config_for_product_key(self.product_key)
         self.all_attrs = await async_load_product_attrs(self.hass, self.product_key)
-        self._poll_task = self.hass.async_create_background_task(
-            self._async_poll_loop(),
-            name=f"jebao_aqua_cloud_poll_{self.uid}",
+        self.entities = get_product_entities(
+            self.product_key, self.all_attrs, self.device_config
         )
+        self._status_store = await async_get_status_store(self.hass)
+        self._restore_status()
+        self.api.poll_scheduler.async_add(self)
+        if self.api.push is not None:
+            await self.api.push.async_add(self)
 
     async def async_disconnect(self) -> None:
-        """Stop polling."""
-        if self._poll_task is not None and not self._poll_task.done():
-            self._poll_task.cancel()
-        self._poll_task = None
+        """Stop polling; waits (at most DISCONNECT_TIMEOUT) for a poll in flight."""
+        self._writes.async_cancel()
+        if self.api.push is not None:
+            await self.api.push.async_remove(self)
+        await self.api.poll_scheduler.async_remove(self)
+        self._end_restored()
+
+    def _restore_status(self) -> None:
+        """Seed the values saved before the last restart, if there are any."""
+        record = self._status_store.get(self.uid) if self._status_store else None
+        values = record.get("values") if record else None
+        if not isinstance(values, dict) or not values:
+            return
+        self._data = values
+        self._status = DeviceStatus(data=self._data, restored=True)
+        self.restored = True
+        self._restored_unsub = async_call_later(
+            self.hass, RESTORED_STATUS_TIMEOUT, self._async_restored_expired
+        )
+        _LOGGER.debug("Restored last known values of %s", self.did)
+
+    def _end_restored(self) -> None:
+        self.restored = False
+        if self._restored_unsub is not None:
+            self._restored_unsub()
+            self._restored_unsub = None
+
+    @callback
+    def _async_restored_expired(self, _now: Any) -> None:
+        """No successful poll in time: stop presenting the restored values."""
+        self._restored_unsub = None
+        self._end_restored()
+        for callback in self._connection_callbacks:
+            try:
+                callback(self._available)
+            except Exception:
+                _LOGGER.exception("Error in connection callback")
 
     async def request_status_update(self) -> None:
-        """Poll the cloud for fresh data now."""
-        await self._async_poll_once()
+        """Poll the cloud for fresh data (now, or with a scheduled poll due soon)."""
+        await self.api.poll_scheduler.async_poll(self)
 
     def get_attribute(self, attr_name: str) -> Any:
         """Return the last polled value for an attribute."""
         return self._data.get(attr_name)
 
+    def get_attribute_metadata(self, attr_name: str) -> Attribute | None:
+        """Return the model definition of an attribute (type, position, etc)."""
+        return self.entities.attrs_by_name.get(attr_name)
+
+    def command_pending(self, attr_name: str) -> bool:
+        """Cloud commands are not queued while offline (LAN devices only)."""
+        return False
+
     async def async_set_attribute(self, attr_name: str, value: Any) -> None:
         """Set an attribute via the cloud, optimistically update, then confirm."""
-        if not await self.api.async_control_device(self.did, {attr_name: value}):
-            return
-        # Optimistic update so the UI doesn't wait up to a full poll interval.
-        self._data[attr_name] = value
-        self._notify_status()
+        await self._writes.async_write({attr_name: value})
 
-        async def _confirm() -> None:
-            await asyncio.sleep(CONTROL_CONFIRM_DELAY)
-            await self._async_poll_once()
+    async def async_set_attributes(self, values: Mapping[str, Any]) -> None:
+        """Set several attributes via the cloud in one control request."""
+        await self._writes.async_write(values)
 
-        self.hass.async_create_background_task(
-            _confirm(), name=f"jebao_aqua_cloud_confirm_{self.uid}"
-        )
+    async def _async_send_attributes(self, values: dict[str, Any]) -> None:
+        """Send a batch of writes; one optimistic update and confirmation.
+
+        Raises HomeAssistantError if the cloud did not take the command.
+        """
+        if not await self.api.async_control_device(self.did, values):
+            raise HomeAssistantError("Cloud control command failed")
+        # Optimistic update so the UI doesn't wait for the cloud; kept until
+        # the cloud reports the values (see _apply_confirm).
+        self._data = {**self._data, **values}
+        self._notify_status(values)
+        self._confirm = {**self._confirm, **values}
+        self._confirm_deadline = time.monotonic() + CONTROL_CONFIRM_TIMEOUT
+        self._confirm_delay = CONTROL_CONFIRM_DELAY
+        self.api.poll_scheduler.async_poll_soon(self, CONTROL_CONFIRM_DELAY)
+
+    def next_poll_delay(self) -> float:
+        """Seconds until this device should be polled again."""
+        if self._confirm and time.monotonic() <= self._confirm_deadline:
+            return self._confirm_delay
+        if self.push_active:
+            return max(PUSH_POLL_INTERVAL, self.poll_interval.maximum)
+        return self.poll_interval.current
 
     def register_status_callback(
-        self, callback: Callable[[DeviceStatus], None]
+        self,
+        callback: Callable[[DeviceStatus], None],
+        attributes: Collection[str] | None = None,
     ) -> None:
         """Entity subscribes to status updates; replay the last known state.
 
+        With attributes, only polls that change one of them are passed on.
         Entities may register after the initial poll completed (entity
         addition is scheduled as a task), so without a replay they would
         show no state until the next poll interval.
         """
-        self._status_callbacks.add(callback)
-        if self._data:
+        self._status_callbacks[callback] = (
+            None if attributes is None else frozenset(attributes)
+        )
+        if self._status is not None:
             try:
-                callback(DeviceStatus(data=dict(self._data)))
+                callback(self._status)
             except Exception:
                 _LOGGER.exception("Error replaying status to new callback")
 
     def remove_status_callback(self, callback: Callable[[DeviceStatus], None]) -> None:
         """Entity unsubscribes from status updates."""
-        self._status_callbacks.discard(callback)
+        self._status_callbacks.pop(callback, None)
 
     def register_connection_callback(self, callback: Callable[[bool], None]) -> None:
         """Register a callback for availability changes; notify current state."""
@@ -364,44 +879,107 @@ class JebaoCloudDevice:
             except Exception:
                 _LOGGER.exception("Error in connection callback")
 
-    def _notify_status(self) -> None:
-        status = DeviceStatus(data=dict(self._data))
-        for callback in self._status_callbacks:
-            try:
-                callback(status)
-            except Exception:
-                _LOGGER.exception("Error in status callback")
+    def _notify_status(self, changed: Collection[str] | None = None) -> None:
+        """Publish self._data to the callbacks of the changed attributes (or all)."""
+        # One snapshot per change, shared by every callback and by replays.
+        self._status = status = DeviceStatus(data=self._data)
+        notify_status_callbacks(self._status_callbacks, status, changed)
+
+    def _apply_confirm(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        """Track commanded values in a poll; keep showing unconfirmed ones."""
+        if not self._confirm:
+            return attrs
+        pending = {
+            name: value
+            for name, value in self._confirm.items()
+            if attrs.get(name) != value
+        }
+        if not pending:
+            self._confirm = {}
+            return attrs
+        if time.monotonic() > self._confirm_deadline:
+            _LOGGER.debug("%s did not report commanded values %s", self.did, pending)
+            self._confirm = {}
+            return attrs
+        self._confirm = pending
+        return {**attrs, **pending}
+
+    def _expire_confirm(self) -> None:
+        """Without a poll getting through, give up on commanded values in time.
+
+        The optimistic values are replaced by the ones last polled.
+        """
+        if not self._confirm or time.monotonic() <= self._confirm_deadline:
+            return
+        _LOGGER.debug("%s did not report commanded values %s", self.did, self._confirm)
+        names, self._confirm = self._confirm, {}
+        data = {
+            **self._data,
+            **{name: self._polled[name] for name in names if name in self._polled},
+        }
+        changed = changed_attributes(self._data, data)
+        self._data = data
+        if changed:
+            self._notify_status(changed)
+
+    @callback
+    def async_handle_push(self, attrs: dict[str, Any]) -> None:
+        """Apply attribute values pushed over the websocket."""
+        self._update_values({**self._polled, **attrs})
+
+    def _update_values(self, attrs: dict[str, Any], updated_at: Any = None) -> bool:
+        """Take in values reported by the cloud; return True if they changed.
+
+        An updated_at equal to the previous one is the report seen last time,
+        so the values are only compared when it is missing or has moved on.
+        """
+        if updated_at is not None and updated_at == self._polled_at:
+            polled_changed = False
+        else:
+            polled_changed = attrs != self._polled
+            self._polled = attrs
+            self._polled_at = updated_at
+        data = self._apply_confirm(self._polled)
+        changed = changed_attributes(self._data, data)
+        self._data = data
+        self._end_restored()
+        self._set_available(True)
+        if changed:
+            self._notify_status(changed)
+        if polled_changed and self._status_store is not None:
+            self._status_store.async_update(self.uid, {"values": self._polled})
+        return polled_changed
 
     async def _async_poll_once(self) -> None:
         """Poll the cloud once and update state/availability."""
         result = await self.api.async_get_device_data(self.did)
         attrs = result.get("attr") if isinstance(result, dict) else None
         if isinstance(attrs, dict) and attrs:
+            if self._update_values(attrs, result.get("updated_at")) or (
+                self._failed_polls
+            ):
+                self.poll_interval.changed()
+            else:
+                self.poll_interval.unchanged()
             self._failed_polls = 0
-            self._data = attrs
-            self._set_available(True)
-            self._notify_status()
+            if self._confirm:
+                # Not reported yet; pushes in between don't count as tries
+                self._confirm_delay *= 2
             return
 
         self._failed_polls += 1
+        self.poll_interval.failed()
+        if self._confirm:
+            self._confirm_delay *= 2
+            self._expire_confirm()
         _LOGGER.debug(
             "Cloud poll failed for %s (%d consecutive)", self.did, self._failed_polls
         )
         if self._failed_polls >= MAX_FAILED_POLLS:
             self._set_available(False)
-            # The token may have expired; try to refresh it (cooldown-limited).
-            await self.api.async_maybe_reauth()
-
-    async def _async_poll_loop(self) -> None:
-        """Poll on a fixed interval until cancelled."""
-        while True:
-            try:
-                await self._async_poll_once()
-            except asyncio.CancelledError:
-                raise
-            except Exception:
-                _LOGGER.exception("Unexpected error polling %s", self.did)
-            await asyncio.sleep(CLOUD_UPDATE_INTERVAL)
+            # The token may be refused with an unknown error; log in again
+            # (cooldown-limited after failures).
+            await self.api.async_relogin()
 
     def __repr__(self) -> str:
         return (
@@ -0,0 +1,273 @@
+"""Gizwits app websocket client: device status pushed by the cloud.
+
+The Gizwits cloud forwards every status report of a device to the apps
+subscribed to it over a websocket (wss://<m2m host>:<wss_port>/ws/app/v1).
+CloudPushConnection keeps one such socket open: it logs in with the user's
+token, subscribes to DIDs and passes the pushed attributes on. Reconnecting
+with backoff is its own job; the devices fall back to polling while it is
+down (see CloudPushManager in cloud.py).
+
+Only aiohttp and the standard library are imported, so the client can be run
+against the offline stand-in in scripts/cloud_push_standin.py.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Coroutine, Iterable
+import json
+import logging
+from typing import Any
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+WS_PATH = "/ws/app/v1"
+# Heartbeat interval announced at login; the server drops a client that
+# stays silent longer. A ping is sent every half interval.
+HEARTBEAT_INTERVAL = 60
+# Replies to login_req and subscribe_req
+RESPONSE_TIMEOUT = 10.0
+# Reconnect delay after the socket dropped, doubling up to the maximum;
+# reset by a successful login.
+RECONNECT_MIN_DELAY = 5.0
+RECONNECT_MAX_DELAY = 300.0
+
+
+class PushAuthError(Exception):
+    """The websocket login was refused (e.g. expired token)."""
+
+
+def push_url(binding: dict[str, Any]) -> str | None:
+    """Return the websocket URL of a device from its cloud binding, if known."""
+    host = binding.get("host")
+    port = binding.get("wss_port")
+    if not host or not port:
+        return None
+    return f"wss://{host}:{port}{WS_PATH}"
+
+
+def _create_task(coro: Coroutine[Any, Any, Any], name: str) -> asyncio.Task:
+    return asyncio.get_running_loop().create_task(coro, name=name)
+
+
+class CloudPushConnection:
+    """One app websocket to a Gizwits m2m server.
+
+    credentials(stale) returns (user id, token); stale is True after the
+    server refused the last token, so a fresh one should be obtained.
+    on_attrs(did, attrs) is called for every status pushed and
+    on_connected(connected) when the subscriptions come up or go down.
+    create_task(coro, name) starts the connection's tasks; Home Assistant
+    passes hass.async_create_background_task so they are tracked there.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        app_id: str,
+        credentials: Callable[[bool], Awaitable[tuple[str | None, str | None]]],
+        on_attrs: Callable[[str, dict[str, Any]], None],
+        on_connected: Callable[[bool], None],
+        create_task: Callable[[Coroutine[Any, Any, Any], str], asyncio.Task]
+        | None = None,
+    ) -> None:
+        """Initialize the connection (call start() to connect)."""
+        self.url = url
+        self._create_task = create_task or _create_task
+        self._session = session
+        self._app_id = app_id
+        self._credentials = credentials
+        self._on_attrs = on_attrs
+        self._on_connected = on_connected
+        self.dids: set[str] = set()
+        self.connected = False
+        self._ws: aiohttp.ClientWebSocketResponse | None = None
+        self._task: asyncio.Task | None = None
+        # Reply futures by command (login_res, subscribe_res)
+        self._replies: dict[str, asyncio.Future] = {}
+
+    def start(self) -> None:
+        """Start the connect/reconnect loop."""
+        if self._task is None:
+            self._task = self._create_task(self._run(), f"push {self.url}")
+
+    async def stop(self) -> None:
+        """Close the socket and stop reconnecting."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self._set_connected(False)
+
+    async def subscribe(self, dids: Iterable[str]) -> None:
+        """Add DIDs; subscribed right away if the socket is up."""
+        new = [did for did in dids if did not in self.dids]
+        self.dids.update(new)
+        if new and self.connected:
+            try:
+                await self._subscribe(new)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                # The read loop notices the broken socket and reconnects,
+                # subscribing to every DID again.
+                _LOGGER.debug("Push subscribe on %s failed: %s", self.url, exc)
+
+    def unsubscribe(self, dids: Iterable[str]) -> None:
+        """Stop passing on pushes for DIDs (the protocol has no unsubscribe)."""
+        self.dids.difference_update(dids)
+
+    async def _run(self) -> None:
+        delay = RECONNECT_MIN_DELAY
+        stale = False
+        while True:
+            try:
+                ws = await asyncio.wait_for(
+                    self._session.ws_connect(self.url, heartbeat=None),
+                    RESPONSE_TIMEOUT,
+                )
+                async with ws:
+                    self._ws = ws
+                    await self._session_loop(ws, stale)
+                _LOGGER.debug("Push socket %s closed", self.url)
+            except asyncio.CancelledError:
+                raise
+            except PushAuthError as exc:
+                _LOGGER.debug("Push login on %s refused: %s", self.url, exc)
+                stale = True
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+                _LOGGER.debug("Push socket %s failed: %s", self.url, exc)
+            except Exception:
+                _LOGGER.exception("Unexpected error on push socket %s", self.url)
+            finally:
+                self._ws = None
+                if self.connected:
+                    delay = RECONNECT_MIN_DELAY
+                    stale = False
+                self._set_connected(False)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    async def _session_loop(
+        self, ws: aiohttp.ClientWebSocketResponse, stale: bool
+    ) -> None:
+        """Log in, subscribe, then read pushes until the socket closes."""
+        reader = self._create_task(self._read(ws), f"push reader {self.url}")
+        pinger = None
+        try:
+            user_id, token = await self._credentials(stale)
+            if not user_id or not token:
+                raise PushAuthError("no user id or token")
+            reply = await self._request(
+                "login_req",
+                "login_res",
+                {
+                    "appid": self._app_id,
+                    "uid": user_id,
+                    "token": token,
+                    "p0_type": "attrs_v4",
+                    "heartbeat_interval": HEARTBEAT_INTERVAL,
+                    "auto_subscribe": False,
+                },
+            )
+            if not reply.get("success"):
+                raise PushAuthError(reply.get("msg") or "login refused")
+            pinger = self._create_task(self._ping(ws), f"push heartbeat {self.url}")
+            if self.dids:
+                await self._subscribe(list(self.dids))
+            self._set_connected(True)
+            await reader
+        finally:
+            for task in (reader, pinger):
+                if task is None:
+                    continue
+                if task.done() and not task.cancelled():
+                    task.exception()  # retrieved; the reader's is raised above
+                task.cancel()
+
+    async def _subscribe(self, dids: list[str]) -> None:
+        reply = await self._request(
+            "subscribe_req", "subscribe_res", [{"did": did} for did in dids]
+        )
+        for failed in reply.get("failed") or ():
+            _LOGGER.debug("Push subscription refused: %s", failed)
+        for did in dids:
+            # The current values, so nothing pushed while we were away is missed
+            await self._send("c2s_read", {"did": did})
+
+    async def _request(self, cmd: str, reply_cmd: str, data: Any) -> dict[str, Any]:
+        reply = self._replies[reply_cmd] = asyncio.get_running_loop().create_future()
+        await self._send(cmd, data)
+        result = await asyncio.wait_for(reply, RESPONSE_TIMEOUT)
+        return result if isinstance(result, dict) else {}
+
+    async def _send(self, cmd: str, data: Any = None) -> None:
+        if self._ws is None:
+            raise aiohttp.ClientConnectionError("not connected")
+        message: dict[str, Any] = {"cmd": cmd}
+        if data is not None:
+            message["data"] = data
+        await self._ws.send_str(json.dumps(message))
+
+    async def _ping(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL / 2)
+            await self._send("ping")
+
+    async def _read(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        try:
+            # Something (at least a pong) arrives every half heartbeat interval
+            while True:
+                msg = await ws.receive(timeout=HEARTBEAT_INTERVAL)
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    return
+                try:
+                    message = json.loads(msg.data)
+                except json.JSONDecodeError:
+                    _LOGGER.debug("Ignoring non-JSON push message: %s", msg.data[:200])
+                    continue
+                if isinstance(message, dict):
+                    self._handle(message.get("cmd"), message.get("data"))
+        finally:
+            # Fail requests still waiting for a reply right away
+            for reply in self._replies.values():
+                if not reply.done():
+                    reply.set_exception(
+                        aiohttp.ClientConnectionError("push socket closed")
+                    )
+            self._replies.clear()
+
+    def _handle(self, cmd: Any, data: Any) -> None:
+        if (reply := self._replies.pop(cmd, None)) is not None:
+            if not reply.done():
+                reply.set_result(data)
+            return
+        if not isinstance(data, dict):
+            return
+        did = data.get("did")
+        if cmd == "s2c_noti" and did in self.dids:
+            attrs = data.get("attrs")
+            if isinstance(attrs, dict) and attrs:
+                try:
+                    self._on_attrs(did, attrs)
+                except Exception:
+                    _LOGGER.exception("Error handling pushed status of %s", did)
+        elif cmd == "s2c_online_status" and did in self.dids:
+            # Availability stays with the polls, as without push
+            _LOGGER.debug("%s online: %s", did, data.get("online"))
+        elif cmd == "s2c_invalid_msg":
+            _LOGGER.debug("Push server rejected a message: %s", data)
+            reply = self._replies.pop("login_res", None)
+            if reply is not None and not reply.done():
+                # Rejected login (e.g. error_code 1009, token invalid)
+                reply.set_exception(PushAuthError(str(data.get("msg"))))
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected == self.connected:
+            return
+        self.connected = connected
+        try:
+            self._on_connected(connected)
+        except Exception:
+            _LOGGER.exception("Error in push connection callback")
@@ -11,11 +11,18 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.device_registry import format_mac
+from homeassistant.helpers.service_info.dhcp import DhcpServiceInfo
 
 from . import hub
 from .cloud import GizwitsCloudApi, did_to_uid
 from .const import (
+    CONF_CLOUD_PUSH,
     CONF_MODE,
+    CONF_OFFLINE_COMMANDS,
+    CONF_POLL_MAX_INTERVAL,
+    CONF_POLL_MIN_INTERVAL,
+    DEFAULT_POLL_MAX_INTERVAL,
+    DEFAULT_POLL_MIN_INTERVAL,
     DEFAULT_REGION,
     DOMAIN,
     MODE_CLOUD,
@@ -140,6 +147,46 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=STEP_USER_DATA_SCHEMA,
         )
 
+    async def async_step_dhcp(self, discovery_info: DhcpServiceInfo) -> FlowResult:
+        """Handle a DHCP lease for a device already in the device registry.
+
+        The dhcp matcher only covers registered devices, so this never adds
+        anything: it re-points the configured device at its new address
+        (reconnecting right away if it was offline) and aborts.
+        """
+        mac = format_mac(discovery_info.macaddress)
+        ip = discovery_info.ip
+
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            devices = entry.data.get("devices", [])
+            if not any(
+                dev.get("mac") and format_mac(dev["mac"]) == mac for dev in devices
+            ):
+                continue
+
+            if entry.state is config_entries.ConfigEntryState.LOADED and (
+                hub.handle_dhcp_sighting(entry.runtime_data.devices, mac, ip)
+            ):
+                # The running device persists a changed IP itself.
+                return self.async_abort(reason="already_configured")
+
+            # Not running (e.g. setup is being retried): fix the stored IP so
+            # the next attempt connects to the right address.
+            new_devices = [
+                {**dev, "ip": ip}
+                if dev.get("mac") and format_mac(dev["mac"]) == mac
+                else dev
+                for dev in devices
+            ]
+            if new_devices != devices:
+                _LOGGER.info("DHCP: device %s is now at %s", mac, ip)
+                self.hass.config_entries.async_update_entry(
+                    entry, data={**entry.data, "devices": new_devices}
+                )
+            return self.async_abort(reason="already_configured")
+
+        return self.async_abort(reason="not_jebao_device")
+
     async def async_step_cloud(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -182,6 +229,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                             "email": user_input["email"],
                             "password": user_input["password"],
                             "token": token,
+                            "token_expire_at": api.token_expire_at,
                             "devices": devices,
                         },
                     )
@@ -195,11 +243,25 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_manual(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Handle manual device entry."""
+        """Handle manual device entry: a single IP, a CIDR range or an IP list."""
         errors: dict[str, str] = {}
 
-        if user_input:
-            ip = user_input["ip"]
+        entered = user_input["ip"].strip() if user_input else ""
+        if "/" in entered or len(entered.replace(",", " ").split()) > 1:
+            # Broadcasts don't reach the devices (e.g. another VLAN): probe
+            # every address in one sweep, add all new devices. A single IP or
+            # host name is looked up directly below, as before.
+            try:
+                targets = hub.parse_sweep_targets(entered)
+            except ValueError:
+                errors["base"] = "invalid_address"
+            else:
+                result = await self._async_sweep(targets, errors)
+                if result is not None:
+                    return result
+
+        if user_input and not errors:
+            ip = user_input["ip"].strip()
             friendly_name = user_input["name"].strip()
 
             try:
@@ -260,6 +322,65 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def _async_sweep(
+        self, targets: list[str], errors: dict[str, str]
+    ) -> FlowResult | None:
+        """Sweep targets and add every new device found.
+
+        Returns None (with errors set) when nothing could be added.
+        """
+        try:
+            discovered = await hub.async_sweep_discovery(self.hass, targets)
+        except Exception:
+            _LOGGER.exception("Unexpected exception")
+            errors["base"] = "unknown"
+            return None
+
+        existing_uids = {
+            device["uid"]
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+            for device in entry.data.get("devices", [])
+            if "uid" in device
+        }
+        new_devices = []
+        for dev in discovered:
+            uid = dev.get("uid")
+            if not uid or uid in existing_uids:
+                continue
+            mac = dev.get("mac")
+            if mac:
+                mac = format_mac(mac)
+            new_devices.append({
+                "ip": dev["ip"],
+                "product_key": dev.get("product_key", ""),
+                "uid": uid,
+                "mac": mac,
+                "firmware_version": dev.get("firmware_version"),
+            })
+
+        if not new_devices:
+            errors["base"] = "already_configured" if discovered else "cannot_connect"
+            return None
+
+        # Only a local-mode entry can take LAN devices
+        existing_entry = next(
+            (entry for entry in self.hass.config_entries.async_entries(DOMAIN)
+             if entry.data.get(CONF_MODE, MODE_LOCAL) == MODE_LOCAL
+             and entry.data.get("devices")), None)
+        if existing_entry:
+            # New list, see note in async_step_local
+            new_data = dict(existing_entry.data)
+            new_data["devices"] = [
+                *existing_entry.data.get("devices", []),
+                *new_devices,
+            ]
+            self.hass.config_entries.async_update_entry(existing_entry, data=new_data)
+            return self.async_abort(reason="devices_added")
+        return self.async_create_entry(
+            title="Jebao Devices",
+            data={CONF_MODE: MODE_LOCAL, "devices": new_devices},
+        )
+
     @staticmethod
     def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> OptionsFlowHandler:
         """Return the options flow."""
@@ -273,13 +394,48 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
     explicitly has been rejected by Home Assistant since 2025.12.
     """
 
+    def __init__(self) -> None:
+        """Initialize the options flow."""
+        # Options as edited in the init step; every step finishes with them
+        # since creating the entry replaces all options.
+        self._options: dict[str, Any] | None = None
+
+    def _async_finish(self, description: str | None = None) -> FlowResult:
+        if self._options is None:
+            self._options = dict(self.config_entry.options)
+        return self.async_create_entry(
+            title="", data=self._options, description=description
+        )
+
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Manage the options."""
         current_mode = self.config_entry.data.get(CONF_MODE, MODE_LOCAL)
+        options = self.config_entry.options
+        errors: dict[str, str] = {}
 
-        if user_input is not None:
+        if (
+            user_input is not None
+            and CONF_POLL_MAX_INTERVAL in user_input
+            and user_input[CONF_POLL_MAX_INTERVAL] < user_input[CONF_POLL_MIN_INTERVAL]
+        ):
+            errors["base"] = "invalid_poll_intervals"
+        elif user_input is not None:
+            # Only the current mode's options were shown; keep the others.
+            self._options = {
+                **options,
+                **{
+                    key: user_input[key]
+                    for key in (
+                        CONF_POLL_MIN_INTERVAL,
+                        CONF_POLL_MAX_INTERVAL,
+                        CONF_CLOUD_PUSH,
+                        CONF_OFFLINE_COMMANDS,
+                    )
+                    if key in user_input
+                },
+            }
             new_mode = user_input.get(CONF_MODE, current_mode)
             if new_mode != current_mode:
                 if new_mode == MODE_CLOUD:
@@ -295,25 +451,53 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 await self.hass.config_entries.async_reload(
                     self.config_entry.entry_id
                 )
-                return self.async_create_entry(title="", data={})
+                return self._async_finish()
             if user_input.get("rediscover") and current_mode == MODE_LOCAL:
                 return await self.async_step_rediscover()
-            return self.async_create_entry(title="", data={})
+            return self._async_finish()
+
+        schema: dict[Any, Any] = {
+            vol.Required(CONF_MODE, default=current_mode): vol.In(
+                {
+                    MODE_LOCAL: "Local (LAN, recommended)",
+                    MODE_CLOUD: "Cloud (Gizwits API)",
+                }
+            ),
+        }
+        if current_mode == MODE_CLOUD:
+            schema.update({
+                vol.Required(
+                    CONF_POLL_MIN_INTERVAL,
+                    default=options.get(
+                        CONF_POLL_MIN_INTERVAL, DEFAULT_POLL_MIN_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+                vol.Required(
+                    CONF_POLL_MAX_INTERVAL,
+                    default=options.get(
+                        CONF_POLL_MAX_INTERVAL, DEFAULT_POLL_MAX_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+                vol.Required(
+                    CONF_CLOUD_PUSH, default=options.get(CONF_CLOUD_PUSH, False)
+                ): bool,
+            })
+        else:
+            schema.update({
+                vol.Optional("rediscover", default=False): bool,
+                vol.Required(
+                    CONF_OFFLINE_COMMANDS,
+                    default=options.get(CONF_OFFLINE_COMMANDS, False),
+                ): bool,
+            })
 
         return self.async_show_form(
             step_id="init",
-            data_schema=vol.Schema({
-                vol.Required(CONF_MODE, default=current_mode): vol.In(
-                    {
-                        MODE_LOCAL: "Local (LAN, recommended)",
-                        MODE_CLOUD: "Cloud (Gizwits API)",
-                    }
-                ),
-                vol.Optional("rediscover", default=False): bool,
-            }),
+            data_schema=vol.Schema(schema),
             description_placeholders={
                 "device_count": str(len(self.config_entry.data.get("devices", []))),
             },
+            errors=errors,
         )
 
     async def async_step_cloud(
@@ -340,12 +524,13 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         "email": user_input["email"],
                         "password": user_input["password"],
                         "token": token,
+                        "token_expire_at": api.token_expire_at,
                     },
                 )
                 await self.hass.config_entries.async_reload(
                     self.config_entry.entry_id
                 )
-                return self.async_create_entry(title="", data={})
+                return self._async_finish()
 
         return self.async_show_form(
             step_id="cloud",
@@ -412,13 +597,12 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         new_data = dict(self.config_entry.data)
         new_data["devices"] = updated_devices + new_devices
         
+        # The update listener connects new devices and re-points moved ones;
+        # the others keep their connections.
         self.hass.config_entries.async_update_entry(self.config_entry, data=new_data)
         
-        # Reload the integration to pick up changes
-        await self.hass.config_entries.async_reload(self.config_entry.entry_id)
-        
         result_message = f"Rediscovery complete. Found {len(found_uids)} devices."
         if new_devices:
             result_message += f" Added {len(new_devices)} new devices."
         
-        return self.async_create_entry(title="", data={}, description=result_message)
+        return self._async_finish(description=result_message)
@@ -5,6 +5,10 @@ DOMAIN = "jebao_aqua"
 # List of platforms that will be set up if the device has relevant datapoints.
 PLATFORMS = ["light", "sensor", "number", "select", "switch", "binary_sensor"]
 
+# Dispatched with (list of devices) when devices are added to a loaded entry;
+# format with the entry id.
+SIGNAL_DEVICES_ADDED = f"{DOMAIN}_devices_added_{{}}"
+
 # Device enum values (Chinese, from the Gizwits datapoint definitions) mapped
 # to stable slugs used as select options. HA requires option/translation keys
 # to be [a-z0-9-_]+; translations map the slugs to display names per language.
@@ -45,9 +49,38 @@ DEFAULT_MODE = MODE_LOCAL
 # Gizwits cloud API
 GIZWITS_APP_ID = "c3703c4888ec4736a3a0d9425c321604"
 CLOUD_TIMEOUT = 10
-# Poll the cloud every 30s; 2s hammered the Gizwits API (~260k req/day for
-# six devices) and provides no benefit for slow-changing pump state.
-CLOUD_UPDATE_INTERVAL = 30
+# Cloud poll interval bounds (seconds), configurable in the options. Devices
+# are polled at the minimum while their data changes and progressively less
+# often, up to the maximum, while it doesn't. Never go near the old 2s: it
+# hammered the Gizwits API (~260k req/day for six devices).
+CONF_POLL_MIN_INTERVAL = "poll_min_interval"
+CONF_POLL_MAX_INTERVAL = "poll_max_interval"
+DEFAULT_POLL_MIN_INTERVAL = 30
+DEFAULT_POLL_MAX_INTERVAL = 120
+# Optional status push over the Gizwits app websocket (cloud mode); while it
+# is up devices are only polled every PUSH_POLL_INTERVAL as a safety net.
+CONF_CLOUD_PUSH = "cloud_push"
+PUSH_POLL_INTERVAL = 900
+
+# Optional (local mode): commands to a device that cannot be reached are kept,
+# latest value per attribute, and sent once it reconnects; entities show them
+# as pending. Commands not confirmed within PENDING_COMMAND_TIMEOUT are dropped.
+CONF_OFFLINE_COMMANDS = "offline_commands"
+PENDING_COMMAND_TIMEOUT = 300
+
+# Upper bound on disconnecting one device (LAN connection or cloud poller)
+# when an entry is unloaded or Home Assistant stops; devices disconnect
+# concurrently.
+DISCONNECT_TIMEOUT = 5.0
+
+# Entities show the status saved before a restart (marked "restored") until
+# the first live status, or until the device has not been reached for this
+# long; then they become unavailable as usual.
+RESTORED_STATUS_TIMEOUT = 600
+
+# Attribute writes to one device within this many seconds (e.g. from a scene
+# setting several of its entities) are sent as one command.
+WRITE_BATCH_WINDOW = 0.1
 
 DEFAULT_REGION = "eu"
 GIZWITS_API_URLS = {
@@ -56,17 +89,20 @@ GIZWITS_API_URLS = {
         "DEVICES_URL": "https://euapi.gizwits.com/app/bindings",
         "DEVICE_DATA_URL": "https://euapi.gizwits.com/app/devdata/{device_id}/latest",
         "CONTROL_URL": "https://euapi.gizwits.com/app/control/{device_id}",
+        "USER_URL": "https://euapi.gizwits.com/app/users",
     },
     "us": {
         "LOGIN_URL": "https://usaepapp.gizwits.com/app/smart_home/login/pwd",
         "DEVICES_URL": "https://usapi.gizwits.com/app/bindings",
         "DEVICE_DATA_URL": "https://usapi.gizwits.com/app/devdata/{device_id}/latest",
         "CONTROL_URL": "https://usapi.gizwits.com/app/control/{device_id}",
+        "USER_URL": "https://usapi.gizwits.com/app/users",
     },
     "cn": {
         "LOGIN_URL": "https://aep-app.gizwits.com/app/smart_home/login/pwd",
         "DEVICES_URL": "https://api.gizwits.com/app/bindings",
         "DEVICE_DATA_URL": "https://api.gizwits.com/app/devdata/{device_id}/latest",
         "CONTROL_URL": "https://api.gizwits.com/app/control/{device_id}",
+        "USER_URL": "https://api.gizwits.com/app/users",
     },
 }
@@ -0,0 +1,75 @@
+"""Diagnostics support for Jebao Aqua integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .hub import JebaoDevice, JebaoRuntimeData
+from .sensor import parse_dosing_schedule
+
+# Credentials, and the addresses and IDs that identify the devices
+TO_REDACT = {"email", "password", "token", "ip", "mac", "uid", "did"}
+
+
+def _diagnostic_value(value: Any) -> Any:
+    """Make a status value JSON serializable (binary blobs become hex)."""
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return value
+
+
+def _device_diagnostics(device: JebaoDevice) -> dict[str, Any]:
+    """Describe one device: identity, connection, status and doser schedules."""
+    status = {
+        name: _diagnostic_value(device.get_attribute(name))
+        for name in device.entities.attrs_by_name
+    }
+    # The schedule sensors only record a summary (see sensor.py), so the
+    # parsed schedules of every dosing channel are listed here.
+    doser_schedules = {
+        str(channel): {
+            "pause_days_between_cycles": device.get_attribute(f"IntervalT{channel}"),
+            "schedule": parse_dosing_schedule(
+                device.get_attribute(f"CH{channel}SWTime")
+            ),
+        }
+        for channel in device.entities.doser_channels
+    }
+    # LAN devices only: outbound frame queue depth and wait times
+    send_queue = getattr(device.giz_device, "send_queue_stats", None)
+    return {
+        "uid": device.uid,
+        "name": device.name,
+        "product_key": device.product_key,
+        "device_type": device.device_config.get("device_type"),
+        "ip": device.ip,
+        "mac": device.mac,
+        "firmware_version": device.firmware_version,
+        "available": device.available,
+        "status": status,
+        "doser_schedules": doser_schedules,
+        "send_queue": send_queue,
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    runtime_data: JebaoRuntimeData | None = getattr(entry, "runtime_data", None)
+    devices = runtime_data.devices if runtime_data else []
+    return {
+        "entry": {
+            "title": entry.title,
+            "version": entry.version,
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "devices": async_redact_data(
+            [_device_diagnostics(device) for device in devices], TO_REDACT
+        ),
+    }
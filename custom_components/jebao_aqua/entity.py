@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
@@ -10,6 +11,7 @@ from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC, Device
 from homeassistant.helpers.entity import Entity
 
 from .const import DOMAIN
+from .gizwits_lan.models import Attribute
 from .hub import JebaoDevice
 
 
@@ -18,19 +20,20 @@ class JebaoEntity(Entity):
 
     _attr_should_poll = False
     _attr_has_entity_name = True
+    _unrecorded_attributes = frozenset({"restored", "pending"})
 
     def __init__(
         self,
         entry: ConfigEntry,
         device: JebaoDevice,
-        attr_def: dict[str, Any],
+        attr_def: Attribute,
         entity_type: str,  # e.g. "switch", "select", etc.
     ) -> None:
         """Initialize the entity."""
         self._entry = entry
         self._device = device
         self._attr_def = attr_def
-        self._attribute_name = attr_def["name"]
+        self._attribute_name = attr_def.name
 
         # Get the device's UID
         device_uid = device.uid
@@ -39,7 +42,7 @@ class JebaoEntity(Entity):
         self._attr_unique_id = f"{device_uid}_{self._attribute_name}_{entity_type}"
 
         # Set translation key based on platform type and attribute name
-        self._attr_translation_key = attr_def["name"].lower()
+        self._attr_translation_key = attr_def.name.lower()
 
         # Use product key as model if available
         model = device.product_key or "Unknown Model"
@@ -87,8 +90,26 @@ class JebaoEntity(Entity):
         """Unregister callbacks when entity is removed."""
         self._device.remove_connection_callback(self._handle_connection_state)
 
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        """Return entity attributes, flagging a restored state or queued command.
+
+        "pending" is set while a command sent during a connection outage
+        waits to be delivered and confirmed (see CONF_OFFLINE_COMMANDS).
+        """
+        attrs = super().extra_state_attributes
+        if self._device.restored:
+            attrs = {**(attrs or {}), "restored": True}
+        if self._device.command_pending(self._attribute_name):
+            attrs = {**(attrs or {}), "pending": True}
+        return attrs
+
     @callback
     def _handle_connection_state(self, connected: bool) -> None:
-        """Update availability when connection state changes."""
-        self._attr_available = connected
+        """Update availability when connection state changes.
+
+        Until the first live status after a restart, the saved status keeps
+        the entity available (see RESTORED_STATUS_TIMEOUT).
+        """
+        self._attr_available = connected or self._device.restored
         self.async_write_ha_state()
@@ -3,12 +3,16 @@
 from .device_manager import DeviceManager
 from .device import Device
 from .device_status import DeviceStatus
+from .models import Attribute, AttributePosition, UnitSpec
 from .errors import GizwitsError, ProtocolError, PasscodeError, LoginError
 
 __all__ = [
     "DeviceManager",
     "Device",
     "DeviceStatus",
+    "Attribute",
+    "AttributePosition",
+    "UnitSpec",
     "GizwitsError",
     "ProtocolError",
     "PasscodeError",
@@ -52,6 +52,7 @@ class Connection:
         self._last_pong = 0.0
         self._was_ready = False  # Track state changes
         self._callbacks = set()  # Add callback storage
+        self._kick_event = asyncio.Event()  # Set to cut a backoff sleep short
 
     @property
     def connected(self) -> bool:
@@ -79,6 +80,27 @@ class Connection:
             except Exception as e:
                 logger.error("[%s] Error in connection callback: %s", self._device_id, e)
 
+    def kick(self) -> None:
+        """
+        Retry the connection now instead of waiting out the backoff.
+
+        Called when the device has just been seen on the network (e.g. it
+        answered discovery): cancels a pending backoff sleep and resets the
+        retry interval. No-op while connected.
+        """
+        if not self._should_run or self._ready_check():
+            return
+        logger.debug("[%s] Reconnect requested; skipping backoff", self._device_id)
+        self._current_retry_interval = self._retry_interval
+        self._kick_event.set()
+
+    async def _backoff_sleep(self, delay: float) -> None:
+        """Sleep for delay seconds, returning early if kick() is called."""
+        try:
+            await asyncio.wait_for(self._kick_event.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
     async def start(self):
         """Start connection management."""
         async with self._lock:
@@ -113,6 +135,22 @@ class Connection:
             await self._disconnect_func()
             self._notify_callbacks(False)  # Notify on final disconnect
 
+    def abort(self):
+        """
+        Stop connection management without waiting for the tasks to end.
+
+        Fallback for when stop() does not finish in time; the tasks are
+        cancelled and the caller tears down the transport itself.
+        """
+        self._should_run = False
+        for task in (self._connection_task, self._keepalive_task):
+            if task:
+                task.cancel()
+        self._connection_task = None
+        self._keepalive_task = None
+        self._was_ready = False
+        self._notify_callbacks(False)
+
     async def _connection_loop(self):
         """Main connection management loop with exponential backoff."""
         while self._should_run:
@@ -133,6 +171,7 @@ class Connection:
                     if await self._connect_func():
                         self._last_success = time.time()
                         self._current_retry_interval = self._retry_interval
+                        self._kick_event.clear()
                         
                         # Start keepalive when connection established
                         if not self._keepalive_task or self._keepalive_task.done():
@@ -148,7 +187,11 @@ class Connection:
                         "[%s] Connection failed, retrying in %.1f seconds",
                         self._device_id, self._current_retry_interval
                     )
-                    await asyncio.sleep(self._current_retry_interval)
+                    await self._backoff_sleep(self._current_retry_interval)
+                    if self._kick_event.is_set():
+                        # Woken by kick(): retry right away at the base interval
+                        self._kick_event.clear()
+                        continue
                     self._current_retry_interval = min(
                         self._current_retry_interval * 2,
                         self._max_retry_interval
@@ -5,7 +5,7 @@ import logging
 import struct
 import time
 import socket  # Add this import
-from typing import Any, Optional
+from typing import Any, Mapping, Optional
 
 from .errors import PasscodeError, LoginError, ProtocolError
 from .protocol import (
@@ -17,14 +17,22 @@ from .protocol import (
 )
 from .device_status import DeviceStatus
 from .connection import Connection
+from .send_queue import SendQueue, PRIORITY_CONTROL, PRIORITY_STATUS, PRIORITY_PING
+from .models import Attribute
 
 logger = logging.getLogger(__name__)
 
+# Waiting for the peer to acknowledge a close can stall on a half-dead Wi-Fi
+# link; after this long the transport is aborted instead.
+CLOSE_TIMEOUT = 2.0
+# Default upper bound on a whole disconnect()
+DISCONNECT_TIMEOUT = 5.0
+
 def need_swapped_16bits(all_attrs) -> bool:
     for a in all_attrs:
-        pos = a["position"]
-        if pos["byte_offset"] == 0 and pos["unit"] == "bit":
-            if pos["bit_offset"] + pos["len"] > 7:
+        pos = a.position
+        if pos.byte_offset == 0 and pos.unit == "bit":
+            if pos.bit_offset + pos.len > 7:
                 return True
     return False
 
@@ -37,9 +45,9 @@ def bitgroup_bytes_at_zero(all_attrs) -> int:
     """
     max_end = 0
     for a in all_attrs:
-        pos = a["position"]
-        if pos["byte_offset"] == 0 and pos["unit"] == "bit":
-            max_end = max(max_end, pos["bit_offset"] + pos["len"])
+        pos = a.position
+        if pos.byte_offset == 0 and pos.unit == "bit":
+            max_end = max(max_end, pos.bit_offset + pos.len)
     return (max_end + 7) // 8
 
 class Device:
@@ -57,7 +65,7 @@ class Device:
         ip: Device IP address
         port: TCP port (default 12416)
         product_key: Device model identifier
-        attributes: List of attribute definitions from product JSON
+        attributes: Attribute definitions of the product (see models.Attribute)
     """
 
     def __init__(self, ip: str, port: int = 12416, product_key: str = "",
@@ -67,20 +75,27 @@ class Device:
         self.product_key = product_key
 
         self.all_attrs = attributes or []
-        self.writable_attrs = [a for a in self.all_attrs if a.get("type") == "status_writable"]
+        self.writable_attrs = [a for a in self.all_attrs if a.type == "status_writable"]
+        self._attrs_by_name = {a.name: a for a in self.all_attrs}
+        self._writable_by_name = {a.name: a for a in self.writable_attrs}
 
         self.reader: asyncio.StreamReader = None
         self.writer: asyncio.StreamWriter = None
         self._read_task: asyncio.Task = None
+        # Every frame to the device goes through here (one writer, by priority)
+        self._send_queue = SendQueue(f"{ip}:{port}")
 
         self._pending_requests = {}
         self.current_status = None 
+        # Raw bytes behind current_status; identical frames reuse its data
+        self._status_bytes: Optional[bytes] = None
 
         self.swapped_16 = need_swapped_16bits(self.all_attrs)
         # Big-endian group width; keep the historical 2-byte minimum so
         # behavior is unchanged for all existing 16-bit devices.
         self.bitgroup_bytes = max(2, bitgroup_bytes_at_zero(self.all_attrs))
         self.max_status_len = self._compute_status_len_from_all()
+        self._write_flags_len, self._write_values_len = self._compute_write_layout()
 
         self.last_pong = 0.0 # We want to try and keep our connection alive with Ping/Pongs so that we recieve status updates.
         self.ping_interval = 4 # 10 Seconds seems to be the maximum interval - anything longer and the device will close the connection.
@@ -120,18 +135,38 @@ class Device:
         """Remove a previously registered connection callback."""
         self._connection.remove_callback(callback)
 
+    def _compute_write_layout(self) -> tuple:
+        """Return (flag bytes, value bytes) of a 0x93 write for this model."""
+        if not self.writable_attrs:
+            return 0, 0
+        max_id = max(a.id for a in self.writable_attrs)
+        flags_count = (max_id // 8) + 1
+
+        max_offset = 0
+        for a in self.writable_attrs:
+            pos = a.position
+            bo = pos.byte_offset
+            end = bo + pos.len if pos.unit == "byte" else bo + 1
+            if end > max_offset:
+                max_offset = end
+        if any(a.position.byte_offset == 0 for a in self.writable_attrs):
+            # Reserve the full width of the bit group at byte 0 (2 bytes for
+            # classic devices, 3+ for dosers with >16 packed bits).
+            max_offset = max(max_offset, self.bitgroup_bytes)
+        return flags_count, max_offset
+
     def _compute_status_len_from_all(self) -> int:
         max_len = 0
         for a in self.all_attrs:
-            pos = a["position"]
-            bo = pos["byte_offset"]
-            length_bits = pos["len"]
-            if pos["unit"] == "byte":
+            pos = a.position
+            bo = pos.byte_offset
+            length_bits = pos.len
+            if pos.unit == "byte":
                 end = bo + length_bits
             elif bo == 0:
                 # Bit attrs at byte 0 belong to the packed group, which can
                 # span multiple bytes (e.g. 21 bits -> 3 bytes).
-                end = (pos["bit_offset"] + length_bits + 7) // 8
+                end = (pos.bit_offset + length_bits + 7) // 8
             else:
                 end = bo + 1
             if end > max_len:
@@ -168,9 +203,23 @@ class Device:
         if not self._connection.ready:
             raise TimeoutError("Initial connection failed")
 
-    async def disconnect(self):
-        """Stop connection management and disconnect."""
-        await self._connection.stop()
+    async def disconnect(self, timeout: float = DISCONNECT_TIMEOUT):
+        """
+        Stop connection management and disconnect.
+
+        Takes at most about timeout seconds: if the tasks have not wound
+        down by then, they are cancelled and the transport is aborted.
+        """
+        try:
+            await asyncio.wait_for(self._connection.stop(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Disconnect from %s timed out; aborting connection", self.ip)
+            self._connection.abort()
+            self._abort_transport()
+
+    def reconnect_now(self):
+        """Skip any pending reconnect backoff and try to connect immediately."""
+        self._connection.kick()
 
     async def _do_connect(self) -> bool:
         """Full connection sequence including login."""
@@ -184,7 +233,8 @@ class Device:
             except (asyncio.TimeoutError, ConnectionRefusedError, OSError) as e:
                 logger.info("Device %s not reachable: %s", self.ip, str(e))
                 return False
-            
+            self._send_queue.attach(self.writer)
+
             # Start read loop
             if self._read_task is None or self._read_task.done():
                 self._read_task = asyncio.create_task(
@@ -218,7 +268,7 @@ class Device:
 
             # Mark as connected and set initial pong time
             self._connected = True
-            self.last_pong = time.time()
+            self.last_pong = time.monotonic()
 
             # Add delay after login response (the newer ESP32C3 devices seem to send two login responses in quick succession - have a feeling if we don't wait until after the second one has been sent, things break)
             await asyncio.sleep(0.2)
@@ -245,24 +295,39 @@ class Device:
                 await self._read_task
             except asyncio.CancelledError:
                 pass
-        if self.writer:
-            self.writer.close()
+        self._send_queue.detach()
+        writer = self.writer
+        if writer:
+            writer.close()
             try:
-                await self.writer.wait_closed()
+                await asyncio.wait_for(writer.wait_closed(), CLOSE_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.debug("Close of %s not acknowledged; aborting", self.ip)
+                writer.transport.abort()
             except Exception:
                 pass
         # Reset the streams to None
         self.reader = None
         self.writer = None
 
+    def _abort_transport(self):
+        """Drop the connection immediately, without a closing handshake."""
+        self._connected = False
+        if self._read_task:
+            self._read_task.cancel()
+        self._send_queue.detach()
+        if self.writer:
+            self.writer.transport.abort()
+        self.reader = None
+        self.writer = None
+
     async def _do_ping(self) -> bool:
         """Perform a single ping and wait for pong."""
         try:
             cmd_15 = build_prefix_and_command(b"\x00\x15", b"")
             last_pong = self.last_pong
-            
-            self.writer.write(cmd_15)
-            await self.writer.drain()
+
+            await self._send_queue.send(cmd_15, PRIORITY_PING)
             
             # Wait up to pong_timeout for response
             for _ in range(3):  # Try up to 3 times
@@ -303,52 +368,39 @@ class Device:
             logger.warning("No writable attributes in this device definition.")
             return None
 
-        max_id = max(a["id"] for a in self.writable_attrs)
-        flags_count = (max_id // 8) + 1
-        attr_flags = bytearray(flags_count)
+        attr_flags = bytearray(self._write_flags_len)
+        attr_values = bytearray(self._write_values_len)
 
-        max_offset = 0
-        for a in self.writable_attrs:
-            pos = a["position"]
-            bo = pos["byte_offset"]
-            end = bo + pos["len"] if pos["unit"] == "byte" else bo + 1
-            if end > max_offset:
-                max_offset = end
-        if any(a["position"]["byte_offset"] == 0 for a in self.writable_attrs):
-            # Reserve the full width of the bit group at byte 0 (2 bytes for
-            # classic devices, 3+ for dosers with >16 packed bits).
-            max_offset = max(max_offset, self.bitgroup_bytes)
-        attr_values = bytearray(max_offset)
-
-        name_map = {a["name"]: a for a in self.writable_attrs}
         for (k, v) in updates.items():
-            if k not in name_map:
+            attr = self._writable_by_name.get(k)
+            if attr is None:
                 logger.warning("Ignoring attribute '%s' (not status_writable?).", k)
                 continue
-            self._set_one_writable_attribute(name_map[k], v, attr_flags, attr_values)
+            self._set_one_writable_attribute(attr, v, attr_flags, attr_values)
 
         seq = struct.pack(">I", int(time.time()) & 0xFFFF)
         action_byte = b"\x01"
         payload = seq + action_byte + attr_flags + attr_values
 
-        ack_payload = await self._send_command_with_seq(0x93, 0x94, seq, payload, timeout)
+        ack_payload = await self._send_command_with_seq(0x93, 0x94, seq, payload, timeout,
+                                                        PRIORITY_CONTROL)
         logger.debug("Partial update ack, seq=%s, ack_payload=%s", seq.hex(),
                      ack_payload.hex() if ack_payload else "<none>")
         return ack_payload
 
     def _set_one_writable_attribute(self, attr, user_value, attr_flags, attr_values):
-        a_id = attr["id"]
+        a_id = attr.id
         byte_index = a_id // 8
         bit_index = a_id % 8
         flags_byte = len(attr_flags) - 1 - byte_index
         attr_flags[flags_byte] |= (1 << bit_index)
 
-        pos = attr["position"]
-        bo = pos["byte_offset"]
-        bit_off = pos["bit_offset"]
-        length_bits = pos["len"]
-        dtype = attr["data_type"]
-        unit = pos["unit"]
+        pos = attr.position
+        bo = pos.byte_offset
+        bit_off = pos.bit_offset
+        length_bits = pos.len
+        dtype = attr.data_type
+        unit = pos.unit
 
         if dtype in ("bool", "enum"):
             if dtype == "bool":
@@ -369,12 +421,12 @@ class Device:
             val = int(user_value)
             attr_values[bo] = val & 0xFF
         elif dtype == "binary":
-            length_bytes = pos["len"] if unit == "byte" else (length_bits + 7) // 8
+            length_bytes = pos.len if unit == "byte" else (length_bits + 7) // 8
             val_bytes = bytes.fromhex(user_value) if isinstance(user_value, str) else user_value
             for i in range(min(length_bytes, len(val_bytes))):
                 attr_values[bo + i] = val_bytes[i]
         else:
-            logger.warning("Unsupported data_type=%s for '%s'", dtype, attr["name"])
+            logger.warning("Unsupported data_type=%s for '%s'", dtype, attr.name)
 
     ###########################################################################
     # Read Loop (Updated to Catch OSErrors)
@@ -460,7 +512,7 @@ class Device:
         # Handle Pong (cmd=0x16)
         if cmd_int == 0x16:  # Pong
             logger.debug("Pong (cmd=16) from %s", self.ip)
-            self.last_pong = time.time()
+            self.last_pong = time.monotonic()
             if isinstance(self.current_status, DeviceStatus):
                 self.current_status.last_pong = self.last_pong
             return
@@ -481,16 +533,8 @@ class Device:
                 logger.debug("Status update payload len=%d < %d, too short, ignoring", len(payload), needed)
                 return
             status_data = payload[-self.max_status_len:]
-            logger.debug("Raw status bytes: %s", ' '.join(f'{b:02x}' for b in status_data))
-            parsed_dict = self._unpack_status_data(status_data)
             # We should really validate the status data is sane first - use the datapoint model to verify 
-            self.current_status = DeviceStatus(parsed_dict)
-            logger.debug("Device status updated => %s", self.current_status)
-            for callback in self._status_callbacks:
-                try:
-                    callback(self.current_status)
-                except Exception as e:
-                    logger.error("Error in status callback: %s", e)
+            self._update_status(status_data)
             return
 
         # Handle 0x94 => Partial update ACK
@@ -511,14 +555,18 @@ class Device:
         logger.debug("Unexpected cmd=0x%02x from %s, len=%d, payload=%s", 
                     cmd_int, self.ip, len(payload), payload.hex())
 
-    async def _send_command_no_seq(self, cmd_send: int, cmd_recv: int, payload: bytes, timeout: float) -> bytes:
+    async def _send_command_no_seq(self, cmd_send: int, cmd_recv: int, payload: bytes, timeout: float,
+                                   priority: int = PRIORITY_CONTROL) -> bytes:
         cmd_send_bytes = cmd_send.to_bytes(2, "big")
         packet = build_prefix_and_command(cmd_send_bytes, payload)
         logger.debug("Sending cmd=0x%02x => expect cmd=0x%02x, payload=%s", cmd_send, cmd_recv, payload.hex())
         fut = asyncio.get_event_loop().create_future()
         self._pending_requests[(cmd_recv, None)] = fut
-        self.writer.write(packet)
-        await self.writer.drain()
+        try:
+            await self._send_queue.send(packet, priority)
+        except Exception:
+            self._pending_requests.pop((cmd_recv, None), None)
+            raise
         try:
             resp = await asyncio.wait_for(fut, timeout=timeout)
             return resp
@@ -526,14 +574,18 @@ class Device:
             self._pending_requests.pop((cmd_recv, None), None)
             raise ProtocolError(f"No response for cmd=0x{cmd_recv:02x} within {timeout}s")
 
-    async def _send_command_with_seq(self, cmd_send: int, cmd_recv: int, seq: bytes, payload: bytes, timeout: float) -> bytes:
+    async def _send_command_with_seq(self, cmd_send: int, cmd_recv: int, seq: bytes, payload: bytes, timeout: float,
+                                     priority: int = PRIORITY_CONTROL) -> bytes:
         cmd_send_bytes = cmd_send.to_bytes(2, "big")
         packet = build_prefix_and_command(cmd_send_bytes, payload)
         logger.debug("Sending cmd=0x%02x, seq=%s => expecting cmd=0x%02x", cmd_send, seq.hex(), cmd_recv)
         fut = asyncio.get_event_loop().create_future()
         self._pending_requests[(cmd_recv, seq)] = fut
-        self.writer.write(packet)
-        await self.writer.drain()
+        try:
+            await self._send_queue.send(packet, priority)
+        except Exception:
+            self._pending_requests.pop((cmd_recv, seq), None)
+            raise
         try:
             resp = await asyncio.wait_for(fut, timeout=timeout)
             return resp
@@ -541,16 +593,62 @@ class Device:
             self._pending_requests.pop((cmd_recv, seq), None)
             raise ProtocolError(f"No ack for cmd=0x{cmd_recv:02x}, seq={seq.hex()} within {timeout}s")
 
+    @property
+    def send_queue_stats(self) -> Mapping[str, Any]:
+        """Outbound queue depth, wait times and frames per write (diagnostics)."""
+        return self._send_queue.stats
+
+    @property
+    def raw_status(self) -> Optional[bytes]:
+        """Raw status bytes behind current_status (e.g. to save and restore)."""
+        return self._status_bytes
+
+    def restore_status(self, status_data: bytes) -> None:
+        """
+        Seed current_status from previously saved raw status bytes.
+
+        The snapshot is marked restored and callbacks are not notified; the
+        first live frame replaces it. Does nothing once a status is known.
+        """
+        if self.current_status is not None:
+            return
+        status_data = bytes(status_data)
+        self.current_status = DeviceStatus(self._unpack_status_data(status_data),
+                                           restored=True)
+        self._status_bytes = status_data
+
+    def _update_status(self, status_data: bytes):
+        """Publish a new status snapshot for raw status bytes and notify callbacks."""
+        status_data = bytes(status_data)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Raw status bytes: %s", status_data.hex(' '))
+        if self.current_status is not None and status_data == self._status_bytes:
+            # Unchanged values (e.g. a periodic resend): share the previous
+            # snapshot's read-only data instead of decoding again
+            data = self.current_status.data
+        else:
+            data = self._unpack_status_data(status_data)
+            self._status_bytes = status_data
+        self.current_status = DeviceStatus(data)
+        logger.debug("Device status updated => %s", self.current_status)
+
+        # Notify callbacks about status update
+        for callback in self._status_callbacks:
+            try:
+                callback(self.current_status)
+            except Exception as e:
+                logger.error("Error in status callback: %s", e)
+
     def _unpack_status_data(self, data: bytes) -> dict:
         result = {}
         for attr in self.all_attrs:
-            name = attr["name"]
-            pos = attr["position"]
-            bo = pos["byte_offset"]
-            bit_off = pos["bit_offset"]
-            length_bits = pos["len"]
-            dtype = attr["data_type"]
-            unit = pos["unit"]
+            name = attr.name
+            pos = attr.position
+            bo = pos.byte_offset
+            bit_off = pos.bit_offset
+            length_bits = pos.len
+            dtype = attr.data_type
+            unit = pos.unit
             if bo >= len(data):
                 continue
             val = None
@@ -561,7 +659,7 @@ class Device:
                 if bo < len(data):
                     val = data[bo]
             elif dtype == "binary":
-                length_bytes = pos["len"] if unit == "byte" else ((length_bits + 7) // 8)
+                length_bytes = pos.len if unit == "byte" else ((length_bits + 7) // 8)
                 end = bo + length_bytes
                 val = data[bo:end] if end <= len(data) else data[bo:]
             result[name] = val
@@ -611,24 +709,13 @@ class Device:
         # seq = struct.pack(">I", int(time.time()) & 0xFFFF)
         payload = b"\x02"  # 0x02 = Request status update
         try:
-            resp = await self._send_command_no_seq(0x90, 0x91, payload, 3)
+            resp = await self._send_command_no_seq(0x90, 0x91, payload, 3, PRIORITY_STATUS)
             if not resp or (resp[0] != 0x03 and resp[0] != 0x04):  # First byte (p0 action byte) should be 0x03 or seemingly 0x04 for status response
                 logger.warning("Status request: unexpected response format")
                 return False
             
             status_data = resp[1:]  # Skip the p0 action byte
-            logger.debug("Raw status bytes: %s", ' '.join(f'{b:02x}' for b in status_data))
-            parsed_dict = self._unpack_status_data(status_data)
-            self.current_status = DeviceStatus(parsed_dict)
-            logger.debug("Device status updated => %s", self.current_status)
-            
-            # Notify callbacks about status update
-            for callback in self._status_callbacks:
-                try:
-                    callback(self.current_status)
-                except Exception as e:
-                    logger.error("Error in status callback: %s", e)
-            
+            self._update_status(status_data)
             return True
 
         except Exception as e:
@@ -650,20 +737,17 @@ class Device:
                 self.current_status.pong_age() < self.pong_timeout)
 
     @property
-    def attributes(self) -> dict:
-        """Return the current values of all attributes."""
+    def attributes(self) -> Mapping[str, Any]:
+        """Return the current values of all attributes (read-only)."""
         return self.current_status.data if self.current_status else {}
 
     def get_attribute(self, attr_name: str) -> Any:
         """Get current value of a specific attribute."""
         return self.attributes.get(attr_name)
 
-    def get_attribute_metadata(self, attr_name: str) -> Optional[dict]:
+    def get_attribute_metadata(self, attr_name: str) -> Optional[Attribute]:
         """Get metadata for a specific attribute (type, position, etc)."""
-        for attr in self.all_attrs:
-            if attr["name"] == attr_name:
-                return attr
-        return None
+        return self._attrs_by_name.get(attr_name)
 
     def __repr__(self):
         return f"<Device {self.ip}:{self.port}, connected={self._connected}, status={self.current_status}>"
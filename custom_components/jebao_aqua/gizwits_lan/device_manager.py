@@ -2,7 +2,6 @@
 
 import asyncio
 import binascii
-import json
 import logging
 import socket
 import struct
@@ -12,6 +11,8 @@ from pathlib import Path
 from typing import Optional, Dict, List
 from .device import Device
 from .errors import GizwitsError, ProtocolError
+from .model_index import load_definition, load_index
+from .models import Attribute, parse_attributes
 from .protocol import parse_response_prefix, build_prefix_and_command
 
 logger = logging.getLogger(__name__)
@@ -49,6 +50,74 @@ def parse_cstring(data: bytes, offset: int) -> tuple[str, int]:
         
     return data[offset:end].decode('ascii', errors='ignore'), end + 1
 
+def parse_discovery_response(data: bytes, src_ip: str) -> Optional[dict]:
+    """
+    Parse a cmd=0x04 discovery reply into a device info dict.
+
+    Returns None for packets that are not discovery replies or that lack a
+    product key; raises ProtocolError for malformed packets.
+    """
+    cmd, payload = parse_response_prefix(data)
+    if cmd != b"\x00\x04":
+        logger.debug("Ignoring non-04 response from %s", src_ip)
+        return None
+
+    # Parse all fields
+    offset = 0
+    device_info = {'ip': src_ip}
+
+    # Essential fields (logged at INFO)
+    uid, offset = parse_varlen_field(payload, offset)
+    if uid:
+        device_info['uid'] = uid.hex()
+        device_info['uid_ascii'] = _hex_to_ascii_uid(device_info['uid'])
+
+    mac, offset = parse_varlen_field(payload, offset)
+    if mac:
+        device_info['mac'] = mac.hex(':')
+
+    fw_ver, offset = parse_varlen_field(payload, offset)
+    if fw_ver:
+        device_info['firmware_version'] = fw_ver.decode('ascii', errors='ignore')
+
+    prod_key, offset = parse_varlen_field(payload, offset)
+    if prod_key:
+        device_info['product_key'] = prod_key.decode('ascii', errors='ignore')
+
+    # Additional fields (logged at DEBUG)
+    if offset + 8 <= len(payload):
+        mcu_attrs = payload[offset:offset+8]
+        logger.debug("Device %s MCU attrs: %s", src_ip, mcu_attrs.hex())
+        offset += 8
+
+    api_server, offset = parse_cstring(payload, offset)
+    if api_server:
+        logger.debug("Device %s API server: %s", src_ip, api_server)
+
+    gizwits_ver, offset = parse_cstring(payload, offset)
+    if gizwits_ver:
+        logger.debug("Device %s Gizwits version: %s", src_ip, gizwits_ver)
+
+    # Only report devices with the minimum required info
+    if 'product_key' not in device_info:
+        return None
+    return device_info
+
+def _load_parsed_index(definitions_dir: Path) -> Optional[Dict[str, List[Attribute]]]:
+    """Load the model index and parse it into shared Attributes (blocking)."""
+    index = load_index(definitions_dir)
+    if index is None:
+        return None
+    # Products in the index share identical attribute dicts; the memo keeps
+    # them shared as Attributes.
+    memo: Dict[int, Attribute] = {}
+    return {product_key: parse_attributes(attrs, memo)
+            for product_key, attrs in index.items()}
+
+def _load_parsed_definition(json_file: Path) -> List[Attribute]:
+    """Load and parse a single model file (blocking)."""
+    return parse_attributes(load_definition(json_file))
+
 class DeviceManager:
     """
     DeviceManager handles device discovery and creation using JSON device definitions.
@@ -64,7 +133,10 @@ class DeviceManager:
 
     def __init__(self, definitions_dir: Optional[str] = None):
         self.definitions_dir = Path(definitions_dir) if definitions_dir else None
-        self._definition_cache: Dict[str, List[dict]] = {}
+        self._definition_cache: Dict[str, List[Attribute]] = {}
+        # Compact product index (see model_index.py), loaded once on first use
+        self._index: Optional[Dict[str, List[Attribute]]] = None
+        self._index_loaded = False
 
     async def discover_devices(self, ip: str = "255.255.255.255",
                              port: int = 12414, timeout: float = 2.0,
@@ -129,66 +201,7 @@ class DeviceManager:
                     except socket.timeout:
                         break
 
-                    try:
-                        cmd, payload = parse_response_prefix(data)
-                        if cmd != b"\x00\x04":
-                            logger.debug("Ignoring non-04 response from %s", src_ip)
-                            continue
-
-                        # Parse all fields
-                        offset = 0
-                        device_info = {'ip': src_ip}
-
-                        # Essential fields (logged at INFO)
-                        uid, offset = parse_varlen_field(payload, offset)
-                        if uid:
-                            device_info['uid'] = uid.hex()
-                            device_info['uid_ascii'] = _hex_to_ascii_uid(device_info['uid'])
-                            
-                        mac, offset = parse_varlen_field(payload, offset)
-                        if mac:
-                            device_info['mac'] = mac.hex(':')
-                            
-                        fw_ver, offset = parse_varlen_field(payload, offset)
-                        if fw_ver:
-                            device_info['firmware_version'] = fw_ver.decode('ascii', errors='ignore')
-                            
-                        prod_key, offset = parse_varlen_field(payload, offset)
-                        if prod_key:
-                            device_info['product_key'] = prod_key.decode('ascii', errors='ignore')
-
-                        # Additional fields (logged at DEBUG)
-                        if offset + 8 <= len(payload):
-                            mcu_attrs = payload[offset:offset+8]
-                            logger.debug("Device %s MCU attrs: %s", src_ip, mcu_attrs.hex())
-                            offset += 8
-                            
-                        api_server, offset = parse_cstring(payload, offset)
-                        if api_server:
-                            logger.debug("Device %s API server: %s", src_ip, api_server)
-                            
-                        gizwits_ver, offset = parse_cstring(payload, offset)
-                        if gizwits_ver:
-                            logger.debug("Device %s Gizwits version: %s", src_ip, gizwits_ver)
-
-                        # Store device if we have the minimum required info
-                        if 'product_key' in device_info:
-                            devices[src_ip] = device_info
-                            logger.info(
-                                "Found device: ip=%s mac=%s uid=%s product_key=%s fw=%s", 
-                                src_ip,
-                                device_info.get('mac', '?'),
-                                device_info.get('uid', '?'),
-                                device_info['product_key'],
-                                device_info.get('firmware_version', '?')
-                            )
-
-                    except ProtocolError as e:
-                        logger.warning("Invalid response from %s: %s", src_ip, e)
-                        continue
-                    except Exception as e:
-                        logger.error("Error processing response from %s: %s", src_ip, e)
-                        continue
+                    self._handle_discovery_datagram(data, src_ip, devices)
 
         finally:
             sock.close()
@@ -196,6 +209,99 @@ class DeviceManager:
         logger.info("Discovery completed, found %d device(s)", len(devices))
         return list(devices.values())
 
+    async def sweep_devices(self, targets: List[str], port: int = 12414,
+                            timeout: float = 2.0, rate: float = 200.0,
+                            retry_count: int = 2) -> list:
+        """
+        Unicast discovery sweep over a list of addresses.
+
+        For networks where broadcasts are filtered (e.g. pumps on a separate
+        VLAN): the discovery probe is sent to every target from a single
+        socket, paced to at most `rate` packets per second so the sweep does
+        not flood the router or the ESP8266s, and all replies are gathered on
+        that socket while sending.
+
+        Args:
+            targets: IP addresses to probe
+            port: UDP port for discovery
+            timeout: Time to keep listening after the last probe is sent
+            rate: Maximum probes per second
+            retry_count: Number of passes over the targets still silent
+
+        Returns:
+            List of discovered devices
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("0.0.0.0", 0))
+        sock.setblocking(False)
+
+        devices = {}
+        send_interval = 1.0 / rate if rate > 0 else 0.0
+
+        try:
+            for i in range(retry_count):
+                pending = [ip for ip in targets if ip not in devices]
+                if not pending:
+                    break
+                logger.debug("Sweep pass %d/%d: probing %d address(es) on port %d",
+                             i + 1, retry_count, len(pending), port)
+                for ip in pending:
+                    try:
+                        sock.sendto(DISCOVERY_REQUEST, (ip, port))
+                    except OSError as e:
+                        # e.g. no route to host; the rest of the sweep goes on
+                        logger.debug("Could not probe %s: %s", ip, e)
+                    self._drain_discovery_socket(sock, devices)
+                    await asyncio.sleep(send_interval)
+
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                self._drain_discovery_socket(sock, devices)
+                await asyncio.sleep(0.05)
+            self._drain_discovery_socket(sock, devices)
+        finally:
+            sock.close()
+
+        logger.info("Sweep of %d address(es) completed, found %d device(s)",
+                    len(targets), len(devices))
+        return list(devices.values())
+
+    def _drain_discovery_socket(self, sock: socket.socket, devices: dict) -> None:
+        """Read every datagram currently queued on a non-blocking socket."""
+        while True:
+            try:
+                data, (src_ip, src_port) = sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                # ICMP port unreachable from a probed host surfaces here
+                logger.debug("Discovery socket error: %s", e)
+                continue
+            self._handle_discovery_datagram(data, src_ip, devices)
+
+    def _handle_discovery_datagram(self, data: bytes, src_ip: str, devices: dict) -> None:
+        """Parse one discovery reply and record it in devices (keyed by IP)."""
+        try:
+            device_info = parse_discovery_response(data, src_ip)
+        except ProtocolError as e:
+            logger.warning("Invalid response from %s: %s", src_ip, e)
+            return
+        except Exception as e:
+            logger.error("Error processing response from %s: %s", src_ip, e)
+            return
+        if device_info is None:
+            return
+        devices[src_ip] = device_info
+        logger.info(
+            "Found device: ip=%s mac=%s uid=%s product_key=%s fw=%s",
+            src_ip,
+            device_info.get('mac', '?'),
+            device_info.get('uid', '?'),
+            device_info['product_key'],
+            device_info.get('firmware_version', '?')
+        )
+
     async def create_device(self, ip: str, product_key: str, port: int = 12416) -> Device:
         """
         Create a Device instance.
@@ -215,17 +321,22 @@ class DeviceManager:
         return Device(ip=ip, port=port, product_key=product_key,
                      attributes=all_attrs)
 
-    async def _load_device_definition(self, product_key: str) -> List[dict]:
+    async def _load_device_definition(self, product_key: str) -> List[Attribute]:
         """
-        Load the <product_key>.json from definitions_dir.
-        We do NOT filter by 'type'. The Device code will handle partial updates
-        for 'status_writable' only, but we parse all attributes for status.
+        Load the attribute definitions for a product key.
+
+        Served from the compact model index (read once, in an executor);
+        products missing from it fall back to <product_key>.json in
+        definitions_dir. We do NOT filter by 'type'. The Device code will
+        handle partial updates for 'status_writable' only, but we parse all
+        attributes for status. The returned Attributes are shared by every
+        device of the product; they are immutable.
 
         Args:
             product_key: Product key identifying the device model
 
         Returns:
-            List of attribute dictionaries
+            List of Attributes
         """
         if product_key in self._definition_cache:
             return self._definition_cache[product_key]
@@ -233,19 +344,23 @@ class DeviceManager:
         if not self.definitions_dir:
             raise FileNotFoundError("No definitions_dir specified for loading product definitions")
 
-        json_file = self.definitions_dir / f"{product_key}.json"
-        if not json_file.is_file():
-            raise FileNotFoundError(f"Device definition not found: {json_file}")
-
-        logger.debug("Loading definition for %s from %s", product_key, json_file)
         loop = asyncio.get_running_loop()
-        content = await loop.run_in_executor(None, json_file.read_text, "utf-8-sig")
-        data = json.loads(content)
-
-        all_attrs = []
-        for ent in data.get("entities", []):
-            for at in ent.get("attrs", []):
-                all_attrs.append(at)
+        if not self._index_loaded:
+            self._index = await loop.run_in_executor(
+                None, _load_parsed_index, self.definitions_dir)
+            self._index_loaded = True
+            if self._index is None:
+                logger.debug("No model index in %s; loading model files individually",
+                             self.definitions_dir)
+
+        if self._index and product_key in self._index:
+            all_attrs = self._index[product_key]
+        else:
+            json_file = self.definitions_dir / f"{product_key}.json"
+            if not json_file.is_file():
+                raise FileNotFoundError(f"Device definition not found: {json_file}")
+            logger.debug("Loading definition for %s from %s", product_key, json_file)
+            all_attrs = await loop.run_in_executor(None, _load_parsed_definition, json_file)
 
         self._definition_cache[product_key] = all_attrs
         return all_attrs
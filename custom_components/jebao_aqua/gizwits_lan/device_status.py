@@ -1,36 +1,49 @@
 # device_status.py
 from dataclasses import dataclass, field
 import time
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 
-@dataclass
+@dataclass(slots=True)
 class DeviceStatus:
     """
     Represents a snapshot of device status at a point in time.
-    
+
     Attributes:
-        data: Dict mapping attribute names to their current values
-        timestamp: When this status was received/created
-        last_pong: Time of last pong response (for availability tracking)
-    
+        data: Read-only mapping of attribute names to their current values.
+            A plain dict is wrapped (not copied), so the producer hands it
+            over and must not modify it afterwards; snapshots with unchanged
+            values can then share the same mapping.
+        timestamp: When this status was received/created (time.monotonic())
+        last_pong: Time of last pong response (for availability tracking,
+            time.monotonic()); defaults to timestamp
+        restored: True for a snapshot rebuilt from saved data rather than
+            received from the device
+
     Methods:
         age(): How old this status data is
         pong_age(): How long since last pong response
     """
-    data: Dict[str, Any] = field(default_factory=dict)
-    timestamp: float = field(default_factory=time.time)
-    last_pong: float = field(default_factory=time.time)
+    data: Mapping[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.monotonic)
+    last_pong: Optional[float] = None
+    restored: bool = False
+
+    def __post_init__(self):
+        if not isinstance(self.data, MappingProxyType):
+            self.data = MappingProxyType(self.data)
+        if self.last_pong is None:
+            self.last_pong = self.timestamp
 
     def age(self) -> float:
         """
         Return how many seconds have passed since this status snapshot was created.
         """
-        return time.time() - self.timestamp
+        return time.monotonic() - self.timestamp
 
     def pong_age(self) -> float:
         """
         Return how many seconds have passed since the last pong response.
         Can be used to determine if device is still responsive.
         """
-        return time.time() - self.last_pong
-
+        return time.monotonic() - self.last_pong
@@ -0,0 +1,170 @@
+# gizwits_lan/model_index.py
+"""
+Compact index of Gizwits product definitions.
+
+The per-product model files are mostly pretty-printing, Chinese
+display_name/desc text and app UI layout that the runtime never reads.
+build_index() reduces all of them to a single file holding only the
+attribute fields the codec and the platforms need, which DeviceManager loads
+once instead of parsing a full model file per product key.
+
+The index is generated, not edited. After adding or changing a model file run
+
+    python custom_components/jebao_aqua/gizwits_lan/model_index.py
+
+and use --check (e.g. in CI) to verify it matches the source files. This
+module only uses the standard library so it runs without Home Assistant.
+"""
+
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "model_index.json"
+INDEX_VERSION = 1
+
+# Files in the models directory that are not product definitions.
+NON_MODEL_FILES = {INDEX_FILENAME, "device_configs.json"}
+
+# Attribute fields kept in the index; everything else is documentation.
+ATTR_FIELDS = ("id", "name", "type", "data_type", "position", "enum", "uint_spec")
+
+
+def compact_attr(attr: dict) -> dict:
+    """Return only the fields of an attribute definition used at runtime."""
+    return {key: attr[key] for key in ATTR_FIELDS if key in attr}
+
+
+def load_definition(json_file: Path) -> List[dict]:
+    """Parse a full model file into its flat attribute list."""
+    data = json.loads(json_file.read_text(encoding="utf-8-sig"))
+    return [at for ent in data.get("entities", []) for at in ent.get("attrs", [])]
+
+
+def model_files(models_dir: Path) -> List[Path]:
+    """Return the product definition files in models_dir, sorted by name."""
+    return sorted(
+        path for path in Path(models_dir).glob("*.json")
+        if path.name not in NON_MODEL_FILES
+    )
+
+
+def build_index(models_dir: Path) -> dict:
+    """
+    Build the compact index for every model file in models_dir.
+
+    Many products share identical attribute definitions (e.g. the return
+    pump family), so attributes are stored once in a shared table and each
+    product lists indexes into it; loading then shares the objects too.
+    """
+    table: List[dict] = []
+    positions: Dict[str, int] = {}
+    products = {}
+    for path in model_files(models_dir):
+        refs = []
+        for attr in load_definition(path):
+            attr = compact_attr(attr)
+            key = json.dumps(attr, ensure_ascii=False, sort_keys=True)
+            if key not in positions:
+                positions[key] = len(table)
+                table.append(attr)
+            refs.append(positions[key])
+        products[path.stem] = refs
+    return {"version": INDEX_VERSION, "attrs": table, "products": products}
+
+
+def expand_index(index: dict) -> Dict[str, List[dict]]:
+    """Resolve an index into a product_key -> attribute list mapping."""
+    table = index.get("attrs", [])
+    return {
+        product_key: [table[ref] for ref in refs]
+        for product_key, refs in index.get("products", {}).items()
+    }
+
+
+def dump_index(index: dict) -> str:
+    """Serialize an index compactly (enum values stay readable UTF-8)."""
+    return json.dumps(index, ensure_ascii=False, separators=(",", ":"),
+                      sort_keys=True) + "\n"
+
+
+def validate_index(index: dict, models_dir: Path) -> List[str]:
+    """Compare an index against the source model files; return the problems."""
+    problems = []
+    if index.get("version") != INDEX_VERSION:
+        problems.append(f"index version {index.get('version')} != {INDEX_VERSION}")
+    try:
+        indexed = expand_index(index)
+    except (IndexError, TypeError) as e:
+        return problems + [f"index is malformed: {e}"]
+    expected = {
+        path.stem: [compact_attr(at) for at in load_definition(path)]
+        for path in model_files(models_dir)
+    }
+    for product_key in sorted(expected.keys() - indexed.keys()):
+        problems.append(f"{product_key}: missing from index")
+    for product_key in sorted(indexed.keys() - expected.keys()):
+        problems.append(f"{product_key}: in index but has no model file")
+    for product_key in sorted(expected.keys() & indexed.keys()):
+        if indexed[product_key] != expected[product_key]:
+            problems.append(f"{product_key}: index is out of date")
+    return problems
+
+
+def load_index(models_dir: Path) -> Optional[Dict[str, List[dict]]]:
+    """
+    Load the index from models_dir (blocking; run it in an executor).
+
+    Returns a product_key -> attribute list mapping, or None if there is no
+    usable index (callers then fall back to the individual model files).
+    """
+    index_file = Path(models_dir) / INDEX_FILENAME
+    if not index_file.is_file():
+        return None
+    try:
+        index = json.loads(index_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read model index %s: %s", index_file, e)
+        return None
+    if index.get("version") != INDEX_VERSION:
+        logger.warning("Ignoring model index %s with version %s",
+                       index_file, index.get("version"))
+        return None
+    try:
+        return expand_index(index)
+    except (IndexError, TypeError) as e:
+        logger.warning("Ignoring malformed model index %s: %s", index_file, e)
+        return None
+
+
+def main(argv: List[str]) -> int:
+    """Regenerate the index, or with --check verify it is current."""
+    models_dir = Path(__file__).resolve().parent.parent / "models"
+    index_file = models_dir / INDEX_FILENAME
+
+    if "--check" in argv:
+        if not index_file.is_file():
+            print(f"{index_file} does not exist")
+            return 1
+        index = json.loads(index_file.read_text(encoding="utf-8"))
+        problems = validate_index(index, models_dir)
+        for problem in problems:
+            print(problem)
+        if problems:
+            print("Model index is stale; regenerate it with model_index.py")
+            return 1
+        print(f"Model index is up to date ({len(index['products'])} products)")
+        return 0
+
+    index = build_index(models_dir)
+    index_file.write_text(dump_index(index), encoding="utf-8")
+    print(f"Wrote {index_file} ({len(index['products'])} products)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
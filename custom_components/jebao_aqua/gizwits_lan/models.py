@@ -1,14 +1,14 @@
 from dataclasses import dataclass
-from typing import Literal, TypedDict, Optional, List, Dict, Union
+from typing import Literal, TypedDict, Optional, List, Dict, Tuple, Union
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AttributePosition:
     byte_offset: int
     bit_offset: int
     len: int
     unit: Literal["bit", "byte"]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UnitSpec:
     """Specs for numeric attribute types"""
     min: int
@@ -16,6 +16,58 @@ class UnitSpec:
     ratio: int
     addition: int
 
+_NO_POSITION = AttributePosition(0, 0, 0, "byte")
+
+@dataclass(frozen=True, slots=True)
+class Attribute:
+    """
+    Parsed attribute definition.
+
+    Built once per product definition (see parse_attributes) and shared by
+    every device, entity and status decode of that product. Only name is
+    required so integrations can describe derived, non-model attributes too.
+    """
+    name: str
+    id: int = 0
+    type: str = "status"
+    data_type: str = "binary"
+    position: AttributePosition = _NO_POSITION
+    enum: Tuple[str, ...] = ()
+    uint_spec: Optional[UnitSpec] = None
+
+    @classmethod
+    def from_dict(cls, attr: dict) -> "Attribute":
+        """Build an Attribute from a model JSON attribute definition."""
+        uint_spec = attr.get("uint_spec")
+        return cls(
+            name=attr["name"],
+            id=attr["id"],
+            type=attr["type"],
+            data_type=attr["data_type"],
+            position=AttributePosition(**attr["position"]),
+            enum=tuple(attr.get("enum") or ()),
+            uint_spec=UnitSpec(**uint_spec) if uint_spec else None,
+        )
+
+def parse_attributes(attrs: List[dict],
+                     memo: Optional[Dict[int, Attribute]] = None) -> List[Attribute]:
+    """
+    Parse model JSON attribute definitions into Attributes.
+
+    memo maps id() of already parsed dicts to their Attribute, so definitions
+    shared between products (see model_index.py) stay shared once parsed.
+    The caller must keep the source dicts alive while reusing a memo.
+    """
+    if memo is None:
+        return [Attribute.from_dict(a) for a in attrs]
+    parsed = []
+    for a in attrs:
+        attr = memo.get(id(a))
+        if attr is None:
+            attr = memo[id(a)] = Attribute.from_dict(a)
+        parsed.append(attr)
+    return parsed
+
 class AttributeDefinition(TypedDict):
     """Full attribute definition matching JSON schema"""
     id: int
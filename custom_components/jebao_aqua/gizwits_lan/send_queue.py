@@ -0,0 +1,148 @@
+# gizwits_lan/send_queue.py
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Frame priorities, most urgent first
+PRIORITY_CONTROL = 0  # user commands (0x93 writes) and the login handshake
+PRIORITY_STATUS = 1   # status requests (0x90)
+PRIORITY_PING = 2     # keepalives (0x15)
+
+PRIORITY_NAMES = {
+    PRIORITY_CONTROL: "control",
+    PRIORITY_STATUS: "status",
+    PRIORITY_PING: "ping",
+}
+
+
+class SendQueue:
+    """
+    Outbound frames of one device, written by a single task.
+
+    Frames queued while the previous write is still draining (or within the
+    same event loop iteration) are ordered by priority and sent together in
+    one write, so a keepalive never goes out ahead of a user command and
+    concurrent senders cannot interleave. The queue outlives reconnects:
+    attach() binds it to the stream of each new connection, detach() fails
+    whatever was not sent. Counters are kept for diagnostics (see stats).
+    """
+
+    def __init__(self, device_id: str):
+        self._device_id = device_id
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        # (priority, order, frame, queued at, future)
+        self._queue: List[Tuple[int, int, bytes, float, asyncio.Future]] = []
+        self._order = 0
+
+        self.frames_sent = 0
+        self.writes = 0
+        self.max_depth = 0
+        # priority -> [frames, total wait, max wait] (seconds)
+        self._waits: Dict[int, List[float]] = {
+            priority: [0, 0.0, 0.0] for priority in PRIORITY_NAMES
+        }
+
+    @property
+    def depth(self) -> int:
+        """Number of frames waiting to be written."""
+        return len(self._queue)
+
+    def attach(self, writer: asyncio.StreamWriter) -> None:
+        """Start writing queued frames to a (new) connection."""
+        self.detach()
+        self._writer = writer
+        self._task = asyncio.create_task(
+            self._write_loop(), name=f"send_queue_{self._device_id}"
+        )
+
+    def detach(self) -> None:
+        """Stop writing and fail the frames still queued (connection closed)."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._writer = None
+        self._fail_queued(ConnectionError("Device connection closed"))
+
+    async def send(self, frame: bytes, priority: int = PRIORITY_CONTROL) -> None:
+        """Queue a frame and wait until it has been written and drained."""
+        if self._writer is None:
+            raise ConnectionError("Device not connected")
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.append((priority, self._order, frame, time.monotonic(), fut))
+        self._order += 1
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._wakeup.set()
+        await fut
+
+    async def _write_loop(self) -> None:
+        writer = self._writer
+        batch: List[Tuple[int, int, bytes, float, asyncio.Future]] = []
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                if not self._queue:
+                    continue
+                batch, self._queue = sorted(self._queue), []
+                now = time.monotonic()
+                for priority, _order, _frame, queued_at, _fut in batch:
+                    waits = self._waits.setdefault(priority, [0, 0.0, 0.0])
+                    waits[0] += 1
+                    waits[1] += now - queued_at
+                    waits[2] = max(waits[2], now - queued_at)
+                try:
+                    writer.write(b"".join(frame for _p, _o, frame, _q, _f in batch))
+                    await writer.drain()
+                except Exception as e:
+                    for *_rest, fut in batch:
+                        if not fut.done():
+                            fut.set_exception(e)
+                    batch = []
+                    # The read loop notices the broken connection; keep
+                    # failing what is queued until detach()
+                    continue
+                self.writes += 1
+                self.frames_sent += len(batch)
+                if len(batch) > 1:
+                    logger.debug("[%s] Sent %d frames in one write",
+                                 self._device_id, len(batch))
+                for *_rest, fut in batch:
+                    if not fut.done():
+                        fut.set_result(None)
+                batch = []
+        except asyncio.CancelledError:
+            # Frames of an interrupted write are lost with the connection
+            for *_rest, fut in batch:
+                if not fut.done():
+                    fut.set_exception(ConnectionError("Device connection closed"))
+            raise
+
+    def _fail_queued(self, exc: Exception) -> None:
+        queue, self._queue = self._queue, []
+        for *_rest, fut in queue:
+            if not fut.done():
+                fut.set_exception(exc)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and per-priority wait times (milliseconds)."""
+        wait = {}
+        for priority, (frames, total, longest) in self._waits.items():
+            wait[PRIORITY_NAMES.get(priority, str(priority))] = {
+                "frames": int(frames),
+                "avg_ms": round(1000 * total / frames, 2) if frames else None,
+                "max_ms": round(1000 * longest, 2),
+            }
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "frames_sent": self.frames_sent,
+            "writes": self.writes,
+            "wait": wait,
+        }
@@ -3,23 +3,46 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable, Collection, Mapping
+from dataclasses import dataclass, field
+import ipaddress
 import json
 import logging
 from pathlib import Path
-from typing import Any
-
-from homeassistant.core import HomeAssistant
-
-from .gizwits_lan import DeviceManager, DeviceStatus, GizwitsError
+import time
+from types import MappingProxyType
+from typing import Any, NamedTuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.device_registry import format_mac
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    DISCONNECT_TIMEOUT,
+    MODE_LOCAL,
+    PENDING_COMMAND_TIMEOUT,
+    RESTORED_STATUS_TIMEOUT,
+    WRITE_BATCH_WINDOW,
+)
+from .gizwits_lan import Attribute, DeviceManager, DeviceStatus, GizwitsError
+from .storage import DeviceDataUpdates, JebaoStatusStore, async_get_status_store
 
 _LOGGER = logging.getLogger(__name__)
 
-_DEVICE_CONFIGS = None
+_DEVICE_CONFIGS: dict[str, Mapping[str, Any]] | None = None
+_EMPTY_CONFIG: Mapping[str, Any] = MappingProxyType({})
+
+# Upper bound on a sweep so a typo like /8 can't send 16M probes (a /22).
+MAX_SWEEP_ADDRESSES = 1024
 
 # We'll keep a single global manager reference to reuse across the integration.
 _GLOBAL_MANAGER: DeviceManager | None = None
 
+# Connected (or reconnecting) devices by UID, so that every discovery result -
+# setup, another device's rediscovery, a config flow sweep - can wake up a
+# device that is waiting out its reconnect backoff.
+_ACTIVE_DEVICES: dict[str, JebaoDevice] = {}
+
 
 async def get_manager(hass: HomeAssistant) -> DeviceManager:
     """Return a singleton DeviceManager for the integration, creating it if necessary."""
@@ -57,6 +80,7 @@ async def async_discover_devices(
         retry_count=10, # These things have naff antennas and are on 2.4GHz...
         retry_delay=0.3,
     )
+    _dispatch_sightings(found)
     return found
 
 
@@ -70,6 +94,7 @@ async def async_directed_discovery(
     found = await manager.discover_devices(
         ip=ip, port=12414, timeout=timeout, retry_count=3, retry_delay=0.3
     )
+    _dispatch_sightings(found)
     # Filter out to find the device that exactly matches the IP (if any).
     for dev in found:
         if dev["ip"] == ip:
@@ -77,22 +102,139 @@ async def async_directed_discovery(
     return None
 
 
-async def _load_device_configs() -> dict:
-    """Load device_configs.json from disk (only once)."""
+def parse_sweep_targets(text: str) -> list[str]:
+    """Expand a CIDR range and/or a list of IPs into individual addresses.
+
+    Accepts e.g. "192.168.20.0/24" or "192.168.1.10, 192.168.1.11" (comma or
+    whitespace separated, ranges and single addresses may be mixed). Raises
+    ValueError for anything that is not IPv4 or expands to more than
+    MAX_SWEEP_ADDRESSES addresses.
+    """
+    targets: dict[str, None] = {}  # ordered, de-duplicated
+    for token in text.replace(",", " ").split():
+        if "/" in token:
+            network = ipaddress.ip_network(token, strict=False)
+            if network.version != 4:
+                raise ValueError(f"Not an IPv4 range: {token}")
+            if network.num_addresses > MAX_SWEEP_ADDRESSES + 2:
+                raise ValueError(f"Range too large: {token}")
+            hosts = network.hosts() if network.prefixlen < 31 else network
+            for address in hosts:
+                targets[str(address)] = None
+        else:
+            address = ipaddress.ip_address(token)
+            if address.version != 4:
+                raise ValueError(f"Not an IPv4 address: {token}")
+            targets[str(address)] = None
+        if len(targets) > MAX_SWEEP_ADDRESSES:
+            raise ValueError("Too many addresses")
+    if not targets:
+        raise ValueError("No addresses given")
+    return list(targets)
+
+
+async def async_sweep_discovery(
+    hass: HomeAssistant, targets: list[str], timeout: float = 2.0
+) -> list[dict[str, Any]]:
+    """Probe every address in targets with a unicast discovery packet.
+
+    Used where broadcasts don't reach the pumps (separate VLAN/subnet); a
+    whole /24 is swept in a couple of seconds.
+    """
+    manager = await get_manager(hass)
+    found = await manager.sweep_devices(targets, port=12414, timeout=timeout)
+    _dispatch_sightings(found)
+    return found
+
+
+def _dispatch_sightings(found: list[dict[str, Any]]) -> None:
+    """Tell active devices that discovery just saw them (and where)."""
+    for dev in found:
+        device = _ACTIVE_DEVICES.get(dev.get("uid"))
+        if device is not None:
+            device.handle_sighting(dev["ip"])
+
+
+def handle_dhcp_sighting(devices: list[JebaoDevice], mac: str, ip: str) -> bool:
+    """Re-point the device with this (formatted) MAC at a new DHCP lease.
+
+    Home Assistant's dhcp watcher sees lease changes passively, so a pump
+    that moved is reconnected without waiting for a discovery broadcast.
+    Returns True if one of devices has that MAC.
+    """
+    matched = False
+    for device in devices:
+        if device.mac and format_mac(device.mac) == mac:
+            matched = True
+            device.handle_sighting(ip)
+    return matched
+
+
+def _resolve_device_configs(raw_configs: dict) -> dict[str, Mapping[str, Any]]:
+    """Flatten 'inherits' chains in device_configs.json into frozen configs.
+
+    Each platform allow-list becomes a frozenset (a child's lists extend its
+    parent's), other keys are inherited unless the child overrides them, and
+    the results are read-only so every device can share them. Entries whose
+    chain has a cycle or names an unknown parent are logged and left out, as
+    if the product key were not listed at all.
+    """
+    resolved: dict[str, Mapping[str, Any]] = {}
+
+    def resolve(key: str, chain: tuple[str, ...]) -> Mapping[str, Any] | None:
+        if key in resolved:
+            return resolved[key]
+        if key in chain:
+            raise ValueError(f"inheritance cycle {' -> '.join((*chain, key))}")
+        cfg = raw_configs[key]
+        parent_key = cfg.get("inherits")
+        if parent_key is None:
+            platforms: dict[str, frozenset[str]] = {}
+            merged: dict[str, Any] = {}
+        elif parent_key not in raw_configs:
+            raise ValueError(f"unknown parent '{parent_key}'")
+        else:
+            parent = resolve(parent_key, (*chain, key))
+            platforms = dict(parent["platforms"])
+            merged = dict(parent)
+
+        for name, value in cfg.items():
+            if name not in ("inherits", "platforms"):
+                merged[name] = value
+        for platform, attrs in cfg.get("platforms", {}).items():
+            platforms[platform] = platforms.get(platform, frozenset()) | frozenset(attrs)
+        merged["platforms"] = MappingProxyType(platforms)
+
+        resolved[key] = MappingProxyType(merged)
+        return resolved[key]
+
+    configs: dict[str, Mapping[str, Any]] = {}
+    for key in raw_configs:
+        try:
+            configs[key] = resolve(key, ())
+        except ValueError as e:
+            _LOGGER.error("Ignoring device config %s: %s", key, e)
+    return configs
+
+
+def _read_device_configs(config_file: Path) -> dict[str, Mapping[str, Any]]:
+    """Read and resolve device_configs.json (blocking)."""
+    # Use utf-8-sig to handle files with BOM
+    raw = json.loads(config_file.read_text(encoding="utf-8-sig"))
+    return _resolve_device_configs(raw.get("device_configs", {}))
+
+
+async def _load_device_configs() -> dict[str, Mapping[str, Any]]:
+    """Load and resolve device_configs.json from disk (only once)."""
     global _DEVICE_CONFIGS
     if _DEVICE_CONFIGS is not None:
         return _DEVICE_CONFIGS
 
     config_file = Path(__file__).parent / "models" / "device_configs.json"
 
-    # Use aiofiles for async file operations
     try:
-        # Use utf-8-sig to handle files with BOM
-        _DEVICE_CONFIGS = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: json.loads(config_file.read_text(encoding="utf-8-sig")).get(
-                "device_configs", {}
-            ),
+        _DEVICE_CONFIGS = await asyncio.get_running_loop().run_in_executor(
+            None, _read_device_configs, config_file
         )
         return _DEVICE_CONFIGS
     except Exception as e:
@@ -100,51 +242,255 @@ async def _load_device_configs() -> dict:
         return {}
 
 
-def _merge_config(base_config: dict, child_config: dict) -> dict:
-    """Merge 'child_config' with 'base_config', returning a new dict."""
-    # This helper stays sync since it's just dict operations
-    merged = dict(base_config)
-    base_platforms = base_config.get("platforms", {})
-    child_platforms = child_config.get("platforms", {})
+async def get_device_config_for_product_key(product_key: str) -> Mapping[str, Any]:
+    """Return the resolved config from device_configs.json for a product_key.
+
+    The result is read-only and shared: inheritance is already flattened and
+    config["platforms"][platform] is a frozenset of attribute names. Unknown
+    product keys get an empty mapping.
+    """
+    device_configs = await _load_device_configs()
+    return device_configs.get(product_key, _EMPTY_CONFIG)
+
+
+async def async_load_product_attrs(
+    hass: HomeAssistant, product_key: str
+) -> list[Attribute]:
+    """Load the full (shared, immutable) attribute list for a product key.
 
-    merged_platforms = {}
-    for platform_name, attrs in base_platforms.items():
-        merged_platforms[platform_name] = list(attrs)
+    Raises FileNotFoundError if no definition exists for the product key.
+    """
+    manager = await get_manager(hass)
+    return await manager._load_device_definition(product_key)
 
-    for platform_name, attrs in child_platforms.items():
-        if platform_name not in merged_platforms:
-            merged_platforms[platform_name] = []
-        merged_platforms[platform_name].extend(attrs)
 
-    merged["platforms"] = merged_platforms
+class ProductEntities(NamedTuple):
+    """The attributes of one product that become entities, per platform."""
 
-    if "device_type" in child_config:
-        merged["device_type"] = child_config["device_type"]
-    return merged
+    # Platform name ("switch", "number", ...) -> eligible attribute defs,
+    # in model order.
+    platforms: Mapping[str, tuple[Attribute, ...]]
+    # Doser channels with schedule/volume sensors.
+    doser_channels: tuple[int, ...]
+    # Attribute name -> attribute def, for every attribute of the product.
+    attrs_by_name: Mapping[str, Attribute]
 
+    @property
+    def used_platforms(self) -> frozenset[str]:
+        """Platforms with at least one entity for this product."""
+        used = {platform for platform, attrs in self.platforms.items() if attrs}
+        if self.doser_channels:
+            used.add("sensor")
+        return frozenset(used)
+
+
+@dataclass
+class JebaoRuntimeData:
+    """What a loaded config entry keeps in entry.runtime_data."""
+
+    # JebaoDevice (LAN) or JebaoCloudDevice, which mirrors its interface.
+    devices: list[JebaoDevice]
+    # CONF_MODE the devices were started in.
+    mode: str = MODE_LOCAL
+    # GizwitsCloudApi shared by the devices in cloud mode.
+    api: Any = None
+    # Device UIDs in the entry at the last sync (see the update listener).
+    known_uids: set[str] = field(default_factory=set)
+    # Batched writes of runtime device data changes (LAN mode).
+    device_updates: DeviceDataUpdates | None = None
+    # Platforms forwarded so far; only those some device has entities on.
+    platforms: set[str] = field(default_factory=set)
+    # Serializes update listener runs.
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+def _is_writable(attr: Attribute, data_type: str) -> bool:
+    return attr.type == "status_writable" and attr.data_type == data_type
+
+
+# Per-platform rules, on top of the device_configs.json allow-list, for an
+# attribute to become an entity: fn(attr_def, device_type) -> bool.
+_PLATFORM_RULES: dict[str, Callable[[Attribute, str | None], bool]] = {
+    "binary_sensor": lambda attr, _: (
+        attr.type == "fault" and attr.data_type == "bool"
+    ),
+    "light": lambda attr, device_type: (
+        device_type == "light" and _is_writable(attr, "uint8")
+    ),
+    "number": lambda attr, _: _is_writable(attr, "uint8"),
+    "select": lambda attr, _: attr.data_type == "enum" and bool(attr.enum),
+    "sensor": lambda attr, device_type: (
+        device_type == "light" and attr.data_type == "uint8"
+    ),
+    "switch": lambda attr, _: _is_writable(attr, "bool"),
+}
+
+NO_ENTITIES = ProductEntities(MappingProxyType({}), (), MappingProxyType({}))
+
+_PRODUCT_ENTITIES: dict[str, ProductEntities] = {}
+
+
+def get_product_entities(
+    product_key: str, all_attrs: list[Attribute], device_config: Mapping[str, Any]
+) -> ProductEntities:
+    """Return which attributes of a product become entities on which platform.
+
+    Computed once per product key and shared by every device of that product
+    (in any config entry), so platform setup only iterates its own entities.
+    """
+    if (cached := _PRODUCT_ENTITIES.get(product_key)) is not None:
+        return cached
+
+    attrs_by_name = {attr.name: attr for attr in all_attrs}
+    device_type = device_config.get("device_type")
+    allow_lists = device_config.get("platforms", {})
+    platforms: dict[str, tuple[Attribute, ...]] = {}
+    for platform, rule in _PLATFORM_RULES.items():
+        allowed = allow_lists.get(platform, frozenset())
+        eligible = []
+        for attr in all_attrs:
+            if attr.name not in allowed:
+                continue
+            if rule(attr, device_type):
+                eligible.append(attr)
+            else:
+                _LOGGER.debug(
+                    "%s: attribute %s is listed for %s but not eligible, skipping",
+                    product_key,
+                    attr.name,
+                    platform,
+                )
+        platforms[platform] = tuple(eligible)
+
+    doser_channels: tuple[int, ...] = ()
+    if device_type == "doser":
+        # Schedule/volume sensors for each channel that is both exposed
+        # (channeN in the switch allow-list) and has a CHnSWTime blob.
+        exposed = allow_lists.get("switch", frozenset())
+        doser_channels = tuple(
+            channel
+            for channel in range(1, 9)
+            if f"CH{channel}SWTime" in attrs_by_name and f"channe{channel}" in exposed
+        )
 
-async def get_device_config_for_product_key(product_key: str) -> dict:
-    """Return the merged config from device_configs.json for a given product_key.
-    If it references an 'inherits', merge that base config. If none found, return empty.
+    entities = ProductEntities(
+        MappingProxyType(platforms), doser_channels, MappingProxyType(attrs_by_name)
+    )
+    _PRODUCT_ENTITIES[product_key] = entities
+    return entities
+
+
+def changed_attributes(old: Mapping[str, Any], new: Mapping[str, Any]) -> set[str]:
+    """Return the names of the attributes that differ between two status dicts."""
+    if old is new:
+        return set()
+    return {
+        name
+        for name in old.keys() | new.keys()
+        if name not in old or name not in new or old[name] != new[name]
+    }
+
+
+def notify_status_callbacks(
+    callbacks: Mapping[Callable[[DeviceStatus], None], frozenset[str] | None],
+    status: DeviceStatus,
+    changed: Collection[str] | None,
+) -> None:
+    """Call the status callbacks subscribed to any of the changed attributes.
+
+    changed=None notifies every callback; a callback subscribed with
+    attributes=None gets every status update.
     """
-    device_configs = await _load_device_configs()  # Now awaiting the async call
-    if product_key in device_configs:
-        cfg = device_configs[product_key]
-        inherits_key = cfg.get("inherits")
-        if inherits_key and inherits_key in device_configs:
-            base_cfg = device_configs[inherits_key]
-            return _merge_config(base_cfg, cfg)
-        return cfg
-    return {}
+    for callback, attributes in list(callbacks.items()):
+        if changed is not None and attributes is not None:
+            if attributes.isdisjoint(changed):
+                continue
+        try:
+            callback(status)
+        except Exception:
+            _LOGGER.exception("Error in status callback")
 
 
-async def async_load_product_attrs(hass: HomeAssistant, product_key: str) -> list[dict]:
-    """Load the full attribute list for a product key from its model JSON.
+class WriteBatcher:
+    """Merges the attribute writes to one device made within a short window.
 
-    Raises FileNotFoundError if no definition exists for the product key.
+    The first write starts a window-second timer; everything queued until
+    it fires goes to send() in one call (a later value for the same
+    attribute replaces an earlier one), and every writer waits for that
+    send and gets its result or exception.
     """
-    manager = await get_manager(hass)
-    return await manager._load_device_definition(product_key)
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        send: Callable[[dict[str, Any]], Awaitable[Any]],
+        name: str,
+        window: float = WRITE_BATCH_WINDOW,
+    ) -> None:
+        """Initialize the batcher; name identifies the device in task names."""
+        self._hass = hass
+        self._send = send
+        self._name = name
+        self._window = window
+        self._pending: dict[str, Any] = {}
+        self._sent: asyncio.Future | None = None
+        self._unsub: CALLBACK_TYPE | None = None
+        # Send tasks started and not finished -> their batch's future
+        self._sending: dict[asyncio.Task, asyncio.Future] = {}
+
+    async def async_write(self, values: Mapping[str, Any]) -> Any:
+        """Queue values; return send()'s result for the batch holding them."""
+        self._pending.update(values)
+        if self._sent is None:
+            self._sent = self._hass.loop.create_future()
+            # Retrieved here too, in case every writer was cancelled
+            self._sent.add_done_callback(
+                lambda sent: sent.cancelled() or sent.exception()
+            )
+            self._unsub = async_call_later(
+                self._hass, self._window, self._async_window_closed
+            )
+        return await asyncio.shield(self._sent)
+
+    @callback
+    def _async_window_closed(self, _now: Any) -> None:
+        self._unsub = None
+        values, self._pending = self._pending, {}
+        sent, self._sent = self._sent, None
+        task = self._hass.async_create_background_task(
+            self._async_send(values, sent), name=f"jebao_aqua_write_{self._name}"
+        )
+        if not task.done():
+            self._sending[task] = sent
+            task.add_done_callback(self._sending.pop)
+
+    async def _async_send(self, values: dict[str, Any], sent: asyncio.Future) -> None:
+        try:
+            result = await self._send(values)
+        except Exception as exc:  # passed on to the writers
+            if not sent.done():
+                sent.set_exception(exc)
+        else:
+            if not sent.done():
+                sent.set_result(result)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop queued writes (device disconnecting); writers get an error."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._pending = {}
+        batches = list(self._sending.items())
+        if self._sent is not None:
+            batches.append((None, self._sent))
+            self._sent = None
+        for task, sent in batches:
+            # A send not started yet never runs; one in flight is abandoned
+            if task is not None:
+                task.cancel()
+            if not sent.done():
+                sent.set_exception(RuntimeError("Device disconnected"))
 
 
 class JebaoDevice:
@@ -161,6 +507,7 @@ class JebaoDevice:
         mac: str | None = None,
         firmware_version: str | None = None,
         name: str | None = None,
+        write_window: float = WRITE_BATCH_WINDOW,
     ) -> None:
         """Initialize the JebaoDevice wrapper."""
         self.hass = hass
@@ -173,12 +520,36 @@ class JebaoDevice:
         # Channel number -> user-assigned name (only known via the cloud;
         # populated in cloud mode, empty for LAN-only setups).
         self.channel_names: dict[int, str] = {}
-        self.device_config: dict = {}
+        self.device_config: Mapping[str, Any] = {}
+        self.entities = NO_ENTITIES
         self.giz_device = None
-        self._status_callbacks: set[Callable[[DeviceStatus], None]] = set()
+        # Status callback -> the attributes it is interested in (None: all)
+        self._status_callbacks: dict[
+            Callable[[DeviceStatus], None], frozenset[str] | None
+        ] = {}
+        # Status data last passed to the callbacks
+        self._notified_data: Mapping[str, Any] | None = None
         self._connection_callbacks: set[Callable[[bool], None]] = set()
         self._ip_changed_callback: Callable[[str, str], None] | None = None
         self._rediscovery_task: asyncio.Task | None = None
+        # True while the status is the one saved before a restart.
+        self.restored = False
+        self._restored_unsub: CALLBACK_TYPE | None = None
+        self._status_store: JebaoStatusStore | None = None
+        # Writes within write_window seconds share one 0x93 frame
+        self._writes = WriteBatcher(
+            hass, self._async_send_attributes, uid or ip, write_window
+        )
+        # Values written whose status report is still outstanding, with the
+        # time the device acknowledged them (None while being sent)
+        self._unconfirmed: dict[str, tuple[Any, float | None]] = {}
+        # Optional (CONF_OFFLINE_COMMANDS): writes that could not be delivered
+        # are kept, latest value per attribute with the time they expire, and
+        # sent in one frame once the device is back.
+        self.queue_offline_commands = False
+        self._offline_commands: dict[str, tuple[Any, float]] = {}
+        self._offline_unsub: CALLBACK_TYPE | None = None
+        self._replay_task: asyncio.Task | None = None
 
     def set_ip_changed_callback(self, callback: Callable[[str, str], None]) -> None:
         """Register a callback(uid, new_ip) invoked when rediscovery finds a new IP."""
@@ -201,8 +572,16 @@ class JebaoDevice:
         self.giz_device = await manager.create_device(
             ip=self.ip, product_key=self.product_key, port=12416
         )
+        self.entities = get_product_entities(
+            self.product_key, self.giz_device.all_attrs, self.device_config
+        )
+        if self.uid:
+            self._status_store = await async_get_status_store(self.hass)
+            self._restore_status()
         self.giz_device.add_connection_callback(self._handle_connection_state)
         self.giz_device.add_status_callback(self._handle_status_update)
+        if self.uid:
+            _ACTIVE_DEVICES[self.uid] = self
 
         try:
             await self.giz_device.connect()
@@ -223,15 +602,54 @@ class JebaoDevice:
 
     async def async_disconnect(self) -> None:
         """Disconnect from device."""
+        self._writes.async_cancel()
+        self._drop_offline_commands()
         if self.giz_device:
             # Remove our callbacks first so the disconnect notification does
             # not restart the rediscovery loop.
             self.giz_device.remove_connection_callback(self._handle_connection_state)
             self.giz_device.remove_status_callback(self._handle_status_update)
-            await self.giz_device.disconnect()
+            await self.giz_device.disconnect(timeout=DISCONNECT_TIMEOUT)
             self.giz_device = None
             _LOGGER.info("Disconnected from Jebao device at %s", self.ip)
+        if self.uid and _ACTIVE_DEVICES.get(self.uid) is self:
+            del _ACTIVE_DEVICES[self.uid]
         self._stop_rediscovery()
+        self._end_restored()
+
+    def _restore_status(self) -> None:
+        """Seed the status saved before the last restart, if there is one."""
+        record = self._status_store.get(self.uid) if self._status_store else None
+        if not record or "raw" not in record:
+            return
+        try:
+            raw = bytes.fromhex(record["raw"])
+        except (TypeError, ValueError):
+            _LOGGER.debug("Ignoring unreadable saved status for %s", self.uid)
+            return
+        self.giz_device.restore_status(raw)
+        self.restored = True
+        self._restored_unsub = async_call_later(
+            self.hass, RESTORED_STATUS_TIMEOUT, self._async_restored_expired
+        )
+        _LOGGER.debug("Restored last known status of %s", self.uid)
+
+    def _end_restored(self) -> None:
+        self.restored = False
+        if self._restored_unsub is not None:
+            self._restored_unsub()
+            self._restored_unsub = None
+
+    @callback
+    def _async_restored_expired(self, _now: Any) -> None:
+        """No live status in time: stop presenting the restored one."""
+        self._restored_unsub = None
+        self._end_restored()
+        for cb in self._connection_callbacks:
+            try:
+                cb(self.available)
+            except Exception as exc:
+                _LOGGER.exception("Error in connection callback: %s", exc)
 
     def _start_rediscovery(self) -> None:
         """Start the background rediscovery loop if it isn't running."""
@@ -256,8 +674,9 @@ class JebaoDevice:
         """While disconnected, periodically look for the device on the network.
 
         Handles the device's IP changing (DHCP lease renewal on the router):
-        broadcast discovery is matched on the device UID and, if the IP moved,
-        the connection manager is pointed at the new address.
+        broadcast discovery results are matched on the device UID by
+        handle_sighting, which re-points the connection manager if the IP
+        moved and reconnects without waiting out the backoff.
         """
         try:
             while True:
@@ -269,44 +688,82 @@ class JebaoDevice:
                 except Exception as exc:
                     _LOGGER.debug("Rediscovery attempt failed: %s", exc)
                     continue
-                for dev in found:
-                    if dev.get("uid") != self.uid:
-                        continue
-                    if dev["ip"] != self.ip:
-                        _LOGGER.info(
-                            "Device %s found at new IP %s (was %s); reconnecting",
-                            self.uid,
-                            dev["ip"],
-                            self.ip,
-                        )
-                        self.ip = dev["ip"]
-                        if self.giz_device:
-                            self.giz_device.ip = dev["ip"]
-                        if self._ip_changed_callback:
-                            self._ip_changed_callback(self.uid, dev["ip"])
-                    else:
-                        _LOGGER.debug(
-                            "Device %s still at %s; waiting for reconnect",
-                            self.uid,
-                            self.ip,
-                        )
-                    break
+                if not any(dev.get("uid") == self.uid for dev in found):
+                    _LOGGER.debug(
+                        "Device %s not found by rediscovery; will retry", self.uid
+                    )
         except asyncio.CancelledError:
             raise
 
+    def handle_sighting(self, ip: str) -> None:
+        """React to the device being seen on the network at ip.
+
+        If the device is disconnected the connection manager may be in a
+        backoff sleep of up to two minutes; cut it short so recovery time is
+        set by discovery latency rather than the backoff ceiling.
+        """
+        if self.giz_device is None or self.available:
+            return
+        if ip != self.ip:
+            _LOGGER.info(
+                "Device %s found at new IP %s (was %s); reconnecting",
+                self.uid,
+                ip,
+                self.ip,
+            )
+            self.ip = ip
+            self.giz_device.ip = ip
+            if self._ip_changed_callback and self.uid:
+                self._ip_changed_callback(self.uid, ip)
+        else:
+            _LOGGER.debug("Device %s seen at %s; reconnecting now", self.uid, ip)
+        self.giz_device.reconnect_now()
+
     def _handle_status_update(self, status: DeviceStatus) -> None:
         """Internal callback from giz_device when status changes. Notify all entity listeners."""
         _LOGGER.debug("Device status update from %s => %s", self.ip, status.data)
-        for cb in self._status_callbacks:
-            try:
-                cb(status)
-            except Exception as exc:
-                _LOGGER.exception("Error in status callback: %s", exc)
+        if not status.restored:
+            self._end_restored()
+            raw = self.giz_device.raw_status if self.giz_device else None
+            if self._status_store is not None and raw is not None:
+                self._status_store.async_update(self.uid, {"raw": raw.hex()})
+        if self._unconfirmed and not status.restored:
+            # The first report after the ack settles a write, whether the
+            # device took the value, clamped it or ignored it
+            self._unconfirmed = {
+                name: (value, acked)
+                for name, (value, acked) in self._unconfirmed.items()
+                if status.data.get(name) != value
+                and (acked is None or status.timestamp < acked)
+            }
+        confirmed: set[str] = set()
+        if self._offline_commands and not status.restored:
+            confirmed = {
+                name
+                for name, (value, _expires) in self._offline_commands.items()
+                if status.data.get(name) == value
+            }
+            for name in confirmed:
+                del self._offline_commands[name]
+        # Periodic resends repeat the last values; only the entities of
+        # attributes that changed (or are no longer pending) are updated.
+        previous, self._notified_data = self._notified_data, status.data
+        if previous is None:
+            notify_status_callbacks(self._status_callbacks, status, None)
+        elif changed := changed_attributes(previous, status.data) | confirmed:
+            notify_status_callbacks(self._status_callbacks, status, changed)
 
     def _handle_connection_state(self, connected: bool) -> None:
         """Handle connection state changes from gizwits device."""
         if connected:
             self._stop_rediscovery()
+            if self._offline_commands and (
+                self._replay_task is None or self._replay_task.done()
+            ):
+                self._replay_task = self.hass.async_create_background_task(
+                    self._async_replay_offline_commands(),
+                    name=f"jebao_aqua_replay_{self.uid or self.ip}",
+                )
         else:
             # Lost connection: the connection manager retries the current IP;
             # rediscovery handles the case where the IP itself changed.
@@ -318,15 +775,20 @@ class JebaoDevice:
                 _LOGGER.exception("Error in connection callback: %s", exc)
 
     def register_status_callback(
-        self, callback: Callable[[DeviceStatus], None]
+        self,
+        callback: Callable[[DeviceStatus], None],
+        attributes: Collection[str] | None = None,
     ) -> None:
         """Entity can register to be notified when device status changes.
 
+        With attributes, only updates that change one of them are passed on.
         The last known status is replayed immediately: LAN devices only push
         on change, so an entity registering after the initial status fetch
         would otherwise stay stateless until the device next changes.
         """
-        self._status_callbacks.add(callback)
+        self._status_callbacks[callback] = (
+            None if attributes is None else frozenset(attributes)
+        )
         if self.giz_device is not None and self.giz_device.current_status:
             try:
                 callback(self.giz_device.current_status)
@@ -335,7 +797,7 @@ class JebaoDevice:
 
     def remove_status_callback(self, callback: Callable[[DeviceStatus], None]) -> None:
         """Entity unsubscribes from updates."""
-        self._status_callbacks.discard(callback)
+        self._status_callbacks.pop(callback, None)
 
     def register_connection_callback(self, callback: Callable[[bool], None]) -> None:
         """Register a callback for connection state changes."""
@@ -361,14 +823,162 @@ class JebaoDevice:
             return None
         return self.giz_device.get_attribute(attr_name)
 
-    async def async_set_attribute(self, attr_name: str, value: Any) -> None:
-        """Set a single attribute on the device."""
+    async def async_set_attribute(self, attr_name: str, value: Any) -> Any:
+        """Set a single attribute on the device; returns the ack payload."""
+        return await self._writes.async_write({attr_name: value})
+
+    async def async_set_attributes(self, values: Mapping[str, Any]) -> Any:
+        """Set several attributes on the device in one command."""
+        return await self._writes.async_write(values)
+
+    async def _async_send_attributes(self, values: dict[str, Any]) -> Any:
+        """Send a batch of writes as one frame, leaving out no-op writes.
+
+        A value equal to the live status is not sent, unless an earlier
+        write of the attribute has not been reported back yet (the status
+        may still show the value from before it).
+        """
         if not self.giz_device:
             _LOGGER.warning(
-                "Cannot set attribute %s; device is not connected", attr_name
+                "Cannot set attributes %s; device is not connected", list(values)
             )
+            return None
+        status = self.giz_device.current_status
+        if status is not None and not status.restored:
+            values = {
+                name: value
+                for name, value in values.items()
+                if name in self._unconfirmed
+                or name in self._offline_commands
+                or name not in status.data
+                or status.data[name] != value
+            }
+            if not values:
+                _LOGGER.debug("Skipping write to %s; values unchanged", self.uid)
+                return None
+        for name, value in values.items():
+            self._unconfirmed[name] = (value, None)
+        try:
+            ack = await self.giz_device.set_multiple_attributes(values)
+        except (GizwitsError, RuntimeError, ConnectionError) as err:
+            self._settle_unconfirmed(values, None)
+            # A device still connected got the frame and did not answer;
+            # sending it again on a reconnect that never comes won't help
+            if not self.queue_offline_commands or self.available:
+                raise
+            self._queue_offline_commands(values, err)
+            return None
+        except asyncio.CancelledError:
+            self._settle_unconfirmed(values, None)
+            raise
+        self._settle_unconfirmed(values, time.monotonic())
+        # A queued command overridden by a newer value is dropped; one that
+        # was just replayed stays pending until the status confirms it.
+        superseded = {
+            name
+            for name, value in values.items()
+            if name in self._offline_commands
+            and self._offline_commands[name][0] != value
+        }
+        if superseded:
+            for name in superseded:
+                del self._offline_commands[name]
+            self._notify_pending(superseded)
+        return ack
+
+    def _settle_unconfirmed(
+        self, values: Mapping[str, Any], acked: float | None
+    ) -> None:
+        """Mark written values acknowledged at acked, or forget them (None).
+
+        Entries replaced by a newer write in the meantime are left alone.
+        """
+        for name, value in values.items():
+            if name in self._unconfirmed and self._unconfirmed[name][0] == value:
+                if acked is None:
+                    del self._unconfirmed[name]
+                else:
+                    self._unconfirmed[name] = (value, acked)
+
+    def command_pending(self, attr_name: str) -> bool:
+        """Whether a queued offline command for the attribute is unconfirmed."""
+        return attr_name in self._offline_commands
+
+    def _queue_offline_commands(self, values: dict[str, Any], err: Exception) -> None:
+        """Keep undelivered writes until the device reconnects or they expire."""
+        expires = time.monotonic() + PENDING_COMMAND_TIMEOUT
+        for name, value in values.items():
+            self._offline_commands[name] = (value, expires)
+        _LOGGER.info(
+            "Could not send %s to %s (%s); sending when it reconnects",
+            values,
+            self.uid or self.ip,
+            err,
+        )
+        if self._offline_unsub is None:
+            self._offline_unsub = async_call_later(
+                self.hass, PENDING_COMMAND_TIMEOUT, self._async_offline_expired
+            )
+        self._notify_pending(values)
+
+    @callback
+    def _async_offline_expired(self, _now: Any) -> None:
+        """Drop queued commands past their expiry; re-arm for the rest."""
+        self._offline_unsub = None
+        now = time.monotonic()
+        expired = {
+            name
+            for name, (_value, expires) in self._offline_commands.items()
+            if expires <= now
+        }
+        for name in expired:
+            del self._offline_commands[name]
+        if expired:
+            _LOGGER.info(
+                "Dropped commands to %s not confirmed within %s s: %s",
+                self.uid or self.ip,
+                PENDING_COMMAND_TIMEOUT,
+                sorted(expired),
+            )
+            self._notify_pending(expired)
+        if self._offline_commands:
+            next_expiry = min(exp for _value, exp in self._offline_commands.values())
+            self._offline_unsub = async_call_later(
+                self.hass, max(next_expiry - now, 0), self._async_offline_expired
+            )
+
+    async def _async_replay_offline_commands(self) -> None:
+        """Send the queued commands in one frame after the device reconnected."""
+        now = time.monotonic()
+        values = {
+            name: value
+            for name, (value, expires) in self._offline_commands.items()
+            if expires > now
+        }
+        if not values:
             return
-        await self.giz_device.set_device_attribute(attr_name, value)
+        _LOGGER.info("Sending queued commands to %s: %s", self.uid or self.ip, values)
+        try:
+            await self._async_send_attributes(values)
+        except Exception as exc:
+            _LOGGER.warning(
+                "Sending queued commands to %s failed: %s", self.uid or self.ip, exc
+            )
+
+    def _notify_pending(self, names: Collection[str]) -> None:
+        """Let the entities of names update their pending flag."""
+        status = self.giz_device.current_status if self.giz_device else None
+        if status is not None:
+            notify_status_callbacks(self._status_callbacks, status, names)
+
+    def _drop_offline_commands(self) -> None:
+        self._offline_commands.clear()
+        if self._offline_unsub is not None:
+            self._offline_unsub()
+            self._offline_unsub = None
+        if self._replay_task is not None and not self._replay_task.done():
+            self._replay_task.cancel()
+        self._replay_task = None
 
     def __repr__(self) -> str:
         return f"<JebaoDevice ip={self.ip}, connected={bool(self.giz_device)}, product_key={self.product_key}>"
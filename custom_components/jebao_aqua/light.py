@@ -8,11 +8,14 @@ from typing import Any
 from homeassistant.components.light import ColorMode, LightEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.util.color import brightness_to_value, value_to_brightness
 
+from .const import SIGNAL_DEVICES_ADDED
 from .entity import JebaoEntity
 from .gizwits_lan.device_status import DeviceStatus
+from .gizwits_lan.models import Attribute
 from .hub import JebaoDevice
 
 _LOGGER = logging.getLogger(__name__)
@@ -22,43 +25,26 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up light entities for a given config entry."""
-    devices: list[JebaoDevice] = entry.runtime_data  # type: ignore
-    if not devices:
-        _LOGGER.warning("No Jebao devices found for entry %s", entry.title)
-        return
-
-    entities = []
-    for device in devices:
-        if not device.giz_device:
-            continue
-
-        # Only create lights if this is a light-type device
-        device_cfg = device.device_config
-        if not device_cfg or device_cfg.get("device_type") != "light":
-            continue
-
-        allowed_light_attrs = set()
-        if "platforms" in device_cfg:
-            allowed_light_attrs = set(device_cfg["platforms"].get("light", []))
-
-        # Create entities for each device's attributes
-        for attr_def in device.giz_device.all_attrs:
-            attr_name = attr_def["name"]
-
-            # If not in the device_config light list, skip
-            if attr_name not in allowed_light_attrs:
-                continue
 
-            # Must be writable uint8
-            if attr_def.get("type") != "status_writable":
-                continue
-            if attr_def.get("data_type") != "uint8":
+    @callback
+    def _async_add_devices(devices: list[JebaoDevice]) -> None:
+        entities = []
+        for device in devices:
+            if not device.giz_device:
                 continue
-
-            entities.append(JebaoLightEntity(entry, device, attr_def))
-
-    if entities:
-        async_add_entities(entities)
+            # Only light-type devices have eligible light attributes
+            for attr_def in device.entities.platforms.get("light", ()):
+                entities.append(JebaoLightEntity(entry, device, attr_def))
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_devices(entry.runtime_data.devices)
+    # Devices added to the entry later (see the update listener)
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), _async_add_devices
+        )
+    )
 
 
 class JebaoLightEntity(JebaoEntity, LightEntity):
@@ -68,18 +54,17 @@ class JebaoLightEntity(JebaoEntity, LightEntity):
     _attr_color_mode = ColorMode.BRIGHTNESS
 
     def __init__(
-        self, entry: ConfigEntry, device: JebaoDevice, attr_def: dict[str, Any]
+        self, entry: ConfigEntry, device: JebaoDevice, attr_def: Attribute
     ) -> None:
         """Initialize the light entity."""
         super().__init__(entry, device, attr_def, "light")
         self._brightness = None
 
         # Get min/max from uint_spec if available
-        uint_spec = attr_def.get("uint_spec") or {}
-        self._value_min = uint_spec.get("min", 0)
-        self._value_max = uint_spec.get(
-            "max", 100
-        )  # Default to 0-100 range if not specified
+        uint_spec = attr_def.uint_spec
+        # Default to 0-100 range if not specified
+        self._value_min = uint_spec.min if uint_spec else 0
+        self._value_max = uint_spec.max if uint_spec else 100
 
     @property
     def is_on(self) -> bool:
@@ -107,7 +92,9 @@ class JebaoLightEntity(JebaoEntity, LightEntity):
     async def async_added_to_hass(self) -> None:
         """Register callback when entity is added."""
         await super().async_added_to_hass()
-        self._device.register_status_callback(self._update_state_from_device)
+        self._device.register_status_callback(
+            self._update_state_from_device, (self._attribute_name,)
+        )
 
     async def async_will_remove_from_hass(self) -> None:
         """Unregister callback when entity is removed."""
@@ -3,15 +3,17 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
 
 from homeassistant.components.number import NumberEntity, NumberEntityDescription
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .const import SIGNAL_DEVICES_ADDED
 from .entity import JebaoEntity
 from .gizwits_lan.device_status import DeviceStatus
+from .gizwits_lan.models import Attribute
 from .hub import JebaoDevice
 
 _LOGGER = logging.getLogger(__name__)
@@ -21,54 +23,43 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up number entities for a given config entry."""
-    devices: list[JebaoDevice] = entry.runtime_data  # type: ignore
-    if not devices:
-        _LOGGER.warning("No Jebao devices found for entry %s", entry.title)
-        return
-
-    entities = []
-    for device in devices:
-        if not device.giz_device:
-            continue
-
-        # Get device config and allowed attributes
-        device_cfg = device.device_config
-        allowed_number_attrs = set()
-        if device_cfg and "platforms" in device_cfg:
-            allowed_number_attrs = set(device_cfg["platforms"].get("number", []))
-
-        # Create entities for each device's attributes
-        for attr_def in device.giz_device.all_attrs:
-            attr_name = attr_def["name"]
-            if attr_name not in allowed_number_attrs:
-                continue
-            if attr_def.get("type") != "status_writable":
-                continue
-            if attr_def.get("data_type") != "uint8":
-                continue
-
-            entities.append(JebaoNumberEntity(entry, device, attr_def))
 
-    if entities:
-        async_add_entities(entities)
+    @callback
+    def _async_add_devices(devices: list[JebaoDevice]) -> None:
+        entities = []
+        for device in devices:
+            if not device.giz_device:
+                continue
+            for attr_def in device.entities.platforms.get("number", ()):
+                entities.append(JebaoNumberEntity(entry, device, attr_def))
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_devices(entry.runtime_data.devices)
+    # Devices added to the entry later (see the update listener)
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), _async_add_devices
+        )
+    )
 
 
 class JebaoNumberEntity(JebaoEntity, NumberEntity):
     """A number entity for a writable uint8 attribute."""
 
     def __init__(
-        self, entry: ConfigEntry, device: JebaoDevice, attr_def: dict[str, Any]
+        self, entry: ConfigEntry, device: JebaoDevice, attr_def: Attribute
     ) -> None:
         """Initialize the number entity."""
-        uint_spec = attr_def.get("uint_spec") or {}
+        uint_spec = attr_def.uint_spec
 
         # Create the number specific entity description
         self.entity_description = NumberEntityDescription(
-            key=attr_def["name"].lower(),
-            name=attr_def.get("name"),
-            native_min_value=uint_spec.get("min", 0),
-            native_max_value=uint_spec.get("max", 255),
-            native_step=1 / uint_spec.get("ratio", 1) if uint_spec.get("ratio") else 1,
+            key=attr_def.name.lower(),
+            name=attr_def.name,
+            native_min_value=uint_spec.min if uint_spec else 0,
+            native_max_value=uint_spec.max if uint_spec else 255,
+            native_step=1 / uint_spec.ratio if uint_spec and uint_spec.ratio else 1,
         )
 
         super().__init__(entry, device, attr_def, "number")
@@ -91,7 +82,9 @@ class JebaoNumberEntity(JebaoEntity, NumberEntity):
             super().async_added_to_hass()
         )  # Call parent to handle connection state callback
         """Register callback."""
-        self._device.register_status_callback(self._update_state_from_device)
+        self._device.register_status_callback(
+            self._update_state_from_device, (self._attribute_name,)
+        )
 
     async def async_will_remove_from_hass(self) -> None:
         """Unregister callback."""
@@ -3,16 +3,17 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
 
 from homeassistant.components.select import SelectEntity, SelectEntityDescription
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import ENUM_OPTION_SLUGS
+from .const import ENUM_OPTION_SLUGS, SIGNAL_DEVICES_ADDED
 from .entity import JebaoEntity
 from .gizwits_lan.device_status import DeviceStatus
+from .gizwits_lan.models import Attribute
 from .hub import JebaoDevice
 
 _LOGGER = logging.getLogger(__name__)
@@ -22,50 +23,38 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up select entities for a given config entry."""
-    devices: list[JebaoDevice] = entry.runtime_data  # type: ignore
-    if not devices:
-        _LOGGER.warning("No Jebao devices found for entry %s", entry.title)
-        return
-
-    entities = []
-    for device in devices:
-        if not device.giz_device:
-            continue
-
-        # Get device config and allowed attributes
-        device_cfg = device.device_config
-        allowed_select_attrs = set()
-        if device_cfg and "platforms" in device_cfg:
-            allowed_select_attrs = set(device_cfg["platforms"].get("select", []))
-
-        # Create entities for each device's attributes
-        for attr_def in device.giz_device.all_attrs:
-            attr_name = attr_def["name"]
-            if attr_name not in allowed_select_attrs:
-                continue
-            if attr_def.get("data_type") != "enum":
-                continue
-            if not attr_def.get("enum"):
-                _LOGGER.debug("Enum attribute %s has no enum list, skipping", attr_name)
-                continue
-
-            entities.append(JebaoSelectEntity(entry, device, attr_def))
 
-    if entities:
-        async_add_entities(entities)
+    @callback
+    def _async_add_devices(devices: list[JebaoDevice]) -> None:
+        entities = []
+        for device in devices:
+            if not device.giz_device:
+                continue
+            for attr_def in device.entities.platforms.get("select", ()):
+                entities.append(JebaoSelectEntity(entry, device, attr_def))
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_devices(entry.runtime_data.devices)
+    # Devices added to the entry later (see the update listener)
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), _async_add_devices
+        )
+    )
 
 
 class JebaoSelectEntity(JebaoEntity, SelectEntity):
     """A select entity for a writable enum attribute."""
 
     def __init__(
-        self, entry: ConfigEntry, device: JebaoDevice, attr_def: dict[str, Any]
+        self, entry: ConfigEntry, device: JebaoDevice, attr_def: Attribute
     ) -> None:
         """Initialize the select entity."""
         # Create the select specific entity description first
         self.entity_description = SelectEntityDescription(
-            key=attr_def["name"],
-            name=attr_def.get("name"),
+            key=attr_def.name,
+            name=attr_def.name,
         )
 
         super().__init__(entry, device, attr_def, "select")
@@ -73,7 +62,7 @@ class JebaoSelectEntity(JebaoEntity, SelectEntity):
         # The device speaks native enum values (Chinese strings, addressed by
         # index); HA option keys must be [a-z0-9-_]+ slugs so they can be
         # translated. Unknown values fall back to the raw string.
-        self._device_options: list[str] = attr_def["enum"]
+        self._device_options: tuple[str, ...] = attr_def.enum
         self._attr_options = [
             ENUM_OPTION_SLUGS.get(value, value) for value in self._device_options
         ]
@@ -98,7 +87,9 @@ class JebaoSelectEntity(JebaoEntity, SelectEntity):
     async def async_added_to_hass(self) -> None:
         """Register callback."""
         await super().async_added_to_hass()  # Call parent to handle connection state
-        self._device.register_status_callback(self._update_state_from_device)
+        self._device.register_status_callback(
+            self._update_state_from_device, (self._attribute_name,)
+        )
 
     async def async_will_remove_from_hass(self) -> None:
         await (
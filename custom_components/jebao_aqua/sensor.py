@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
+from abc import abstractmethod
 import base64
+from bisect import bisect_right
+import dataclasses
+from datetime import datetime, timedelta
 import logging
 from typing import Any
 
@@ -12,13 +16,17 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.util import dt as dt_util
 from homeassistant.util.color import value_to_brightness  # Add this import
 
+from .const import SIGNAL_DEVICES_ADDED
 from .entity import JebaoEntity
 from .gizwits_lan.device_status import DeviceStatus
+from .gizwits_lan.models import Attribute
 from .hub import JebaoDevice
 
 _LOGGER = logging.getLogger(__name__)
@@ -71,82 +79,180 @@ def parse_dosing_schedule(raw: Any) -> list[dict]:
     return entries
 
 
-def next_dose(schedule: list[dict]) -> dict | None:
-    """Return the next upcoming dose relative to now (daily schedules)."""
-    if not schedule:
-        return None
-    now = dt_util.now()
-    current_minutes = now.hour * 60 + now.minute
-    for entry in schedule:
-        if entry["hour"] * 60 + entry["minute"] > current_minutes:
-            return entry
-    # All doses passed today; the first one runs tomorrow.
-    return schedule[0]
+class DoserChannelSchedule:
+    """Parsed dosing schedule of one doser channel, shared by its sensors.
+
+    The CHnSWTime blob is only parsed again when it or IntervalTn changes,
+    not on every status update or state write.
+    """
+
+    def __init__(self, device: JebaoDevice, channel: int) -> None:
+        """Initialize for a device channel; call refresh() to load it."""
+        self.channel = channel
+        self.schedule_attr = f"CH{channel}SWTime"
+        self.interval_attr = f"IntervalT{channel}"
+        self._device = device
+        self._raw: tuple[Any, Any] | None = None
+        # Bumped whenever the derived values below change.
+        self.version = 0
+        self.doses: list[dict] = []
+        # Minutes after midnight of each dose, sorted, for bisect.
+        self.dose_minutes: list[int] = []
+        self.interval = 0
+        self.total_ml = 0
+        # The "schedule" state attribute, shared by both sensors.
+        self.schedule_attribute: list[dict[str, Any]] = []
+
+    def refresh(self) -> None:
+        """Re-derive the schedule if the device's raw values changed."""
+        raw = (
+            self._device.get_attribute(self.schedule_attr),
+            self._device.get_attribute(self.interval_attr),
+        )
+        if raw == self._raw:
+            return
+        self._raw = raw
+        self.doses = parse_dosing_schedule(raw[0])
+        self.dose_minutes = [e["hour"] * 60 + e["minute"] for e in self.doses]
+        try:
+            self.interval = int(raw[1] or 0)
+        except (TypeError, ValueError):
+            self.interval = 0
+        self.total_ml = sum(e["dose_ml"] for e in self.doses)
+        self.schedule_attribute = [
+            {"time": e["time"], "dose_ml": e["dose_ml"]} for e in self.doses
+        ]
+        self.version += 1
+
+    def next_dose(self, now: datetime) -> dict | None:
+        """Return the next upcoming dose relative to now (daily schedules)."""
+        if not self.doses:
+            return None
+        index = bisect_right(self.dose_minutes, now.hour * 60 + now.minute)
+        # All doses passed today; the first one runs tomorrow.
+        return self.doses[index % len(self.doses)]
+
+    def next_dose_change(self, now: datetime) -> datetime | None:
+        """Return when next_dose() will next return a different dose.
+
+        That is the start of the minute of the upcoming dose. None for
+        schedules without a next-dose prediction (see next_dose()).
+        """
+        if self.interval != 0 or not self.doses:
+            return None
+        entry = self.next_dose(now)
+        when = now.replace(
+            hour=entry["hour"], minute=entry["minute"], second=0, microsecond=0
+        )
+        if when <= now:
+            when += timedelta(days=1)
+        return when
+
+
+class DoserNextDoseScheduler:
+    """Refreshes a doser's schedule sensors when their next dose passes.
+
+    Keeps a single timer per device, armed for the earliest upcoming dose
+    across all channels; when it fires only the channels due at that moment
+    are updated.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize with no sensors and no timer."""
+        self.hass = hass
+        self._due: dict[JebaoDoserScheduleSensor, datetime | None] = {}
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add(self, sensor: JebaoDoserScheduleSensor) -> None:
+        """Track a sensor (called when it is added to hass)."""
+        self._due[sensor] = None
+        self.async_reschedule(sensor)
+
+    @callback
+    def async_remove(self, sensor: JebaoDoserScheduleSensor) -> None:
+        """Stop tracking a sensor; the timer stops with the last one."""
+        self._due.pop(sensor, None)
+        self._arm()
+
+    @callback
+    def async_reschedule(self, sensor: JebaoDoserScheduleSensor) -> None:
+        """Recompute a sensor's next dose change (e.g. its schedule changed)."""
+        if sensor in self._due:
+            self._due[sensor] = sensor.next_dose_change(dt_util.now())
+            self._arm()
+
+    def _arm(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        upcoming = [when for when in self._due.values() if when is not None]
+        if upcoming:
+            self._unsub = async_track_point_in_time(
+                self.hass, self._async_fire, min(upcoming)
+            )
+
+    @callback
+    def _async_fire(self, now: datetime) -> None:
+        self._unsub = None
+        now = dt_util.now()
+        for sensor, when in list(self._due.items()):
+            if when is not None and when <= now:
+                if sensor._refresh_state():
+                    sensor.async_write_ha_state()
+                self._due[sensor] = sensor.next_dose_change(now)
+        self._arm()
 
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up sensor entities for a given config entry."""
-    devices: list[JebaoDevice] = entry.runtime_data  # type: ignore
-    if not devices:
-        _LOGGER.warning("No Jebao devices found for entry %s", entry.title)
-        return
-
-    entities = []
-    for device in devices:
-        if not device.giz_device:
-            continue
-
-        device_cfg = device.device_config
-        if not device_cfg:
-            continue
-        device_type = device_cfg.get("device_type")
-        platforms_cfg = device_cfg.get("platforms", {})
-
-        if device_type == "light":
-            allowed_sensor_attrs = set(platforms_cfg.get("sensor", []))
-            for attr_def in device.giz_device.all_attrs:
-                attr_name = attr_def["name"]
-                if attr_name not in allowed_sensor_attrs:
-                    continue
-                # Must be uint8
-                if attr_def.get("data_type") != "uint8":
-                    continue
-                entities.append(JebaoLightLevelSensor(entry, device, attr_def))
-
-        elif device_type == "doser":
-            # Schedule/volume sensors for each channel that is both exposed
-            # (channeN in the switch whitelist) and has a CHnSWTime blob.
-            attr_names = {a["name"] for a in device.giz_device.all_attrs}
-            exposed = set(platforms_cfg.get("switch", []))
-            for channel in range(1, 9):
-                if f"CH{channel}SWTime" not in attr_names:
-                    continue
-                if f"channe{channel}" not in exposed:
-                    continue
-                entities.append(JebaoDoserScheduleSensor(entry, device, channel))
-                entities.append(JebaoDoserVolumeSensor(entry, device, channel))
 
-    if entities:
-        async_add_entities(entities)
+    @callback
+    def _async_add_devices(devices: list[JebaoDevice]) -> None:
+        entities = []
+        for device in devices:
+            if not device.giz_device:
+                continue
+            # Light level sensors (light-type devices only)
+            for attr_def in device.entities.platforms.get("sensor", ()):
+                entities.append(JebaoLightLevelSensor(entry, device, attr_def))
+            # Doser schedule/volume sensors per exposed channel, sharing one
+            # parsed schedule; one next-dose timer per doser
+            if device.entities.doser_channels:
+                scheduler = DoserNextDoseScheduler(hass)
+            for channel in device.entities.doser_channels:
+                schedule = DoserChannelSchedule(device, channel)
+                entities.append(
+                    JebaoDoserScheduleSensor(entry, device, schedule, scheduler)
+                )
+                entities.append(JebaoDoserVolumeSensor(entry, device, schedule))
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_devices(entry.runtime_data.devices)
+    # Devices added to the entry later (see the update listener)
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), _async_add_devices
+        )
+    )
 
 
 class JebaoLightLevelSensor(JebaoEntity, SensorEntity):
     """Sensor showing light level as 0-255."""
 
     def __init__(
-        self, entry: ConfigEntry, device: JebaoDevice, attr_def: dict[str, Any]
+        self, entry: ConfigEntry, device: JebaoDevice, attr_def: Attribute
     ) -> None:
         """Initialize the sensor entity."""
         # Append "Level" to the name
-        attr_def = dict(attr_def)
-        if "name" in attr_def:
-            attr_def["name"] = f"{attr_def['name']} Level"
+        attr_def = dataclasses.replace(attr_def, name=f"{attr_def.name} Level")
 
         self.entity_description = SensorEntityDescription(
-            key=f"{attr_def['name'].lower()}_level",
-            name=attr_def.get("name"),
+            key=f"{attr_def.name.lower()}_level",
+            name=attr_def.name,
             native_unit_of_measurement=None,
             state_class=SensorStateClass.MEASUREMENT,
         )
@@ -155,11 +261,10 @@ class JebaoLightLevelSensor(JebaoEntity, SensorEntity):
         self._value = None
 
         # Get min/max from uint_spec if available
-        uint_spec = attr_def.get("uint_spec") or {}
-        self._value_min = uint_spec.get("min", 0)
-        self._value_max = uint_spec.get(
-            "max", 100
-        )  # Default to 0-100 range if not specified
+        uint_spec = attr_def.uint_spec
+        # Default to 0-100 range if not specified
+        self._value_min = uint_spec.min if uint_spec else 0
+        self._value_max = uint_spec.max if uint_spec else 100
 
     @property
     def native_value(self) -> int | None:
@@ -169,7 +274,9 @@ class JebaoLightLevelSensor(JebaoEntity, SensorEntity):
     async def async_added_to_hass(self) -> None:
         """Register callback when entity is added."""
         await super().async_added_to_hass()
-        self._device.register_status_callback(self._update_state_from_device)
+        self._device.register_status_callback(
+            self._update_state_from_device, (self._attribute_name,)
+        )
 
     async def async_will_remove_from_hass(self) -> None:
         """Unregister callbacks when entity is removed."""
@@ -190,35 +297,66 @@ class JebaoLightLevelSensor(JebaoEntity, SensorEntity):
 
 
 class JebaoDoserChannelSensor(JebaoEntity, SensorEntity):
-    """Base for per-channel dosing sensors built on the CHxSWTime blob."""
+    """Base for per-channel dosing sensors built on the CHxSWTime blob.
+
+    State and attributes are derived in _refresh_state() when the shared
+    schedule (or, for the schedule sensor, the next dose) changes, and only
+    then written.
+    """
+
+    # Static or bulky attributes are kept out of the recorder; the full
+    # schedules are in the config entry diagnostics.
+    _unrecorded_attributes = JebaoEntity._unrecorded_attributes | frozenset(
+        {
+            "channel",
+            "channel_name",
+            "doses_per_cycle",
+            "pause_days_between_cycles",
+            "schedule",
+            "total_doses_per_cycle",
+            "total_volume_ml_per_cycle",
+        }
+    )
 
     def __init__(
-        self, entry: ConfigEntry, device: JebaoDevice, channel: int, kind: str
+        self,
+        entry: ConfigEntry,
+        device: JebaoDevice,
+        schedule: DoserChannelSchedule,
+        kind: str,
     ) -> None:
         """Initialize with a synthetic attribute for unique_id purposes."""
-        self._channel = channel
-        self._schedule_attr = f"CH{channel}SWTime"
-        self._interval_attr = f"IntervalT{channel}"
-        super().__init__(entry, device, {"name": f"CH{channel}{kind}"}, "sensor")
+        self._channel = schedule.channel
+        self._schedule = schedule
+        super().__init__(
+            entry, device, Attribute(name=f"CH{self._channel}{kind}"), "sensor"
+        )
         # These are derived entities without model translations; name them
         # directly, using the channel name from the Jebao app when known.
         self._attr_translation_key = None
         channel_names = getattr(device, "channel_names", {}) or {}
-        self._channel_name = channel_names.get(channel) or f"Channel {channel}"
+        self._channel_name = (
+            channel_names.get(self._channel) or f"Channel {self._channel}"
+        )
+        self._state_key: Any = None
+        self._schedule.refresh()
+        self._refresh_state()
 
-    def _schedule(self) -> list[dict]:
-        return parse_dosing_schedule(self._device.get_attribute(self._schedule_attr))
+    @abstractmethod
+    def _refresh_state(self) -> bool:
+        """Update _attr_native_value/_attr_extra_state_attributes.
 
-    def _interval(self) -> int:
-        try:
-            return int(self._device.get_attribute(self._interval_attr) or 0)
-        except (TypeError, ValueError):
-            return 0
+        Returns True if they changed.
+        """
 
     async def async_added_to_hass(self) -> None:
         """Register status callback when entity is added."""
         await super().async_added_to_hass()
-        self._device.register_status_callback(self._update_state_from_device)
+        schedule = self._schedule
+        self._device.register_status_callback(
+            self._update_state_from_device,
+            (schedule.schedule_attr, schedule.interval_attr),
+        )
 
     async def async_will_remove_from_hass(self) -> None:
         """Unregister status callback when entity is removed."""
@@ -228,8 +366,16 @@ class JebaoDoserChannelSensor(JebaoEntity, SensorEntity):
     @callback
     def _update_state_from_device(self, status: DeviceStatus) -> None:
         """Refresh when this channel's schedule or interval changes."""
-        if self._schedule_attr in status.data or self._interval_attr in status.data:
-            self.async_write_ha_state()
+        schedule = self._schedule
+        data = status.data
+        if schedule.schedule_attr in data or schedule.interval_attr in data:
+            schedule.refresh()
+            if self._refresh_state():
+                self._state_refreshed()
+                self.async_write_ha_state()
+
+    def _state_refreshed(self) -> None:
+        """Hook run after _refresh_state() reported a change from the device."""
 
 
 class JebaoDoserScheduleSensor(JebaoDoserChannelSensor):
@@ -237,45 +383,71 @@ class JebaoDoserScheduleSensor(JebaoDoserChannelSensor):
 
     _attr_icon = "mdi:clock-outline"
 
-    def __init__(self, entry: ConfigEntry, device: JebaoDevice, channel: int) -> None:
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        device: JebaoDevice,
+        schedule: DoserChannelSchedule,
+        scheduler: DoserNextDoseScheduler,
+    ) -> None:
         """Initialize the schedule sensor."""
-        super().__init__(entry, device, channel, "Schedule")
+        super().__init__(entry, device, schedule, "Schedule")
         self._attr_name = f"{self._channel_name} Schedule"
+        self._scheduler = scheduler
 
-    @property
-    def native_value(self) -> str:
-        """Next dose for daily schedules, or a compact summary otherwise."""
-        schedule = self._schedule()
-        if not schedule:
-            return "Not configured"
+    async def async_added_to_hass(self) -> None:
+        """Start tracking the next dose once the entity is added."""
+        await super().async_added_to_hass()
+        self._scheduler.async_add(self)
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop tracking the next dose when the entity is removed."""
+        await super().async_will_remove_from_hass()
+        self._scheduler.async_remove(self)
 
-        if self._interval() == 0:
-            entry = next_dose(schedule)
-            if entry:
-                return f"{entry['time']} → {entry['dose_ml']} mL"
+    def _state_refreshed(self) -> None:
+        """Re-arm the next-dose timer for the changed schedule."""
+        self._scheduler.async_reschedule(self)
 
-        # With pause days between cycles we can't know which day the device
-        # is on, so show the whole cycle instead of a next-dose prediction.
-        return "  |  ".join(f"{e['time']} → {e['dose_ml']} mL" for e in schedule)
+    def next_dose_change(self, now: datetime) -> datetime | None:
+        """Return when this sensor's next-dose state will change by itself."""
+        return self._schedule.next_dose_change(now)
+
+    def _refresh_state(self) -> bool:
+        """Next dose for daily schedules, or a compact summary otherwise."""
+        schedule = self._schedule
+        doses = schedule.doses
+        entry = schedule.next_dose(dt_util.now()) if schedule.interval == 0 else None
+        state_key = (schedule.version, entry)
+        if state_key == self._state_key:
+            return False
+        self._state_key = state_key
+
+        if not doses:
+            self._attr_native_value = "Not configured"
+        elif entry:
+            self._attr_native_value = f"{entry['time']} → {entry['dose_ml']} mL"
+        else:
+            # With pause days between cycles we can't know which day the
+            # device is on, so show the whole cycle instead of a next-dose
+            # prediction.
+            self._attr_native_value = "  |  ".join(
+                f"{e['time']} → {e['dose_ml']} mL" for e in doses
+            )
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        schedule = self._schedule()
-        interval = self._interval()
         attrs: dict[str, Any] = {
             "channel": self._channel,
             "channel_name": self._channel_name,
-            "total_doses_per_cycle": len(schedule),
-            "total_volume_ml_per_cycle": sum(e["dose_ml"] for e in schedule),
-            "pause_days_between_cycles": interval,
-            "schedule": [{"time": e["time"], "dose_ml": e["dose_ml"]} for e in schedule],
+            "total_doses_per_cycle": len(doses),
+            "total_volume_ml_per_cycle": schedule.total_ml,
+            "pause_days_between_cycles": schedule.interval,
+            "schedule": schedule.schedule_attribute,
         }
-        if interval == 0:
-            entry = next_dose(schedule)
-            if entry:
-                attrs["next_dose_time"] = entry["time"]
-                attrs["next_dose_ml"] = entry["dose_ml"]
-        return attrs
+        if entry:
+            attrs["next_dose_time"] = entry["time"]
+            attrs["next_dose_ml"] = entry["dose_ml"]
+        self._attr_extra_state_attributes = attrs
+        return True
 
 
 class JebaoDoserVolumeSensor(JebaoDoserChannelSensor):
@@ -285,25 +457,24 @@ class JebaoDoserVolumeSensor(JebaoDoserChannelSensor):
     _attr_native_unit_of_measurement = "mL"
     _attr_state_class = SensorStateClass.MEASUREMENT
 
-    def __init__(self, entry: ConfigEntry, device: JebaoDevice, channel: int) -> None:
+    def __init__(
+        self, entry: ConfigEntry, device: JebaoDevice, schedule: DoserChannelSchedule
+    ) -> None:
         """Initialize the volume sensor."""
-        super().__init__(entry, device, channel, "Volume")
+        super().__init__(entry, device, schedule, "Volume")
         self._attr_name = f"{self._channel_name} Daily Volume"
 
-    @property
-    def native_value(self) -> int | None:
-        schedule = self._schedule()
-        if not schedule:
-            return None
-        return sum(e["dose_ml"] for e in schedule)
-
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        schedule = self._schedule()
-        return {
+    def _refresh_state(self) -> bool:
+        schedule = self._schedule
+        if schedule.version == self._state_key:
+            return False
+        self._state_key = schedule.version
+        self._attr_native_value = schedule.total_ml if schedule.doses else None
+        self._attr_extra_state_attributes = {
             "channel": self._channel,
             "channel_name": self._channel_name,
-            "doses_per_cycle": len(schedule),
-            "pause_days_between_cycles": self._interval(),
-            "schedule": [{"time": e["time"], "dose_ml": e["dose_ml"]} for e in schedule],
+            "doses_per_cycle": len(schedule.doses),
+            "pause_days_between_cycles": schedule.interval,
+            "schedule": schedule.schedule_attribute,
         }
+        return True
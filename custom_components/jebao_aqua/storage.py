@@ -0,0 +1,150 @@
+"""Persistence helpers for Jebao Aqua integration.
+
+JebaoStatusStore keeps the last-known device status: entities are seeded
+from it at startup, so dashboards and automations have values before the
+devices have been discovered, connected and have answered a status request
+(or the first cloud poll completed).
+
+DeviceDataUpdates batches runtime changes to the devices stored in a config
+entry (e.g. new IPs), which are otherwise one core.config_entries rewrite
+each.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.status"
+DATA_STATUS_STORE = f"{DOMAIN}_status_store"
+
+# Collapse status changes into at most a few writes per minute.
+SAVE_DELAY = 20
+
+# Quiet period before queued device data changes are written to the config
+# entry; a router reboot moves many pumps within seconds.
+ENTRY_UPDATE_DELAY = 5
+
+
+class JebaoStatusStore:
+    """Last status of every device, by UID, in one HA Store.
+
+    Each record is what the device needs to rebuild its status:
+    {"raw": <hex status bytes>} for LAN devices, {"values": {...}} for cloud
+    devices.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store (call async_load before use)."""
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._devices: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Load the saved records from disk."""
+        data = await self._store.async_load()
+        if isinstance(data, dict):
+            self._devices = data.get("devices", {})
+
+    def get(self, uid: str) -> dict[str, Any] | None:
+        """Return the saved record for a device, if any."""
+        return self._devices.get(uid)
+
+    @callback
+    def async_update(self, uid: str, record: dict[str, Any]) -> None:
+        """Remember a device's latest status; saved after SAVE_DELAY."""
+        if self._devices.get(uid) == record:
+            return
+        self._devices[uid] = record
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def async_remove(self, uid: str) -> None:
+        """Forget a device (e.g. it was removed from the integration)."""
+        if self._devices.pop(uid, None) is not None:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"devices": self._devices}
+
+
+async def async_get_status_store(hass: HomeAssistant) -> JebaoStatusStore:
+    """Return the shared status store, loading it on first use."""
+    if (loading := hass.data.get(DATA_STATUS_STORE)) is None:
+        store = JebaoStatusStore(hass)
+        loading = hass.data[DATA_STATUS_STORE] = hass.async_create_task(
+            _async_load_store(store), "jebao_aqua_load_status_store"
+        )
+    return await asyncio.shield(loading)
+
+
+async def _async_load_store(store: JebaoStatusStore) -> JebaoStatusStore:
+    try:
+        await store.async_load()
+    except Exception:
+        # A corrupt or unreadable file only costs the restored states.
+        _LOGGER.exception("Could not load saved device status")
+    return store
+
+
+class DeviceDataUpdates:
+    """Queued changes to the devices stored in a config entry.
+
+    Changes are merged per UID and written with a single async_update_entry
+    once ENTRY_UPDATE_DELAY seconds pass without new ones (or on flush).
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the queue for one config entry."""
+        self._hass = hass
+        self._entry = entry
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_update(self, uid: str, fields: dict[str, Any]) -> None:
+        """Queue new values for fields of a device (e.g. {"ip": ...})."""
+        self._pending.setdefault(uid, {}).update(fields)
+        if self._unsub is not None:
+            self._unsub()
+        self._unsub = async_call_later(
+            self._hass, ENTRY_UPDATE_DELAY, self._async_delay_elapsed
+        )
+
+    @callback
+    def _async_delay_elapsed(self, _now: Any) -> None:
+        self._unsub = None
+        self.async_flush()
+
+    @callback
+    def async_flush(self) -> None:
+        """Write the queued changes now (one config entry update)."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        devices = []
+        changed = False
+        for dev in self._entry.data.get("devices", []):
+            fields = pending.get(dev.get("uid"))
+            if fields and any(dev.get(key) != value for key, value in fields.items()):
+                dev = {**dev, **fields}
+                changed = True
+            devices.append(dev)
+        if changed:
+            _LOGGER.debug("Saving changed device data: %s", pending)
+            self._hass.config_entries.async_update_entry(
+                self._entry, data={**self._entry.data, "devices": devices}
+            )
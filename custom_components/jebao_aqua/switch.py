@@ -8,10 +8,13 @@ from typing import Any
 from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .const import SIGNAL_DEVICES_ADDED
 from .entity import JebaoEntity
 from .gizwits_lan.device_status import DeviceStatus
+from .gizwits_lan.models import Attribute
 from .hub import JebaoDevice
 
 _LOGGER = logging.getLogger(__name__)
@@ -21,50 +24,39 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up switch entities for a given config entry."""
-    devices: list[JebaoDevice] = entry.runtime_data  # type: ignore
-    if not devices:
-        _LOGGER.warning("No Jebao devices found for entry %s", entry.title)
-        return
-
-    entities = []
-    for device in devices:
-        if not device.giz_device:
-            continue
-
-        # Get device config and allowed attributes
-        device_cfg = device.device_config
-        allowed_switch_attrs = set()
-        if device_cfg and "platforms" in device_cfg:
-            allowed_switch_attrs = set(device_cfg["platforms"].get("switch", []))
-
-        # Create entities for each device's attributes
-        for attr_def in device.giz_device.all_attrs:
-            attr_name = attr_def["name"]
-            if attr_name not in allowed_switch_attrs:
-                continue
-            if attr_def.get("type") != "status_writable":
-                continue
-            if attr_def.get("data_type") != "bool":
-                continue
-
-            entities.append(JebaoSwitchEntity(entry, device, attr_def))
 
-    if entities:
-        async_add_entities(entities)
+    @callback
+    def _async_add_devices(devices: list[JebaoDevice]) -> None:
+        entities = []
+        for device in devices:
+            if not device.giz_device:
+                continue
+            for attr_def in device.entities.platforms.get("switch", ()):
+                entities.append(JebaoSwitchEntity(entry, device, attr_def))
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_devices(entry.runtime_data.devices)
+    # Devices added to the entry later (see the update listener)
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), _async_add_devices
+        )
+    )
 
 
 class JebaoSwitchEntity(JebaoEntity, SwitchEntity):
     """A switch entity for a writable bool attribute."""
 
     def __init__(
-        self, entry: ConfigEntry, device: JebaoDevice, attr_def: dict[str, Any]
+        self, entry: ConfigEntry, device: JebaoDevice, attr_def: Attribute
     ) -> None:
         """Initialize the switch entity."""
         # Create the switch specific entity description first
         # We will fall back to this (the gizwits datapoint attribute name, which is always in English?) if no translation key is matched
         self.entity_description = SwitchEntityDescription(
-            key=attr_def["name"].lower(),
-            name=attr_def.get("name"),
+            key=attr_def.name.lower(),
+            name=attr_def.name,
         )
 
         super().__init__(entry, device, attr_def, "switch")
@@ -83,7 +75,9 @@ class JebaoSwitchEntity(JebaoEntity, SwitchEntity):
     async def async_added_to_hass(self) -> None:
         """Register callback when entity is added."""
         await super().async_added_to_hass()  # Call parent to handle connection state
-        self._device.register_status_callback(self._update_state_from_device)
+        self._device.register_status_callback(
+            self._update_state_from_device, (self._attribute_name,)
+        )
 
     async def async_will_remove_from_hass(self) -> None:
         """Unregister callback when entity is removed."""
@@ -0,0 +1,197 @@
+"""Offline stand-in for the Gizwits app websocket (status push).
+
+Speaks the subset of the protocol the integration uses (login_req,
+subscribe_req, c2s_read, c2s_write, ping) for a few fake devices, and pushes
+a change of one of their attributes every --change-every seconds, so cloud
+push can be tried without the Gizwits cloud:
+
+    python scripts/cloud_push_standin.py --dids dev1 dev2 --change-every 5
+
+With --demo the integration's client (custom_components/jebao_aqua/
+cloud_push.py) is connected to the stand-in and the pushes it receives are
+printed with their delay. Only aiohttp is needed. tests/test_cloud_push.py
+runs the client against the stand-in automatically.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+from pathlib import Path
+import time
+from typing import Any
+
+from aiohttp import WSMsgType, web
+
+WS_PATH = "/ws/app/v1"
+CLIENT_MODULE = (
+    Path(__file__).resolve().parent.parent
+    / "custom_components"
+    / "jebao_aqua"
+    / "cloud_push.py"
+)
+
+
+class StandIn:
+    """Fake m2m server: device attributes and the sockets subscribed to them."""
+
+    def __init__(self, dids: list[str], token: str | None) -> None:
+        self.token = token
+        self.attrs: dict[str, dict[str, Any]] = {
+            did: {"Mode": 0, "Flow": 50, "SwitchON": True} for did in dids
+        }
+        self.subscribers: dict[str, set[web.WebSocketResponse]] = {
+            did: set() for did in dids
+        }
+        # When each did's values last changed, for the --demo delays
+        self.changed_at: dict[str, float] = {}
+        self.sockets: set[web.WebSocketResponse] = set()
+        self.pings = 0
+
+    async def handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets.add(ws)
+        logged_in = False
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                message = json.loads(msg.data)
+                cmd, data = message.get("cmd"), message.get("data")
+                if cmd == "ping":
+                    self.pings += 1
+                    await send(ws, "pong")
+                elif cmd == "login_req":
+                    logged_in = self.token is None or data.get("token") == self.token
+                    if logged_in:
+                        await send(ws, "login_res", {"success": True})
+                    else:
+                        await send(
+                            ws, "s2c_invalid_msg", {"error_code": 1009, "msg": "token"}
+                        )
+                elif not logged_in:
+                    await send(ws, "s2c_invalid_msg", {"error_code": 1009})
+                elif cmd == "subscribe_req":
+                    ok = [d for d in data if d.get("did") in self.attrs]
+                    for did in ok:
+                        self.subscribers[did["did"]].add(ws)
+                    failed = [d for d in data if d not in ok]
+                    await send(ws, "subscribe_res", {"success": ok, "failed": failed})
+                elif cmd == "c2s_read" and data.get("did") in self.attrs:
+                    did = data["did"]
+                    await send(ws, "s2c_noti", {"did": did, "attrs": self.attrs[did]})
+                elif cmd == "c2s_write" and data.get("did") in self.attrs:
+                    await self.change(data["did"], data.get("attrs") or {})
+        finally:
+            self.sockets.discard(ws)
+            for sockets in self.subscribers.values():
+                sockets.discard(ws)
+        return ws
+
+    async def close_all(self, _app: web.Application) -> None:
+        """Close the client sockets so the server can stop (on_shutdown)."""
+        for ws in list(self.sockets):
+            await ws.close()
+
+    async def change(self, did: str, attrs: dict[str, Any]) -> None:
+        """Apply new values to a device and push them to its subscribers."""
+        self.attrs[did] = {**self.attrs[did], **attrs}
+        self.changed_at[did] = time.monotonic()
+        for ws in list(self.subscribers[did]):
+            await send(ws, "s2c_noti", {"did": did, "attrs": self.attrs[did]})
+
+    async def churn(self, interval: float) -> None:
+        """Change one device's Flow every interval seconds, round robin."""
+        step = 0
+        while True:
+            await asyncio.sleep(interval)
+            did = list(self.attrs)[step % len(self.attrs)]
+            flow = 30 + (self.attrs[did]["Flow"] + 7) % 70
+            print(f"stand-in: {did} Flow -> {flow}")
+            await self.change(did, {"Flow": flow})
+            step += 1
+
+
+async def send(ws: web.WebSocketResponse, cmd: str, data: Any = None) -> None:
+    message: dict[str, Any] = {"cmd": cmd}
+    if data is not None:
+        message["data"] = data
+    await ws.send_str(json.dumps(message))
+
+
+async def run_demo(standin: StandIn, url: str, token: str) -> None:
+    """Connect the integration's push client and print what it receives."""
+    import aiohttp
+
+    spec = importlib.util.spec_from_file_location("cloud_push", CLIENT_MODULE)
+    cloud_push = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(cloud_push)
+
+    async def credentials(stale: bool) -> tuple[str, str]:
+        return "demo-user", token
+
+    def on_attrs(did: str, attrs: dict[str, Any]) -> None:
+        changed_at = standin.changed_at.get(did)
+        delay = (
+            f" {1000 * (time.monotonic() - changed_at):.1f} ms after the change"
+            if changed_at
+            else ""
+        )
+        print(f"client: {did} {attrs}{delay}")
+
+    def on_connected(connected: bool) -> None:
+        print(f"client: push {'up' if connected else 'down'}")
+
+    async with aiohttp.ClientSession() as session:
+        connection = cloud_push.CloudPushConnection(
+            session, url, "demo-app", credentials, on_attrs, on_connected
+        )
+        await connection.subscribe(standin.attrs)
+        connection.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await connection.stop()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8880)
+    parser.add_argument("--dids", nargs="+", default=["standin1", "standin2"])
+    parser.add_argument("--token", help="only accept this user token")
+    parser.add_argument("--change-every", type=float, default=10.0)
+    parser.add_argument("--demo", action="store_true", help="run the client too")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.demo else logging.INFO)
+
+    standin = StandIn(args.dids, args.token)
+    app = web.Application()
+    app.router.add_get(WS_PATH, standin.handle)
+    app.on_shutdown.append(standin.close_all)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, args.host, args.port).start()
+    url = f"ws://{args.host}:{args.port}{WS_PATH}"
+    print(f"stand-in listening on {url} for {', '.join(args.dids)}")
+
+    tasks = [asyncio.create_task(standin.churn(args.change_every))]
+    if args.demo:
+        tasks.append(
+            asyncio.create_task(run_demo(standin, url, args.token or "demo-token"))
+        )
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
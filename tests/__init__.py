@@ -0,0 +1 @@
+"""Tests for the Jebao Aqua integration."""
@@ -0,0 +1,105 @@
+"""Tests for the cloud-polled devices."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.jebao_aqua.cloud import (
+    CONTROL_CONFIRM_DELAY,
+    CloudPollScheduler,
+    JebaoCloudDevice,
+)
+
+UID = "abc123".encode().hex()
+
+
+def _device(hass: HomeAssistant) -> JebaoCloudDevice:
+    """A cloud device with a stubbed API."""
+    api = MagicMock()
+    api.async_control_device = AsyncMock(return_value=True)
+    api.async_get_device_data = AsyncMock(return_value=None)
+    return JebaoCloudDevice(hass, api, UID, "pk")
+
+
+async def test_failed_control_fails_batched_writes(hass: HomeAssistant) -> None:
+    """Every write merged into a refused control request gets the error."""
+    device = _device(hass)
+    device.api.async_control_device.return_value = False
+
+    writes = [
+        hass.async_create_task(device.async_set_attribute("Flow", 60)),
+        hass.async_create_task(device.async_set_attributes({"Mode": 1})),
+    ]
+    await asyncio.sleep(0)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+
+    results = await asyncio.gather(*writes, return_exceptions=True)
+    assert all(isinstance(result, HomeAssistantError) for result in results)
+    device.api.async_control_device.assert_awaited_once_with(
+        "abc123", {"Flow": 60, "Mode": 1}
+    )
+    assert device.get_attribute("Flow") is None
+
+
+async def test_successful_control_updates_optimistically(
+    hass: HomeAssistant,
+) -> None:
+    """An accepted command shows its values until the cloud reports them."""
+    device = _device(hass)
+
+    write = hass.async_create_task(device.async_set_attribute("Flow", 60))
+    await asyncio.sleep(0)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+
+    assert await write is None
+    assert device.get_attribute("Flow") == 60
+    device.api.poll_scheduler.async_poll_soon.assert_called_once()
+
+
+
+async def test_pushes_do_not_back_off_confirmation(hass: HomeAssistant) -> None:
+    """Only polls that miss the commanded value delay the next confirmation."""
+    device = _device(hass)
+    await device._async_send_attributes({"Flow": 60})
+
+    for _ in range(5):
+        device.async_handle_push({"Mode": 1})
+    assert device.next_poll_delay() == CONTROL_CONFIRM_DELAY
+    assert device.get_attribute("Flow") == 60
+
+    device.api.async_get_device_data.return_value = {"attr": {"Flow": 50}}
+    await device._async_poll_once()
+    assert device.next_poll_delay() == 2 * CONTROL_CONFIRM_DELAY
+
+
+async def test_poll_joins_poll_in_flight(hass: HomeAssistant) -> None:
+    """Callers during a poll share it; the finished poll is not kept."""
+    release = asyncio.Event()
+    polls = 0
+
+    async def poll_once() -> None:
+        nonlocal polls
+        polls += 1
+        await release.wait()
+
+    device = MagicMock(uid=UID, did="abc123", _async_poll_once=poll_once)
+    device.next_poll_delay.return_value = 300
+    scheduler = CloudPollScheduler(hass)
+    scheduler.async_add(device)
+    await asyncio.sleep(0)
+    assert polls == 1
+
+    callers = [hass.async_create_task(scheduler.async_poll(device)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*callers)
+    await asyncio.sleep(0)
+
+    assert polls == 1
+    assert not scheduler._in_flight
+    await scheduler.async_remove(device)
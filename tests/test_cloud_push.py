@@ -0,0 +1,144 @@
+"""Tests for the cloud status push client, against the offline stand-in."""
+
+import asyncio
+import importlib.util
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+from homeassistant.core import HomeAssistant
+import pytest
+
+from custom_components.jebao_aqua import cloud_push
+from custom_components.jebao_aqua.cloud_push import CloudPushConnection
+
+_spec = importlib.util.spec_from_file_location(
+    "cloud_push_standin",
+    Path(__file__).parent.parent / "scripts" / "cloud_push_standin.py",
+)
+standin_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(standin_module)
+
+TOKEN = "test-token"
+
+
+class Client:
+    """Records what a CloudPushConnection passes on."""
+
+    def __init__(self) -> None:
+        self.pushes: asyncio.Queue[tuple[str, dict[str, Any]]] = asyncio.Queue()
+        self.states: asyncio.Queue[bool] = asyncio.Queue()
+
+    async def credentials(self, stale: bool) -> tuple[str, str]:
+        return "user", TOKEN
+
+    def on_attrs(self, did: str, attrs: dict[str, Any]) -> None:
+        self.pushes.put_nowait((did, attrs))
+
+    def on_connected(self, connected: bool) -> None:
+        self.states.put_nowait(connected)
+
+
+@pytest.fixture
+async def standin(socket_enabled):
+    """The stand-in server on a free local port; yields (standin, url)."""
+    server = standin_module.StandIn(["dev1", "dev2"], TOKEN)
+    app = web.Application()
+    app.router.add_get(standin_module.WS_PATH, server.handle)
+    app.on_shutdown.append(server.close_all)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield server, f"ws://127.0.0.1:{port}{standin_module.WS_PATH}"
+    await runner.cleanup()
+
+
+@pytest.fixture
+def fast_timers(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cloud_push, "HEARTBEAT_INTERVAL", 0.2)
+    monkeypatch.setattr(cloud_push, "RECONNECT_MIN_DELAY", 0.05)
+
+
+async def _next(queue: asyncio.Queue) -> Any:
+    return await asyncio.wait_for(queue.get(), 5)
+
+
+async def test_subscribe_push_heartbeat_reconnect(
+    hass: HomeAssistant, standin, fast_timers
+) -> None:
+    """Subscribed devices get pushes; pings flow; a dropped socket recovers."""
+    server, url = standin
+    client = Client()
+    async with aiohttp.ClientSession() as session:
+        connection = CloudPushConnection(
+            session,
+            url,
+            "app",
+            client.credentials,
+            client.on_attrs,
+            client.on_connected,
+            hass.async_create_background_task,
+        )
+        await connection.subscribe(["dev1"])
+        connection.start()
+        try:
+            assert await _next(client.states) is True
+            # The current values are read right after subscribing
+            assert await _next(client.pushes) == ("dev1", server.attrs["dev1"])
+
+            # Changes are pushed for subscribed devices only
+            await server.change("dev2", {"Flow": 60})
+            await server.change("dev1", {"Flow": 70})
+            did, attrs = await _next(client.pushes)
+            assert did == "dev1"
+            assert attrs["Flow"] == 70
+
+            # Heartbeat
+            await asyncio.sleep(0.5)
+            assert server.pings >= 2
+            assert connection.connected
+
+            # The server drops the socket: down, then back up and resubscribed
+            await server.close_all(None)
+            assert await _next(client.states) is False
+            assert await _next(client.states) is True
+            assert await _next(client.pushes) == ("dev1", server.attrs["dev1"])
+            await server.change("dev1", {"Flow": 80})
+            assert (await _next(client.pushes))[1]["Flow"] == 80
+        finally:
+            await connection.stop()
+    assert not connection.connected
+
+
+async def test_login_refused_retries_with_fresh_token(
+    hass: HomeAssistant, standin, fast_timers
+) -> None:
+    """A refused token is asked for again as stale, then used."""
+    server, url = standin
+    client = Client()
+    asked: list[bool] = []
+
+    async def credentials(stale: bool) -> tuple[str, str]:
+        asked.append(stale)
+        return "user", TOKEN if stale else "expired"
+
+    async with aiohttp.ClientSession() as session:
+        connection = CloudPushConnection(
+            session,
+            url,
+            "app",
+            credentials,
+            client.on_attrs,
+            client.on_connected,
+            hass.async_create_background_task,
+        )
+        await connection.subscribe(["dev1"])
+        connection.start()
+        try:
+            assert await _next(client.states) is True
+        finally:
+            await connection.stop()
+    assert asked[:2] == [False, True]
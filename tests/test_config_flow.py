@@ -0,0 +1,176 @@
+"""Tests for the Jebao Aqua config flow."""
+
+from unittest.mock import MagicMock
+
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.helpers.service_info.dhcp import DhcpServiceInfo
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.jebao_aqua.const import (
+    CONF_CLOUD_PUSH,
+    CONF_MODE,
+    CONF_OFFLINE_COMMANDS,
+    CONF_POLL_MAX_INTERVAL,
+    CONF_POLL_MIN_INTERVAL,
+    DOMAIN,
+    MODE_CLOUD,
+    MODE_LOCAL,
+)
+from custom_components.jebao_aqua.hub import JebaoDevice, JebaoRuntimeData
+
+MAC = "aa:bb:cc:dd:ee:ff"
+OLD_IP = "192.168.1.20"
+NEW_IP = "192.168.1.42"
+
+
+def _dhcp(ip: str, mac: str = MAC) -> DhcpServiceInfo:
+    return DhcpServiceInfo(
+        ip=ip, hostname="esp_123456", macaddress=mac.replace(":", "")
+    )
+
+
+def _loaded_entry(hass: HomeAssistant, available: bool) -> tuple:
+    """A loaded local entry with one running device at OLD_IP."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_MODE: MODE_LOCAL,
+            "devices": [
+                {"uid": "uid1", "ip": OLD_IP, "mac": MAC, "product_key": "pk"}
+            ],
+        },
+        state=config_entries.ConfigEntryState.LOADED,
+    )
+    entry.add_to_hass(hass)
+    device = JebaoDevice(hass, OLD_IP, "pk", uid="uid1", mac=MAC)
+    device.giz_device = MagicMock(ip=OLD_IP, available=available)
+    ip_changed = MagicMock()
+    device.set_ip_changed_callback(ip_changed)
+    entry.runtime_data = JebaoRuntimeData([device], mode=MODE_LOCAL)
+    return entry, device, ip_changed
+
+
+async def _async_dhcp_flow(hass: HomeAssistant, info: DhcpServiceInfo) -> dict:
+    return await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_DHCP}, data=info
+    )
+
+
+async def test_dhcp_known_mac_new_ip(hass: HomeAssistant) -> None:
+    """A lease change re-points the offline device and reconnects it."""
+    entry, device, ip_changed = _loaded_entry(hass, available=False)
+
+    result = await _async_dhcp_flow(hass, _dhcp(NEW_IP))
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+    assert device.ip == NEW_IP
+    assert device.giz_device.ip == NEW_IP
+    device.giz_device.reconnect_now.assert_called_once()
+    ip_changed.assert_called_once_with("uid1", NEW_IP)
+
+
+async def test_dhcp_unknown_mac(hass: HomeAssistant) -> None:
+    """A lease of a device no entry has is not ours."""
+    entry, device, ip_changed = _loaded_entry(hass, available=False)
+
+    result = await _async_dhcp_flow(hass, _dhcp(NEW_IP, "11:22:33:44:55:66"))
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "not_jebao_device"
+    assert device.ip == OLD_IP
+    device.giz_device.reconnect_now.assert_not_called()
+    ip_changed.assert_not_called()
+
+
+async def test_dhcp_known_mac_same_ip(hass: HomeAssistant) -> None:
+    """A renewal of the address a connected device already has changes nothing."""
+    entry, device, ip_changed = _loaded_entry(hass, available=True)
+    data = dict(entry.data)
+
+    result = await _async_dhcp_flow(hass, _dhcp(OLD_IP))
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+    assert device.ip == OLD_IP
+    device.giz_device.reconnect_now.assert_not_called()
+    ip_changed.assert_not_called()
+    assert dict(entry.data) == data
+
+
+async def test_dhcp_entry_not_loaded(hass: HomeAssistant) -> None:
+    """Without running devices the stored IP is corrected for the next setup."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_MODE: MODE_LOCAL,
+            "devices": [
+                {"uid": "uid1", "ip": OLD_IP, "mac": MAC, "product_key": "pk"}
+            ],
+        },
+        state=config_entries.ConfigEntryState.SETUP_RETRY,
+    )
+    entry.add_to_hass(hass)
+
+    result = await _async_dhcp_flow(hass, _dhcp(NEW_IP))
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+    assert entry.data["devices"][0]["ip"] == NEW_IP
+
+
+async def test_options_local_mode_fields(hass: HomeAssistant) -> None:
+    """A local entry is only offered the LAN options."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_MODE: MODE_LOCAL, "devices": []}
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+
+    assert set(result["data_schema"].schema) == {
+        CONF_MODE,
+        "rediscover",
+        CONF_OFFLINE_COMMANDS,
+    }
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_MODE: MODE_LOCAL, CONF_OFFLINE_COMMANDS: True}
+    )
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert entry.options == {CONF_OFFLINE_COMMANDS: True}
+
+
+async def test_options_cloud_mode_fields(hass: HomeAssistant) -> None:
+    """A cloud entry is only offered the polling and push options."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_MODE: MODE_CLOUD, "devices": []},
+        options={CONF_OFFLINE_COMMANDS: True},
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+
+    assert set(result["data_schema"].schema) == {
+        CONF_MODE,
+        CONF_POLL_MIN_INTERVAL,
+        CONF_POLL_MAX_INTERVAL,
+        CONF_CLOUD_PUSH,
+    }
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_MODE: MODE_CLOUD,
+            CONF_POLL_MIN_INTERVAL: 60,
+            CONF_POLL_MAX_INTERVAL: 600,
+            CONF_CLOUD_PUSH: False,
+        },
+    )
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    # The option of the other mode is kept
+    assert entry.options[CONF_OFFLINE_COMMANDS] is True
+    assert entry.options[CONF_POLL_MAX_INTERVAL] == 600
@@ -0,0 +1,37 @@
+"""Tests for the Jebao Aqua diagnostics."""
+
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.jebao_aqua.const import CONF_MODE, DOMAIN, MODE_LOCAL
+from custom_components.jebao_aqua.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.jebao_aqua.hub import JebaoDevice, JebaoRuntimeData
+
+
+async def test_diagnostics_redacted(hass: HomeAssistant) -> None:
+    """Addresses and device IDs are left out of the download."""
+    device_data = {
+        "uid": "uid1",
+        "ip": "192.168.1.20",
+        "mac": "aa:bb:cc:dd:ee:ff",
+        "product_key": "pk",
+    }
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_MODE: MODE_LOCAL, "devices": [device_data]}
+    )
+    entry.add_to_hass(hass)
+    device = JebaoDevice(
+        hass, device_data["ip"], "pk", uid="uid1", mac=device_data["mac"]
+    )
+    entry.runtime_data = JebaoRuntimeData([device], mode=MODE_LOCAL)
+
+    result = await async_get_config_entry_diagnostics(hass, entry)
+
+    for dumped in (result["entry"]["data"]["devices"][0], result["devices"][0]):
+        assert dumped["uid"] == REDACTED
+        assert dumped["ip"] == REDACTED
+        assert dumped["mac"] == REDACTED
+        assert dumped["product_key"] == "pk"
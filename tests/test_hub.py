@@ -0,0 +1,227 @@
+"""Tests for the device wrappers in hub.py."""
+
+import asyncio
+from datetime import timedelta
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.jebao_aqua import hub
+from custom_components.jebao_aqua.const import PENDING_COMMAND_TIMEOUT
+from custom_components.jebao_aqua.gizwits_lan import DeviceStatus, GizwitsError
+from custom_components.jebao_aqua.hub import JebaoDevice, WriteBatcher
+
+
+def _device(hass: HomeAssistant, data: dict) -> JebaoDevice:
+    """A device whose connection reports the given live status."""
+    device = JebaoDevice(hass, "192.168.1.20", "pk", uid="uid1")
+    device.giz_device = MagicMock(current_status=DeviceStatus(data))
+    device.giz_device.set_multiple_attributes = AsyncMock(return_value=b"ack")
+    return device
+
+
+async def test_write_batcher_merges_writes(hass: HomeAssistant) -> None:
+    """Writes within the window are one send; every writer gets its result."""
+    sent: list[dict] = []
+
+    async def send(values: dict) -> str:
+        sent.append(values)
+        return "ack"
+
+    batcher = WriteBatcher(hass, send, "dev")
+    writes = [
+        hass.async_create_task(batcher.async_write({"Flow": 60})),
+        hass.async_create_task(batcher.async_write({"Flow": 70, "Mode": 1})),
+    ]
+    await asyncio.sleep(0)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+
+    assert await asyncio.gather(*writes) == ["ack", "ack"]
+    assert sent == [{"Flow": 70, "Mode": 1}]
+
+
+async def test_write_batcher_cancel_during_send(hass: HomeAssistant) -> None:
+    """Cancelling while a batch is being sent fails its writers cleanly."""
+    started = asyncio.Event()
+
+    async def send(values: dict) -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    batcher = WriteBatcher(hass, send, "dev")
+    write = hass.async_create_task(batcher.async_write({"Flow": 60}))
+    await asyncio.sleep(0)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await started.wait()
+
+    batcher.async_cancel()
+
+    with pytest.raises(RuntimeError, match="Device disconnected"):
+        await write
+    await hass.async_block_till_done()
+
+
+async def test_write_batcher_cancel_before_send_runs(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Cancelling between the window closing and the send starting is safe."""
+    sent: list[dict] = []
+
+    async def send(values: dict) -> None:
+        sent.append(values)
+
+    # Send tasks start on the next loop iteration instead of eagerly
+    monkeypatch.setattr(
+        hass,
+        "async_create_background_task",
+        lambda target, name, eager_start=True: hass.loop.create_task(target),
+    )
+    batcher = WriteBatcher(hass, send, "dev")
+    write = hass.async_create_task(batcher.async_write({"Flow": 60}))
+    await asyncio.sleep(0)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    batcher.async_cancel()
+
+    with pytest.raises(RuntimeError, match="Device disconnected"):
+        await write
+    await hass.async_block_till_done()
+    assert sent == []
+
+
+async def test_clamped_write_settled_by_next_status(hass: HomeAssistant) -> None:
+    """A value the device did not take is no longer resent after its report."""
+    device = _device(hass, {"Flow": 50})
+    send = device.giz_device.set_multiple_attributes
+
+    await device._async_send_attributes({"Flow": 120})
+    # The device clamps the value; the report after the ack settles the write
+    device._handle_status_update(DeviceStatus({"Flow": 100}))
+    device.giz_device.current_status = DeviceStatus({"Flow": 100})
+
+    assert await device._async_send_attributes({"Flow": 100}) is None
+    send.assert_awaited_once_with({"Flow": 120})
+
+
+async def test_report_before_ack_keeps_write_unconfirmed(
+    hass: HomeAssistant,
+) -> None:
+    """A report received while the write is on its way does not settle it."""
+    device = _device(hass, {"Flow": 50})
+    before = DeviceStatus({"Flow": 50}, timestamp=time.monotonic())
+
+    await device._async_send_attributes({"Flow": 60})
+    device._handle_status_update(before)
+
+    # Still unconfirmed: writing the value the status shows is not skipped
+    assert await device._async_send_attributes({"Flow": 50}) == b"ack"
+
+
+async def test_failed_write_forgotten(hass: HomeAssistant) -> None:
+    """A write that was not delivered does not stay unconfirmed."""
+    device = _device(hass, {"Flow": 50})
+    send = device.giz_device.set_multiple_attributes
+    send.side_effect = GizwitsError("no ack")
+
+    with pytest.raises(GizwitsError):
+        await device._async_send_attributes({"Flow": 60})
+
+    send.side_effect = None
+    send.reset_mock()
+    assert await device._async_send_attributes({"Flow": 50}) is None
+    send.assert_not_awaited()
+
+
+async def test_ack_timeout_while_connected_not_queued(hass: HomeAssistant) -> None:
+    """Offline queueing is for disconnected devices; a connected one raises."""
+    device = _device(hass, {"Flow": 50})
+    device.queue_offline_commands = True
+    device.giz_device.available = True
+    device.giz_device.set_multiple_attributes.side_effect = GizwitsError("no ack")
+
+    with pytest.raises(GizwitsError):
+        await device._async_send_attributes({"Flow": 60})
+    assert not device.command_pending("Flow")
+
+
+async def test_write_while_disconnected_queued(hass: HomeAssistant) -> None:
+    """A write to a disconnected device waits for the reconnect."""
+    device = _device(hass, {"Flow": 50})
+    device.queue_offline_commands = True
+    device.giz_device.available = False
+    device.giz_device.set_multiple_attributes.side_effect = RuntimeError(
+        "Device not connected"
+    )
+
+    assert await device._async_send_attributes({"Flow": 60}) is None
+    assert device.command_pending("Flow")
+    device._drop_offline_commands()
+
+
+def _offline_device(hass: HomeAssistant) -> JebaoDevice:
+    """A disconnected device with Flow=60 queued."""
+    device = _device(hass, {"Flow": 50})
+    device.queue_offline_commands = True
+    device.giz_device.available = False
+    device.giz_device.set_multiple_attributes.side_effect = RuntimeError(
+        "Device not connected"
+    )
+    return device
+
+
+async def test_queued_command_replayed_on_reconnect(hass: HomeAssistant) -> None:
+    """The queued value is sent once the device is back and stays pending."""
+    device = _offline_device(hass)
+    send = device.giz_device.set_multiple_attributes
+    await device._async_send_attributes({"Flow": 60})
+
+    send.side_effect = None
+    send.reset_mock()
+    device.giz_device.available = True
+    device._handle_connection_state(True)
+    await hass.async_block_till_done()
+
+    send.assert_awaited_once_with({"Flow": 60})
+    assert device.command_pending("Flow")
+    device._drop_offline_commands()
+
+
+async def test_queued_command_confirmed_by_status(hass: HomeAssistant) -> None:
+    """The status showing the queued value clears the pending flag."""
+    device = _offline_device(hass)
+    await device._async_send_attributes({"Flow": 60})
+    listener = MagicMock()
+    device.register_status_callback(listener, ["Flow"])
+    device._handle_status_update(DeviceStatus({"Flow": 50}))
+    listener.reset_mock()
+
+    device._handle_status_update(DeviceStatus({"Flow": 60}))
+
+    assert not device.command_pending("Flow")
+    listener.assert_called_once()
+    device._drop_offline_commands()
+
+
+async def test_queued_command_expires(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A command not delivered within PENDING_COMMAND_TIMEOUT is dropped."""
+    device = _offline_device(hass)
+    await device._async_send_attributes({"Flow": 60})
+    listener = MagicMock()
+    device.register_status_callback(listener, ["Flow"])
+    listener.reset_mock()
+
+    later = time.monotonic() + PENDING_COMMAND_TIMEOUT + 1
+    monkeypatch.setattr(hub, "time", SimpleNamespace(monotonic=lambda: later))
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=PENDING_COMMAND_TIMEOUT + 1)
+    )
+    await hass.async_block_till_done()
+
+    assert not device.command_pending("Flow")
+    listener.assert_called_once()